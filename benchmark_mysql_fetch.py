@@ -0,0 +1,94 @@
+"""
+Measure MySQL fetch throughput for each mysql-connector driver implementation.
+
+Reads the same rows through the C extension and the pure-Python driver, with
+both a plain and a prepared cursor, and reports rows/s for each combination.
+Use it to confirm the 'MySQL Driver' default of motor_health8.py on a given host.
+
+Example:
+    python benchmark_mysql_fetch.py --user root --password secret --database sensors --table vibration
+"""
+import argparse
+import time
+
+import mysql.connector
+
+
+def connect(args, use_pure):
+    """Open a connection configured like the dashboard's connector"""
+    return mysql.connector.connect(
+        host=args.host,
+        port=args.port,
+        user=args.user,
+        password=args.password,
+        database=args.database,
+        autocommit=True,
+        connection_timeout=15,
+        use_pure=use_pure,
+        ssl_disabled=True,
+        auth_plugin='mysql_native_password'
+    )
+
+
+def time_fetch(connection, query, params, prepared, repeat):
+    """Best-of-`repeat` time to execute the query and fetch every row; returns (rows, seconds)"""
+    cursor = connection.cursor(prepared=True) if prepared else connection.cursor()
+    best = None
+    rows = 0
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cursor.execute(query, params)
+            rows = len(cursor.fetchall())
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        cursor.close()
+    return rows, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare MySQL fetch throughput of the C extension and pure-Python drivers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", required=True)
+    parser.add_argument("--table", required=True)
+    parser.add_argument("--columns", default="*", help="Comma separated columns to select (default: all)")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows fetched per run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the best run is reported")
+    args = parser.parse_args()
+
+    columns = "*" if args.columns == "*" else ", ".join(
+        "`" + column.strip().replace("`", "``") + "`" for column in args.columns.split(",")
+    )
+    query = f"SELECT {columns} FROM `{args.table.replace('`', '``')}` LIMIT %s"
+
+    modes = [("pure", True)]
+    if getattr(mysql.connector, 'HAVE_CEXT', False):
+        modes.insert(0, ("c", False))
+    else:
+        print("C extension not installed - only the pure-Python driver can be measured")
+
+    results = {}
+    print(f"{'driver':<8} {'cursor':<10} {'rows':>10} {'seconds':>9} {'rows/s':>12}")
+    for mode, use_pure in modes:
+        connection = connect(args, use_pure)
+        try:
+            for prepared in (False, True):
+                rows, seconds = time_fetch(connection, query, (args.rows,), prepared, args.repeat)
+                rate = rows / seconds if seconds else float('inf')
+                results[(mode, prepared)] = rate
+                cursor_name = "prepared" if prepared else "plain"
+                print(f"{mode:<8} {cursor_name:<10} {rows:>10,} {seconds:>9.3f} {rate:>12,.0f}")
+        finally:
+            connection.close()
+
+    if ("c", True) in results:
+        speedup = results[("c", True)] / results[("pure", True)]
+        print(f"\nC extension is {speedup:.1f}x the pure-Python rate for prepared reads")
+
+
+if __name__ == "__main__":
+    main()
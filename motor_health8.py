@@ -3,14 +3,27 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import copy
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import sqlite3
+import threading
 import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+import urllib.parse
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 from scipy import signal
-from scipy.fft import fft, fftfreq
+from scipy.fft import rfft, rfftfreq, next_fast_len
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -19,10 +32,28 @@ try:
     import mysql.connector
     from mysql.connector import Error
     MYSQL_AVAILABLE = True
+    # The C extension decodes rows far faster than the pure-Python protocol implementation
+    MYSQL_CEXT_AVAILABLE = bool(getattr(mysql.connector, 'HAVE_CEXT', False))
 except ImportError:
     MYSQL_AVAILABLE = False
+    MYSQL_CEXT_AVAILABLE = False
     st.error("⚠️ MySQL connector not installed. Run: pip install mysql-connector-python")
 
+# Optional DuckDB support for columnar scans over exported history files
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+# Optional Parquet support for the local historical data cache
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
 # Page configuration
 st.set_page_config(
     page_title="AI Preventive Maintenance System",
@@ -89,106 +120,487 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-class MySQLConnector:
-    """Handles MySQL database connections and data retrieval"""
+class SharedConnectionPool:
+    """Thread-safe pool of MySQL connections shared by every session of the server process"""
+    
+    def __init__(self, config, opener, max_size=10, idle_timeout=300, ping_interval=5):
+        self.config = config
+        self.opener = opener  # Callable(config) -> (connection, working_config, ssl_mode)
+        self.ssl_mode = None
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout  # Seconds before an idle connection is closed
+        self.ping_interval = ping_interval  # Seconds of idleness after which a borrowed connection is pinged
+        self.created = 0
+        self._idle = []  # List of (connection, last_used) tuples, most recently used last
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+    
+    def acquire(self, timeout=15):
+        """Borrow a healthy connection, creating one if the pool is not yet full"""
+        deadline = time.monotonic() + timeout
+        connection = None
+        last_used = None
+        
+        with self._available:
+            while True:
+                expired = self._pop_expired()
+                if self._idle:
+                    connection, last_used = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use < self.max_size:
+                    self._in_use += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise mysql.connector.errors.PoolError(
+                        f"Connection pool exhausted ({self.max_size} connections in use)"
+                    )
+                self._available.wait(remaining)
+        
+        for stale_connection in expired:
+            self._close_quietly(stale_connection)
+        
+        try:
+            # Health-check connections that have been sitting idle for a while
+            if connection is not None and time.monotonic() - last_used > self.ping_interval:
+                if not self._is_healthy(connection):
+                    self._close_quietly(connection)
+                    connection = None
+            
+            if connection is None:
+                connection, self.config, self.ssl_mode = self.opener(self.config)
+                self.created += 1
+            
+            return connection
+        except Exception:
+            with self._available:
+                self._in_use -= 1
+                self._available.notify()
+            raise
+    
+    def release(self, connection, discard=False):
+        """Return a borrowed connection to the pool (or close it if it is no longer usable)"""
+        if not discard:
+            try:
+                connection.consume_results()
+                discard = not connection.is_connected()
+            except Exception:
+                discard = True
+        
+        if discard:
+            self._close_quietly(connection)
+        
+        with self._available:
+            self._in_use -= 1
+            if not discard:
+                self._idle.append((connection, time.monotonic()))
+            self._available.notify()
+    
+    def stats(self):
+        """Get current pool usage"""
+        with self._lock:
+            return {
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'created': self.created,
+                'max_size': self.max_size,
+                'ssl_mode': self.ssl_mode
+            }
+    
+    def close_all(self):
+        """Close every idle connection in the pool"""
+        with self._lock:
+            idle_connections = [connection for connection, _ in self._idle]
+            self._idle = []
+        for connection in idle_connections:
+            self._close_quietly(connection)
+    
+    def _pop_expired(self):
+        """Remove connections idle for longer than idle_timeout (caller holds the lock)"""
+        now = time.monotonic()
+        expired = [connection for connection, last_used in self._idle if now - last_used > self.idle_timeout]
+        if expired:
+            self._idle = [(connection, last_used) for connection, last_used in self._idle if now - last_used <= self.idle_timeout]
+        return expired
+    
+    @staticmethod
+    def _is_healthy(connection):
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+class ConnectionPoolRegistry:
+    """Process-wide registry of connection pools keyed by host, port, user and database"""
+    
+    def __init__(self):
+        self._pools = {}
+        self._lock = threading.Lock()
+    
+    def get_pool(self, pool_key, config, opener):
+        """Get the pool for a connection key, creating it on first use"""
+        with self._lock:
+            pool = self._pools.get(pool_key)
+            if pool is None:
+                pool = SharedConnectionPool(config, opener)
+                self._pools[pool_key] = pool
+            return pool
+    
+    def close_all(self):
+        """Close idle connections of every registered pool"""
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.close_all()
+
+@st.cache_resource
+def get_connection_pool_registry():
+    """Shared connection pool registry (one per Streamlit server process)"""
+    return ConnectionPoolRegistry()
+
+class SensorQueryBuilder:
+    """SQL for one table and column mapping, with identifiers validated against the cached schema"""
+    
+    def __init__(self, connector, table_name, columns_mapping):
+        if table_name not in connector.get_tables():
+            raise ValueError(f"Unknown table '{table_name}'")
+        self.table_name = table_name
+        self.table_columns = set(connector.get_columns(table_name))
+        
+        # Build column selection
+        self.aliases = []
+        self.columns = []
+        for key, column in columns_mapping.items():
+            if column and column != "None":
+                self.columns.append(self.quote_column(column))
+                self.aliases.append(key)
+        
+        timestamp_column = columns_mapping.get('timestamp')
+        self.timestamp = self.quote_column(timestamp_column) if timestamp_column and timestamp_column != "None" else None
+        self.table = self.quote(table_name)
+        self.select_list = ", ".join(self.columns)
+        self._queries = {}
+    
+    @staticmethod
+    def quote(identifier):
+        """Backtick-quote an identifier"""
+        return "`" + str(identifier).replace("`", "``") + "`"
+    
+    def quote_column(self, column):
+        """Quote a column after checking that the table has it"""
+        if column not in self.table_columns:
+            raise ValueError(f"Unknown column '{column}' in table '{self.table_name}'")
+        return self.quote(column)
+    
+    def _query(self, shape, build):
+        """Build each query shape once so prepared statements see the same SQL text"""
+        query = self._queries.get(shape)
+        if query is None:
+            query = self._queries[shape] = build()
+        return query
+    
+    def latest(self, order_by_timestamp=True):
+        """Newest rows first; params (limit,)"""
+        order_by_timestamp = bool(order_by_timestamp and self.timestamp)
+        return self._query(('latest', order_by_timestamp), lambda: (
+            f"SELECT {self.select_list} FROM {self.table}"
+            + (f" ORDER BY {self.timestamp} DESC" if order_by_timestamp else "")
+            + " LIMIT ?"
+        ))
+    
+    def since(self):
+        """Rows after a timestamp, oldest first; params (last_timestamp, limit)"""
+        return self._query(('since',), lambda: (
+            f"SELECT {self.select_list} FROM {self.table} "
+            f"WHERE {self.timestamp} > ? ORDER BY {self.timestamp} ASC LIMIT ?"
+        ))
+    
+    def tail(self, key_column=None):
+        """Keyset batch after (timestamp, key); params (ts, ts, key, limit)
+        
+        Without a key the batch starts at the timestamp itself, params (ts, limit), and the
+        caller skips the rows at that timestamp it has already read. Ties are ordered by the
+        selected columns so the skipped rows are the same ones on every read.
+        """
+        if key_column:
+            key = self.quote_column(key_column)
+            return self._query(('tail', key_column), lambda: (
+                f"SELECT {self.select_list}, {key} FROM {self.table} "
+                f"WHERE {self.timestamp} > ? OR ({self.timestamp} = ? AND {key} > ?) "
+                f"ORDER BY {self.timestamp} ASC, {key} ASC LIMIT ?"
+            ))
+        return self._query(('tail', None), lambda: (
+            f"SELECT {self.select_list} FROM {self.table} "
+            f"WHERE {self.timestamp} >= ? ORDER BY {self._tie_order()} LIMIT ?"
+        ))
+    
+    def _tie_order(self):
+        """ORDER BY list for keyless reads: the timestamp, then every selected column"""
+        return ", ".join([self.timestamp] + [column for column in self.columns if column != self.timestamp])
+    
+    def head(self, key_column=None):
+        """First keyset batch of a tail with no position yet, oldest first; params (limit,)"""
+        key = self.quote_column(key_column) if key_column else None
+        return self._query(('head', key_column), lambda: (
+            f"SELECT {self.select_list}" + (f", {key}" if key else "") + f" FROM {self.table} "
+            f"WHERE {self.timestamp} IS NOT NULL ORDER BY "
+            + (f"{self.timestamp} ASC, {key} ASC" if key else self._tie_order()) + " LIMIT ?"
+        ))
+    
+    def newest_timestamp(self):
+        """Largest timestamp in the table; no params"""
+        return self._query(('newest_timestamp',), lambda: (
+            f"SELECT MAX({self.timestamp}) FROM {self.table}"
+        ))
+    
+    def count_at(self):
+        """Number of rows with a given timestamp; params (timestamp,)"""
+        return self._query(('count_at',), lambda: (
+            f"SELECT COUNT(*) FROM {self.table} WHERE {self.timestamp} = ?"
+        ))
+    
+    def date_range(self):
+        """Rows between two timestamps, oldest first; params (start, end, limit)"""
+        return self._query(('date_range',), lambda: (
+            f"SELECT {self.select_list} FROM {self.table} "
+            f"WHERE {self.timestamp} BETWEEN ? AND ? ORDER BY {self.timestamp} ASC LIMIT ?"
+        ))
+    
+    def fleet_latest(self, machine_column, machine_count):
+        """Newest rows for several machine ids in one statement; params (machine_id, limit) per machine"""
+        machine = self.quote_column(machine_column)
+        order = f" ORDER BY {self.timestamp} DESC" if self.timestamp else ""
+        return self._query(('fleet_latest', machine_column, machine_count), lambda: " UNION ALL ".join(
+            [f"(SELECT {machine}, {self.select_list} FROM {self.table} WHERE {machine} = ?{order} LIMIT ?)"] * machine_count
+        ))
+    
+    @staticmethod
+    def union_latest(builders):
+        """Newest rows from several tables with the same mapping, tagged by position; params (limit,) per table"""
+        def build():
+            branches = []
+            for position, builder in enumerate(builders):
+                order = f" ORDER BY {builder.timestamp} DESC" if builder.timestamp else ""
+                branches.append(f"(SELECT {position}, {builder.select_list} FROM {builder.table}{order} LIMIT ?)")
+            return " UNION ALL ".join(branches)
+        return builders[0]._query(('union_latest', tuple(builder.table for builder in builders)), build)
+    
+    def count_range(self):
+        """Exact row count between two timestamps; params (start, end)"""
+        return self._query(('count_range',), lambda: (
+            f"SELECT COUNT(*) FROM {self.table} WHERE {self.timestamp} BETWEEN ? AND ?"
+        ))
+    
+    def max_key_at(self, key_column):
+        """Largest key among rows with a given timestamp; params (timestamp,)"""
+        key = self.quote_column(key_column)
+        return self._query(('max_key_at', key_column), lambda: (
+            f"SELECT MAX({key}) FROM {self.table} WHERE {self.timestamp} = ?"
+        ))
+    
+    def hourly_counts(self, incremental=False):
+        """Per-(date, hour) counts and first/last timestamps; params (from_timestamp,) when incremental"""
+        return self._query(('hourly_counts', incremental), lambda: (
+            f"SELECT DATE({self.timestamp}), HOUR({self.timestamp}), COUNT(*), "
+            f"MIN({self.timestamp}), MAX({self.timestamp}) "
+            f"FROM {self.table} WHERE {self.timestamp} IS NOT NULL"
+            + (f" AND {self.timestamp} >= ?" if incremental else "")
+            + f" GROUP BY DATE({self.timestamp}), HOUR({self.timestamp})"
+        ))
+
+
+class PreparedStatementCache:
+    """Server-side prepared statements kept open per connection and SQL text"""
+    
+    def __init__(self, max_per_connection=32):
+        self.max_per_connection = max_per_connection
+        self._statements = weakref.WeakKeyDictionary()  # connection -> OrderedDict(sql -> (sql, cursor))
+        self._lock = threading.Lock()
+    
+    def execute(self, connection, query, params=()):
+        """Execute a read as a prepared statement, preparing it only the first time on this connection"""
+        with self._lock:
+            statements = self._statements.setdefault(connection, OrderedDict())
+            entry = statements.pop(query, None)
+            if entry is None:
+                entry = (query, connection.cursor(prepared=True))
+            statements[query] = entry
+            while len(statements) > self.max_per_connection:
+                _, (_, evicted) = statements.popitem(last=False)
+                self._close_quietly(evicted)
+        
+        # The cursor only reuses its statement when handed the identical SQL object
+        prepared_query, cursor = entry
+        try:
+            cursor.execute(prepared_query, tuple(params))
+            return cursor.fetchall()
+        except Exception:
+            with self._lock:
+                statements.pop(query, None)
+            self._close_quietly(cursor)
+            raise
+    
+    @staticmethod
+    def _close_quietly(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+
+@st.cache_resource
+def get_prepared_statement_cache():
+    """Process-wide prepared statement cache (pooled connections are shared by all sessions)"""
+    return PreparedStatementCache()
+
+
+class SensorDataBackend(ABC):
+    """Read API shared by the storage backends: schema listing, latest rows, real-time tail, date ranges and statistics
+    
+    Methods report failures with st.error and return None (or an empty list for schema
+    listings), like the rest of the dashboard's data access. Backends must implement the
+    abstract methods; the others have defaults for features a backend may lack.
+    """
+    
+    backend_name = "Storage backend"
     
     def __init__(self):
+        self.is_connected = False
+        self.connection_params = None
+    
+    @abstractmethod
+    def disconnect(self):
+        """Close the backend; returns (success, message)"""
+    
+    def get_databases(self):
+        """Databases the backend can switch between"""
+        return []
+    
+    @abstractmethod
+    def get_tables(self):
+        """Tables in the current database"""
+    
+    @abstractmethod
+    def get_columns(self, table_name):
+        """Column names of a table"""
+    
+    def invalidate_schema_cache(self, database=None):
+        """Forget cached table and column lists"""
+        pass
+    
+    def get_pool_stats(self):
+        """Connection pool usage (None when the backend has no pool)"""
+        return None
+    
+    @abstractmethod
+    def get_latest_data(self, table_name, columns_mapping, limit=1000, order_by_timestamp=True):
+        """Newest rows, returned oldest first"""
+    
+    @abstractmethod
+    def get_real_time_data(self, table_name, columns_mapping, last_timestamp=None):
+        """Rows newer than last_timestamp"""
+    
+    @abstractmethod
+    def init_tail_state(self, table_name, columns_mapping, last_timestamp):
+        """Position for tail_real_time_data after the last row already loaded"""
+    
+    @abstractmethod
+    def tail_real_time_data(self, table_name, columns_mapping, tail_state, batch_size=500, max_batches=20):
+        """Drain new rows in bounded batches; returns (DataFrame or None, new tail_state, info)"""
+    
+    @abstractmethod
+    def get_data_by_date_range(self, table_name, columns_mapping, start_datetime, end_datetime, limit=10000,
+                               streaming=False, chunk_size=5000):
+        """Rows between two timestamps, oldest first"""
+    
+    @abstractmethod
+    def get_aggregated_data_by_date_range(self, table_name, columns_mapping, start_datetime, end_datetime,
+                                          target_points=2000, bucket_seconds=None):
+        """Per-bucket min/max/mean/RMS per sensor; returns (DataFrame, bucket_seconds)"""
+    
+    @abstractmethod
+    def get_date_range_statistics(self, table_name, timestamp_column, full_refresh=False):
+        """Date span, record count and daily/hourly distribution of a table"""
+    
+    @abstractmethod
+    def count_records_in_range(self, table_name, timestamp_column, start_datetime, end_datetime):
+        """Exact number of rows in a date range"""
+    
+    @abstractmethod
+    def estimate_records_in_range(self, table_name, timestamp_column, start_datetime, end_datetime,
+                                  data_bounds=None):
+        """Fast row estimate for a date range with an error bound"""
+
+
+# Driver implementations selectable per connection (see benchmark_mysql_fetch.py for measurements)
+MYSQL_DRIVER_MODES = {
+    'auto': "Auto (C extension if installed)",
+    'c': "C extension",
+    'pure': "Pure Python"
+}
+
+# Server errors for statements stopped by their execution time limit (MySQL MAX_EXECUTION_TIME, MariaDB max_statement_time)
+QUERY_TIMEOUT_ERRNOS = (3024, 1969)
+
+class MySQLConnector(SensorDataBackend):
+    """Handles MySQL database connections and data retrieval"""
+    
+    backend_name = "MySQL"
+    
+    def __init__(self, pool_registry=None, statement_cache=None):
+        super().__init__()
         self.connection = None
         self.cursor = None
-        self.is_connected = False
+        self.pool = None  # Shared pool when connected in pooled mode
+        self._query_builders = {}
+        self.query_timeout = None  # Seconds before the server aborts long reads (None = no limit)
+        
+        # Process-wide registry and statement cache, passed in by background threads that cannot reach st.cache_resource
+        self.pool_registry = pool_registry
+        self.statement_cache = statement_cache
         
-    def connect(self, host, port, database, username, password):
+    def connect(self, host, port, database, username, password, use_pool=True, driver_mode='auto'):
         """Establish connection to MySQL database with timeout and proper error handling"""
         try:
             # Close any existing connection first
             self.disconnect()
             
-            # Connection configuration with timeouts and SSL options
-            config = {
+            use_pure, driver_label = self.resolve_driver(driver_mode)
+            config = self._build_connection_config(host, port, database, username, password, use_pure)
+            self.connection_params = {
                 'host': host,
                 'port': port,
-                'user': username,
+                'database': database,
+                'username': username,
                 'password': password,
-                'autocommit': True,
-                'connection_timeout': 15,  # 15 seconds timeout
-                'connect_timeout': 15,
-                'raise_on_warnings': False,
-                'use_pure': True,  # Use pure Python implementation
-                'ssl_disabled': True,  # Disable SSL by default
-                'auth_plugin': 'mysql_native_password'  # Use native password authentication
+                'use_pool': use_pool,
+                'driver_mode': driver_mode
             }
             
-            # Add database if provided and not empty
-            if database and database.strip():
-                config['database'] = database
+            if use_pool:
+                return self._connect_pooled(config, driver_label)
             
-            # First attempt: Try without SSL
-            try:
-                self.connection = mysql.connector.connect(**config)
+            self.connection, config, ssl_mode = self._open_connection(config)
+            
+            if self.connection.is_connected():
+                self.cursor = self.connection.cursor(buffered=True)
+                self.is_connected = True
                 
-                if self.connection.is_connected():
-                    self.cursor = self.connection.cursor(buffered=True)
-                    self.is_connected = True
-                    
-                    # Test the connection with a simple query
-                    self.cursor.execute("SELECT 1")
-                    self.cursor.fetchall()
-                    
-                    return True, f"Successfully connected to MySQL database at {host}:{port} (SSL disabled)"
-                    
-            except mysql.connector.Error as ssl_error:
-                # If SSL-disabled connection fails, try with SSL enabled but not verified
-                if "SSL" in str(ssl_error) or "ssl" in str(ssl_error).lower():
-                    try:
-                        config.update({
-                            'ssl_disabled': False,
-                            'ssl_verify_cert': False,
-                            'ssl_verify_identity': False,
-                            'ssl_ca': None,
-                            'ssl_cert': None,
-                            'ssl_key': None
-                        })
-                        
-                        self.connection = mysql.connector.connect(**config)
-                        
-                        if self.connection.is_connected():
-                            self.cursor = self.connection.cursor(buffered=True)
-                            self.is_connected = True
-                            
-                            # Test the connection
-                            self.cursor.execute("SELECT 1")
-                            self.cursor.fetchall()
-                            
-                            return True, f"Successfully connected to MySQL database at {host}:{port} (SSL enabled, not verified)"
-                            
-                    except mysql.connector.Error:
-                        # If that also fails, try with specific SSL mode
-                        try:
-                            config.update({
-                                'ssl_disabled': False,
-                                'ssl_verify_cert': False,
-                                'ssl_verify_identity': False,
-                                'use_unicode': True,
-                                'charset': 'utf8mb4'
-                            })
-                            
-                            self.connection = mysql.connector.connect(**config)
-                            
-                            if self.connection.is_connected():
-                                self.cursor = self.connection.cursor(buffered=True)
-                                self.is_connected = True
-                                
-                                # Test the connection
-                                self.cursor.execute("SELECT 1")
-                                self.cursor.fetchall()
-                                
-                                return True, f"Successfully connected to MySQL database at {host}:{port} (SSL relaxed mode)"
-                                
-                        except mysql.connector.Error:
-                            pass
+                # Test the connection with a simple query
+                self.cursor.execute("SELECT 1")
+                self.cursor.fetchall()
                 
-                # Re-raise the original error if all SSL attempts fail
-                raise ssl_error
+                return True, f"Successfully connected to MySQL database at {host}:{port} ({ssl_mode}, {driver_label})"
             
             self.is_connected = False
             return False, "Failed to establish connection"
@@ -218,6 +630,205 @@ class MySQLConnector:
         except Exception as e:
             self.is_connected = False
             return False, f"Unexpected error: {str(e)}"
+    
+    @staticmethod
+    def resolve_driver(driver_mode='auto'):
+        """Choose the protocol implementation; returns (use_pure, label), falling back to pure Python without the C extension"""
+        if driver_mode == 'pure':
+            return True, "pure Python driver"
+        if MYSQL_CEXT_AVAILABLE:
+            return False, "C extension driver"
+        if driver_mode == 'c':
+            return True, "pure Python driver - C extension not installed"
+        return True, "pure Python driver"
+    
+    def _build_connection_config(self, host, port, database, username, password, use_pure=True):
+        """Build the mysql.connector configuration for a connection attempt"""
+        # Connection configuration with timeouts and SSL options
+        config = {
+            'host': host,
+            'port': port,
+            'user': username,
+            'password': password,
+            'autocommit': True,
+            'connection_timeout': 15,  # 15 seconds timeout
+            'connect_timeout': 15,
+            'raise_on_warnings': False,
+            'use_pure': use_pure,  # C extension unless pure Python was requested or it is missing
+            'ssl_disabled': True,  # Disable SSL by default
+            'auth_plugin': 'mysql_native_password'  # Use native password authentication
+        }
+        
+        # Add database if provided and not empty
+        if database and database.strip():
+            config['database'] = database
+        
+        return config
+    
+    @staticmethod
+    def _open_connection(config):
+        """Open a raw connection, falling back to relaxed SSL modes; returns (connection, working_config, ssl_mode)"""
+        config = dict(config)
+        
+        # First attempt: use the configuration as given
+        try:
+            connection = mysql.connector.connect(**config)
+            ssl_mode = "SSL disabled" if config.get('ssl_disabled') else "SSL enabled, not verified"
+            return connection, config, ssl_mode
+        
+        except mysql.connector.Error as ssl_error:
+            # Only SSL problems are worth retrying with different settings
+            if not ("SSL" in str(ssl_error) or "ssl" in str(ssl_error).lower()):
+                raise
+            
+            # If SSL-disabled connection fails, try with SSL enabled but not verified
+            try:
+                config.update({
+                    'ssl_disabled': False,
+                    'ssl_verify_cert': False,
+                    'ssl_verify_identity': False,
+                    'ssl_ca': None,
+                    'ssl_cert': None,
+                    'ssl_key': None
+                })
+                connection = mysql.connector.connect(**config)
+                return connection, config, "SSL enabled, not verified"
+                
+            except mysql.connector.Error:
+                # If that also fails, try with specific SSL mode
+                try:
+                    config.update({
+                        'ssl_disabled': False,
+                        'ssl_verify_cert': False,
+                        'ssl_verify_identity': False,
+                        'use_unicode': True,
+                        'charset': 'utf8mb4'
+                    })
+                    connection = mysql.connector.connect(**config)
+                    return connection, config, "SSL relaxed mode"
+                    
+                except mysql.connector.Error:
+                    pass
+            
+            # Re-raise the original error if all SSL attempts fail
+            raise ssl_error
+    
+    def _connect_pooled(self, config, driver_label):
+        """Attach this session to the process-wide pool for the connection parameters"""
+        start_time = time.perf_counter()
+        
+        # The password digest keeps sessions with different credentials on separate pools
+        password_digest = hashlib.sha256((config['password'] or "").encode('utf-8')).hexdigest()
+        pool_key = (config['host'], int(config['port']), config['user'], config.get('database', ''),
+                    password_digest, config['use_pure'])
+        pool_registry = self.pool_registry or get_connection_pool_registry()
+        pool = pool_registry.get_pool(pool_key, config, self._open_connection)
+        
+        # Borrow once to validate credentials and warm the pool
+        connection = pool.acquire()
+        pool.release(connection)
+        
+        self.pool = pool
+        self.is_connected = True
+        
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        stats = pool.stats()
+        return True, (f"Successfully connected to MySQL database at {config['host']}:{config['port']} "
+                      f"({stats['ssl_mode']}, {driver_label}, shared pool, {elapsed_ms:.0f} ms)")
+    
+    @contextmanager
+    def borrow_connection(self):
+        """Borrow a connection for the duration of a with-block"""
+        if self.pool is None:
+            yield self.connection
+            return
+        
+        connection = self.pool.acquire()
+        discard = False
+        try:
+            yield connection
+        except (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError):
+            # Broken connections must not go back into the pool
+            discard = True
+            raise
+        except Error:
+            # Server-side errors leave the connection usable
+            raise
+        except Exception:
+            # A failure while decoding rows can leave a result half-read on the wire
+            discard = True
+            raise
+        finally:
+            self.pool.release(connection, discard=discard)
+    
+    @contextmanager
+    def borrow_cursor(self, buffered=True):
+        """Borrow a cursor for the duration of a with-block"""
+        if self.pool is None and buffered and self.cursor is not None:
+            yield self.cursor
+            return
+        
+        with self.borrow_connection() as connection:
+            cursor = connection.cursor(buffered=buffered)
+            drain = True
+            try:
+                yield cursor
+            except Exception as e:
+                # Only drain after server-side errors; anything else discards the connection
+                drain = isinstance(e, Error) and not isinstance(
+                    e, (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError)
+                )
+                raise
+            finally:
+                try:
+                    # Unbuffered cursors may leave rows on the wire if the caller stopped early
+                    if drain:
+                        if not buffered:
+                            connection.consume_results()
+                        cursor.close()
+                except Exception:
+                    pass
+    
+    def limit_execution_time(self, query):
+        """Add a MAX_EXECUTION_TIME hint so the server aborts the SELECT after query_timeout seconds"""
+        query = query.lstrip()
+        if not self.query_timeout or query[:6].upper() != "SELECT":
+            return query
+        return f"SELECT /*+ MAX_EXECUTION_TIME({int(self.query_timeout * 1000)}) */" + query[6:]
+    
+    def kill_query(self, connection_id):
+        """Stop the statement running on another server connection; that connection stays open
+        
+        Uses a short-lived dedicated connection because the session's own connection (or every
+        pooled one) may be busy with the query being cancelled. Returns (success, message).
+        """
+        params = self.connection_params
+        if not params or connection_id is None:
+            return False, "No running query to cancel"
+        
+        try:
+            use_pure, _ = self.resolve_driver(params.get('driver_mode', 'auto'))
+            config = self._build_connection_config(params['host'], params['port'], params['database'],
+                                                   params['username'], params['password'], use_pure)
+            connection, _, _ = self._open_connection(config)
+            try:
+                cursor = connection.cursor()
+                cursor.execute(f"KILL QUERY {int(connection_id)}")
+                cursor.close()
+            finally:
+                connection.close()
+            return True, f"Cancelled query on connection {connection_id}"
+        except Error as e:
+            return False, f"Error cancelling query: {str(e)}"
+    
+    def get_cache_identity(self):
+        """Identify the server and database that locally cached data belongs to"""
+        params = self.connection_params or {}
+        return (params.get('host'), params.get('port'), params.get('database'))
+    
+    def get_pool_stats(self):
+        """Get usage statistics of the shared pool (None for direct connections)"""
+        return self.pool.stats() if self.pool is not None else None
         
     def disconnect(self):
         """Close database connection safely"""
@@ -228,22 +839,69 @@ class MySQLConnector:
             if hasattr(self, 'connection') and self.connection and self.connection.is_connected():
                 self.connection.close()
                 self.connection = None
+            # Pooled connections stay open for other sessions; idle eviction closes them
+            self.pool = None
             self.is_connected = False
             return True, "Disconnected from MySQL database"
         except Exception as e:
             self.is_connected = False
             return False, f"Error during disconnection: {str(e)}"
     
+    def get_schema_identity(self):
+        """Identify the server and user that cached schema metadata belongs to"""
+        params = self.connection_params or {}
+        return (params.get('host'), params.get('port'), params.get('username'))
+    
+    def invalidate_schema_cache(self, database=None):
+        """Forget cached schema metadata for this server (or only one of its databases)"""
+        get_schema_metadata_cache().invalidate(self.get_schema_identity(), database)
+        self._query_builders = {}
+    
+    def get_query_builder(self, table_name, columns_mapping):
+        """Get the validated query builder for a table and column mapping (validated once per mapping)"""
+        key = (
+            self.get_cache_identity(), table_name,
+            tuple((k, v) for k, v in columns_mapping.items() if v and v != "None")
+        )
+        builder = self._query_builders.get(key)
+        if builder is None:
+            builder = SensorQueryBuilder(self, table_name, columns_mapping)
+            self._query_builders[key] = builder
+        return builder
+    
+    def adopt_query_builder(self, builder, columns_mapping):
+        """Reuse a builder validated by another connector to the same database (skips the schema lookups)"""
+        key = (
+            self.get_cache_identity(), builder.table_name,
+            tuple((k, v) for k, v in columns_mapping.items() if v and v != "None")
+        )
+        self._query_builders[key] = builder
+    
+    def execute_prepared(self, query, params=()):
+        """Run a read through a prepared statement that is reused across calls on the same connection"""
+        with self.borrow_connection() as connection:
+            return (self.statement_cache or get_prepared_statement_cache()).execute(connection, query, params)
+    
     def get_databases(self):
         """Get list of available databases with error handling"""
         if not self.is_connected:
             return []
+        
+        schema_cache = get_schema_metadata_cache()
+        cache_key = (self.get_schema_identity(), 'databases')
+        cached = schema_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            self.cursor.execute("SHOW DATABASES")
-            databases = [db[0] for db in self.cursor.fetchall()]
+            with self.borrow_cursor() as cursor:
+                cursor.execute("SHOW DATABASES")
+                databases = [db[0] for db in cursor.fetchall()]
             # Filter out system databases for cleaner list
             system_dbs = ['information_schema', 'performance_schema', 'mysql', 'sys']
-            return [db for db in databases if db not in system_dbs]
+            databases = [db for db in databases if db not in system_dbs]
+            schema_cache.put(cache_key, databases)
+            return databases
         except mysql.connector.Error as e:
             st.error(f"Error fetching databases: {str(e)}")
             return []
@@ -255,17 +913,28 @@ class MySQLConnector:
         """Get list of tables in current database with error handling"""
         if not self.is_connected:
             return []
+        
+        schema_cache = get_schema_metadata_cache()
+        database = (self.connection_params or {}).get('database')
+        cache_key = (self.get_schema_identity(), 'tables', database)
+        if database:
+            cached = schema_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
-            # Check if a database is selected
-            self.cursor.execute("SELECT DATABASE()")
-            current_db = self.cursor.fetchone()[0]
-            
-            if not current_db:
-                st.warning("No database selected. Please select a database first.")
-                return []
-            
-            self.cursor.execute("SHOW TABLES")
-            tables = [table[0] for table in self.cursor.fetchall()]
+            with self.borrow_cursor() as cursor:
+                # Check if a database is selected
+                cursor.execute("SELECT DATABASE()")
+                current_db = cursor.fetchone()[0]
+                
+                if not current_db:
+                    st.warning("No database selected. Please select a database first.")
+                    return []
+                
+                cursor.execute("SHOW TABLES")
+                tables = [table[0] for table in cursor.fetchall()]
+            schema_cache.put((self.get_schema_identity(), 'tables', current_db), tables)
             return tables
         except mysql.connector.Error as e:
             error_msg = str(e)
@@ -282,19 +951,29 @@ class MySQLConnector:
         """Get list of columns in specified table with error handling"""
         if not self.is_connected:
             return []
+        
+        schema_cache = get_schema_metadata_cache()
+        database = (self.connection_params or {}).get('database')
+        if database:
+            cached = schema_cache.get((self.get_schema_identity(), 'columns', database, table_name))
+            if cached is not None:
+                return cached
+        
         try:
-            # Check if a database is selected
-            self.cursor.execute("SELECT DATABASE()")
-            current_db = self.cursor.fetchone()[0]
-            
-            if not current_db:
-                st.warning("No database selected. Please select a database first.")
-                return []
-            
-            # Use parameterized query to prevent SQL injection
-            query = f"DESCRIBE `{table_name}`"
-            self.cursor.execute(query)
-            columns = [column[0] for column in self.cursor.fetchall()]
+            with self.borrow_cursor() as cursor:
+                # Check if a database is selected
+                cursor.execute("SELECT DATABASE()")
+                current_db = cursor.fetchone()[0]
+                
+                if not current_db:
+                    st.warning("No database selected. Please select a database first.")
+                    return []
+                
+                # Use parameterized query to prevent SQL injection
+                query = f"DESCRIBE `{table_name}`"
+                cursor.execute(query)
+                columns = [column[0] for column in cursor.fetchall()]
+            schema_cache.put((self.get_schema_identity(), 'columns', current_db, table_name), columns)
             return columns
         except mysql.connector.Error as e:
             error_msg = str(e)
@@ -314,8 +993,9 @@ class MySQLConnector:
         if not self.is_connected:
             return None
         try:
-            self.cursor.execute("SELECT DATABASE()")
-            result = self.cursor.fetchone()
+            with self.borrow_cursor() as cursor:
+                cursor.execute("SELECT DATABASE()")
+                result = cursor.fetchone()
             return result[0] if result else None
         except Exception as e:
             st.error(f"Error getting current database: {str(e)}")
@@ -326,9 +1006,23 @@ class MySQLConnector:
         if not self.is_connected:
             return False, "Not connected to MySQL server"
         
+        # Reload table and column names of the target database
+        self.invalidate_schema_cache(database_name)
+        
+        # Pooled connections are shared, so switching means attaching to the pool of the other database
+        if self.pool is not None:
+            params = self.connection_params
+            success, message = self.connect(params['host'], params['port'], database_name,
+                                            params['username'], params['password'], use_pool=True,
+                                            driver_mode=params.get('driver_mode', 'auto'))
+            if success:
+                return True, f"Successfully switched to database: {database_name}"
+            return False, message
+        
         try:
             # Use the USE statement to switch database
             self.cursor.execute(f"USE `{database_name}`")
+            self.connection_params['database'] = database_name
             return True, f"Successfully switched to database: {database_name}"
         except mysql.connector.Error as e:
             error_msg = str(e)
@@ -349,8 +1043,9 @@ class MySQLConnector:
         try:
             # Try to get basic info about the table
             query = f"SELECT COUNT(*) FROM `{table_name}` LIMIT 1"
-            self.cursor.execute(query)
-            result = self.cursor.fetchone()
+            with self.borrow_cursor() as cursor:
+                cursor.execute(query)
+                result = cursor.fetchone()
             return True, f"Table '{table_name}' is accessible with {result[0]} total rows"
         except mysql.connector.Error as e:
             error_msg = str(e)
@@ -369,33 +1064,14 @@ class MySQLConnector:
             return None
         
         try:
-            # Build column selection
-            selected_columns = []
-            column_aliases = []
-            
-            for key, column in columns_mapping.items():
-                if column and column != "None":
-                    selected_columns.append(column)
-                    column_aliases.append(key)
-            
-            if not selected_columns:
+            builder = self.get_query_builder(table_name, columns_mapping)
+            if not builder.columns:
                 return None
             
-            # Build query
-            column_str = ", ".join(selected_columns)
-            query = f"SELECT {column_str} FROM {table_name}"
-            
-            # Add ordering by timestamp if specified
-            if order_by_timestamp and columns_mapping.get('timestamp'):
-                query += f" ORDER BY {columns_mapping['timestamp']} DESC"
-            
-            query += f" LIMIT {limit}"
-            
-            self.cursor.execute(query)
-            rows = self.cursor.fetchall()
+            rows = self.execute_prepared(builder.latest(order_by_timestamp), (int(limit),))
             
             # Convert to DataFrame
-            df = pd.DataFrame(rows, columns=column_aliases)
+            df = pd.DataFrame(rows, columns=builder.aliases)
             
             # Sort by timestamp ascending for proper time series analysis
             if 'timestamp' in df.columns:
@@ -406,6 +1082,9 @@ class MySQLConnector:
         except Error as e:
             st.error(f"Error fetching data: {str(e)}")
             return None
+        except ValueError as e:
+            st.error(f"Invalid table configuration: {str(e)}")
+            return None
     
     def get_real_time_data(self, table_name, columns_mapping, last_timestamp=None):
         """Get real-time data since last timestamp"""
@@ -413,37 +1092,18 @@ class MySQLConnector:
             return None
         
         try:
-            # Build column selection
-            selected_columns = []
-            column_aliases = []
-            
-            for key, column in columns_mapping.items():
-                if column and column != "None":
-                    selected_columns.append(column)
-                    column_aliases.append(key)
-            
-            if not selected_columns:
+            builder = self.get_query_builder(table_name, columns_mapping)
+            if not builder.columns:
                 return None
             
-            # Build query
-            column_str = ", ".join(selected_columns)
-            query = f"SELECT {column_str} FROM {table_name}"
-            
-            # Add timestamp filter for real-time data
-            if last_timestamp and columns_mapping.get('timestamp'):
-                query += f" WHERE {columns_mapping['timestamp']} > '{last_timestamp}'"
-            
-            # Order by timestamp
-            if columns_mapping.get('timestamp'):
-                query += f" ORDER BY {columns_mapping['timestamp']} ASC"
-            
-            query += " LIMIT 100"  # Limit for real-time updates
-            
-            self.cursor.execute(query)
-            rows = self.cursor.fetchall()
+            # Limit for real-time updates
+            if last_timestamp is not None and builder.timestamp:
+                rows = self.execute_prepared(builder.since(), (self._to_python_datetime(last_timestamp), 100))
+            else:
+                rows = self.execute_prepared(builder.latest(order_by_timestamp=False), (100,))
             
             if rows:
-                df = pd.DataFrame(rows, columns=column_aliases)
+                df = pd.DataFrame(rows, columns=builder.aliases)
                 return df
             else:
                 return None
@@ -451,122 +1111,753 @@ class MySQLConnector:
         except Error as e:
             st.error(f"Error fetching real-time data: {str(e)}")
             return None
+        except ValueError as e:
+            st.error(f"Invalid table configuration: {str(e)}")
+            return None
         
-    def get_data_by_date_range(self, table_name, columns_mapping, start_datetime, end_datetime, limit=10000):
-        """Retrieve data from database within specified date range"""
-        if not self.is_connected:
+    def get_fleet_latest_data(self, columns_mapping, machines, window=200, table_name=None, machine_column=None):
+        """Latest rows for many machines in a single round-trip
+        
+        With a machine_column, `machines` are ids filtered inside table_name; otherwise each
+        machine is its own table sharing the column mapping. Returns {machine: DataFrame},
+        oldest row first, with an empty frame for machines that returned no rows.
+        """
+        if not self.is_connected or not machines:
             return None
         
         try:
-            # Build column selection
-            selected_columns = []
-            column_aliases = []
-            
-            for key, column in columns_mapping.items():
-                if column and column != "None":
-                    selected_columns.append(column)
-                    column_aliases.append(key)
-            
-            if not selected_columns:
-                return None
-            
-            # Build query with date range filter
-            column_str = ", ".join(selected_columns)
-            timestamp_column = columns_mapping.get('timestamp')
-            
-            if not timestamp_column:
-                st.warning("No timestamp column specified for date range filtering")
-                return None
-            
-            query = f"""
-            SELECT {column_str} 
-            FROM {table_name} 
-            WHERE {timestamp_column} BETWEEN %s AND %s
-            ORDER BY {timestamp_column} ASC
-            LIMIT %s
-            """
-            
-            # Execute query with parameters
-            self.cursor.execute(query, (start_datetime, end_datetime, limit))
-            rows = self.cursor.fetchall()
-            
-            # Convert to DataFrame
-            if rows:
-                df = pd.DataFrame(rows, columns=column_aliases)
-                return df
+            if machine_column:
+                builder = self.get_query_builder(table_name, columns_mapping)
+                if not builder.columns:
+                    return None
+                query = builder.fleet_latest(machine_column, len(machines))
+                params = []
+                for machine in machines:
+                    params.extend((machine, int(window)))
+                labels = {str(machine): machine for machine in machines}
             else:
-                return pd.DataFrame(columns=column_aliases)
-                
+                builders = [self.get_query_builder(table, columns_mapping) for table in machines]
+                builder = builders[0]
+                if not builder.columns:
+                    return None
+                query = SensorQueryBuilder.union_latest(builders)
+                params = [int(window)] * len(machines)
+                labels = {str(position): machine for position, machine in enumerate(machines)}
+            
+            rows = self.execute_prepared(query, tuple(params))
         except Error as e:
-            st.error(f"Error fetching data by date range: {str(e)}")
+            st.error(f"Error fetching fleet data: {str(e)}")
             return None
-
-    def get_date_range_statistics(self, table_name, timestamp_column):
-        """Get statistics about available date ranges in the table"""
+        except ValueError as e:
+            st.error(f"Invalid table configuration: {str(e)}")
+            return None
+        
+        # Split the combined result back into one frame per machine
+        df = pd.DataFrame(rows, columns=['machine'] + builder.aliases)
+        df['machine'] = df['machine'].astype(str).map(labels)
+        fleet = {machine: df.iloc[0:0].drop(columns='machine') for machine in machines}
+        for machine, machine_df in df.groupby('machine', sort=False):
+            machine_df = machine_df.drop(columns='machine')
+            if 'timestamp' in machine_df.columns:
+                machine_df = machine_df.sort_values('timestamp')
+            fleet[machine] = machine_df.reset_index(drop=True)
+        return fleet
+    
+    def get_primary_key_column(self, table_name):
+        """Get the single-column primary key of a table (None if missing or composite)"""
         if not self.is_connected:
             return None
         
         try:
-            # Get basic date range info
-            stats_query = f"""
-            SELECT 
-                MIN({timestamp_column}) as min_date,
-                MAX({timestamp_column}) as max_date,
-                COUNT(*) as total_records,
-                COUNT(DISTINCT DATE({timestamp_column})) as unique_days
-            FROM {table_name}
-            WHERE {timestamp_column} IS NOT NULL
-            """
-            
-            self.cursor.execute(stats_query)
-            basic_stats = self.cursor.fetchone()
-            
-            if not basic_stats or not basic_stats[0]:
-                return None
-            
-            # Get daily distribution
-            daily_query = f"""
-            SELECT 
-                DATE({timestamp_column}) as date,
-                COUNT(*) as records_count,
-                MIN({timestamp_column}) as first_record,
-                MAX({timestamp_column}) as last_record
-            FROM {table_name}
-            WHERE {timestamp_column} IS NOT NULL
-            GROUP BY DATE({timestamp_column})
-            ORDER BY date DESC
-            LIMIT 30
-            """
-            
-            self.cursor.execute(daily_query)
-            daily_stats = self.cursor.fetchall()
-            
-            # Get hourly distribution for recent data
-            hourly_query = f"""
-            SELECT 
-                HOUR({timestamp_column}) as hour,
-                COUNT(*) as records_count
-            FROM {table_name}
-            WHERE {timestamp_column} >= DATE_SUB(NOW(), INTERVAL 7 DAY)
-            GROUP BY HOUR({timestamp_column})
-            ORDER BY hour
-            """
+            with self.borrow_cursor() as cursor:
+                cursor.execute("""
+                SELECT COLUMN_NAME
+                FROM information_schema.KEY_COLUMN_USAGE
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_NAME = 'PRIMARY'
+                ORDER BY ORDINAL_POSITION
+                """, (table_name,))
+                rows = cursor.fetchall()
+            return rows[0][0] if len(rows) == 1 else None
+        except Error:
+            return None
+    
+    @staticmethod
+    def _to_python_datetime(value):
+        """Convert pandas/NumPy timestamps into datetime objects the driver can bind"""
+        if value is None or isinstance(value, str):
+            return value
+        if isinstance(value, np.datetime64) or hasattr(value, 'to_pydatetime'):
+            return pd.Timestamp(value).to_pydatetime()
+        return value
+    
+    def init_tail_state(self, table_name, columns_mapping, last_timestamp):
+        """Create the keyset position for tail_real_time_data from the last row already loaded
+        
+        Without a last timestamp the tail starts after the newest row in the table, or at the
+        first row once an empty table receives data.
+        """
+        timestamp_column = columns_mapping.get('timestamp')
+        key_column = self.get_primary_key_column(table_name)
+        last_timestamp = self._to_python_datetime(last_timestamp)
+        last_key = None
+        seen = 0
+        
+        if timestamp_column:
+            try:
+                builder = self.get_query_builder(table_name, columns_mapping)
+                if last_timestamp is None:
+                    rows = self.execute_prepared(builder.newest_timestamp())
+                    last_timestamp = rows[0][0] if rows else None
+                
+                # Position after every row sharing the last timestamp that the caller already has
+                if last_timestamp is not None and key_column:
+                    rows = self.execute_prepared(builder.max_key_at(key_column), (last_timestamp,))
+                    last_key = rows[0][0] if rows else None
+                elif last_timestamp is not None:
+                    rows = self.execute_prepared(builder.count_at(), (last_timestamp,))
+                    seen = int(rows[0][0]) if rows else 0
+            except (Error, ValueError):
+                last_key = None
+        
+        return {
+            'table': table_name,
+            'mapping': tuple(sorted((k, v) for k, v in columns_mapping.items() if v)),
+            'timestamp': last_timestamp,
+            'key': last_key,
+            'key_column': key_column,
+            'seen': seen  # Rows at the last timestamp already read, skipped by keyless tails
+        }
+    
+    def tail_real_time_data(self, table_name, columns_mapping, tail_state, batch_size=500, max_batches=20):
+        """Drain rows newer than the (timestamp, primary key) keyset in bounded batches
+        
+        Uses a server-side prepared statement so every batch and poll re-executes the same
+        plan. Returns (DataFrame or None, new tail_state, info) where info reports rows,
+        batches, whether the tail caught up and the lag behind the newest row read.
+        """
+        new_data, new_state, info = self.drain_tail(table_name, columns_mapping, tail_state, batch_size, max_batches)
+        if info['error']:
+            st.error(info['error'])
+        return new_data, new_state, info
+    
+    def drain_tail(self, table_name, columns_mapping, tail_state, batch_size=500, max_batches=20):
+        """Same as tail_real_time_data but reports errors only through info
+        
+        Off the script thread, construct the connector with the pool registry and statement
+        cache and adopt a validated query builder first, so nothing here reaches st.
+        """
+        info = {'rows': 0, 'batches': 0, 'caught_up': True, 'lag_seconds': None, 'elapsed_ms': 0, 'error': None}
+        timestamp_column = columns_mapping.get('timestamp')
+        if not self.is_connected or not timestamp_column or tail_state is None:
+            return None, tail_state, info
+        
+        key_column = tail_state.get('key_column')
+        start_time = time.perf_counter()
+        last_timestamp = tail_state.get('timestamp')
+        last_key = tail_state.get('key')
+        seen = tail_state.get('seen', 0)
+        all_rows = []
+        
+        try:
+            builder = self.get_query_builder(table_name, columns_mapping)
+            column_aliases = builder.aliases
+            timestamp_index = column_aliases.index('timestamp')
+            statements = self.statement_cache or get_prepared_statement_cache()
             
-            self.cursor.execute(hourly_query)
-            hourly_stats = self.cursor.fetchall()
+            with self.borrow_connection() as connection:
+                for _ in range(max_batches):
+                    if last_timestamp is None:
+                        query, params = builder.head(key_column), (batch_size,)
+                    elif key_column:
+                        query, params = builder.tail(key_column), (last_timestamp, last_timestamp, last_key, batch_size)
+                    else:
+                        query, params = builder.tail(), (last_timestamp, seen + batch_size)
+                    rows = statements.execute(connection, query, params)
+                    info['batches'] += 1
+                    exhausted = len(rows) < params[-1]
+                    
+                    if not key_column and last_timestamp is not None:
+                        # Rows at the last timestamp sort first; skip the ones already read
+                        skip = 0
+                        while skip < min(seen, len(rows)) and rows[skip][timestamp_index] == last_timestamp:
+                            skip += 1
+                        rows = rows[skip:]
+                    
+                    if not rows:
+                        break
+                    
+                    all_rows.extend(rows)
+                    boundary = rows[-1][timestamp_index]
+                    if key_column:
+                        last_key = rows[-1][-1]
+                    else:
+                        at_boundary = 0
+                        for row in reversed(rows):
+                            if row[timestamp_index] != boundary:
+                                break
+                            at_boundary += 1
+                        seen = seen + at_boundary if boundary == last_timestamp else at_boundary
+                    last_timestamp = boundary
+                    
+                    if exhausted:
+                        break
+                else:
+                    # Hit max_batches with full batches: more rows are waiting
+                    info['caught_up'] = False
+        except Error as e:
+            info['error'] = f"Error tailing real-time data: {str(e)}"
+            return None, tail_state, info
+        except ValueError as e:
+            info['error'] = f"Invalid table configuration: {str(e)}"
+            return None, tail_state, info
+        
+        new_state = dict(tail_state, timestamp=last_timestamp, key=last_key, seen=seen)
+        info['rows'] = len(all_rows)
+        info['elapsed_ms'] = (time.perf_counter() - start_time) * 1000
+        if isinstance(last_timestamp, datetime):
+            info['lag_seconds'] = max(0.0, (datetime.now() - last_timestamp).total_seconds())
+        
+        if not all_rows:
+            return None, new_state, info
+        
+        if key_column:
+            all_rows = [row[:-1] for row in all_rows]
+        return pd.DataFrame(all_rows, columns=column_aliases), new_state, info
+    
+    def get_table_indexes(self, table_name):
+        """Get the indexes of a table from information_schema.STATISTICS as {index_name: info}"""
+        with self.borrow_cursor() as cursor:
+            cursor.execute("""
+            SELECT INDEX_NAME, COLUMN_NAME, CARDINALITY, NON_UNIQUE
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            ORDER BY INDEX_NAME, SEQ_IN_INDEX
+            """, (table_name,))
+            rows = cursor.fetchall()
+        
+        indexes = {}
+        for index_name, column_name, cardinality, non_unique in rows:
+            index = indexes.setdefault(index_name, {'columns': [], 'cardinality': None, 'unique': not int(non_unique)})
+            index['columns'].append(column_name)
+            index['cardinality'] = cardinality  # Cardinality of the longest prefix
+        return indexes
+    
+    def explain_query(self, query, params=()):
+        """Run EXPLAIN on a query with ? placeholders and return the plan rows as dicts"""
+        with self.borrow_connection() as connection:
+            cursor = connection.cursor(prepared=True)
+            try:
+                cursor.execute("EXPLAIN " + query, tuple(params))
+                rows = cursor.fetchall()
+                column_names = cursor.column_names
+            finally:
+                cursor.close()
+        return [dict(zip(column_names, row)) for row in rows]
+    
+    @staticmethod
+    def _recommended_index_sql(builder, timestamp_column):
+        """CREATE INDEX statement for the mapped timestamp column"""
+        index_name = f"idx_{builder.table_name}_{timestamp_column}"[:64]
+        return (f"CREATE INDEX {builder.quote(index_name)} ON {builder.table} ({builder.timestamp}) "
+                f"ALGORITHM=INPLACE LOCK=NONE")
+    
+    def advise_indexes(self, table_name, columns_mapping, sample_timestamp=None):
+        """Check that the timestamp column is indexed and EXPLAIN the connector's query shapes
+        
+        Returns a report with the table's indexes, one plan summary per query shape
+        (access type, key, estimated rows, filesort) and the recommended CREATE INDEX or None.
+        """
+        if not self.is_connected:
+            return None
+        
+        try:
+            builder = self.get_query_builder(table_name, columns_mapping)
+            timestamp_column = columns_mapping.get('timestamp')
+            if not builder.timestamp:
+                st.warning("No timestamp column specified for the index advisor")
+                return None
+            
+            indexes = self.get_table_indexes(table_name)
+            timestamp_indexes = [name for name, index in indexes.items() if index['columns'][0] == timestamp_column]
+            key_column = self.get_primary_key_column(table_name)
+            sample_timestamp = self._to_python_datetime(sample_timestamp) or datetime.now()
+            if isinstance(sample_timestamp, str):
+                sample_timestamp = pd.Timestamp(sample_timestamp).to_pydatetime()
+            
+            # The same statements the connector runs, with representative parameters
+            shapes = [
+                ("Latest rows", builder.latest(), (1000,)),
+                ("Real-time since", builder.since(), (sample_timestamp, 100)),
+                ("Keyset tail", builder.tail(key_column),
+                 (sample_timestamp, sample_timestamp, 0, 500) if key_column else (sample_timestamp, 500)),
+                ("Date range", builder.date_range(), (sample_timestamp - timedelta(days=1), sample_timestamp, 10000))
+            ]
+            
+            plans = []
+            for name, query, params in shapes:
+                plan_rows = self.explain_query(query, params)
+                table_rows = [row for row in plan_rows if row.get('table') in (table_name, None)] or plan_rows
+                first = table_rows[0] if table_rows else {}
+                extra = str(first.get('Extra') or '')
+                plans.append({
+                    'name': name,
+                    'access': first.get('type'),
+                    'key': first.get('key'),
+                    'rows': first.get('rows'),
+                    'full_scan': first.get('type') == 'ALL',
+                    'filesort': 'filesort' in extra.lower(),
+                    'extra': extra
+                })
             
             return {
-                'min_date': basic_stats[0],
-                'max_date': basic_stats[1],
-                'total_records': basic_stats[2],
-                'unique_days': basic_stats[3],
-                'daily_distribution': daily_stats,
-                'hourly_distribution': hourly_stats
+                'table': table_name,
+                'timestamp_column': timestamp_column,
+                'indexes': indexes,
+                'timestamp_indexes': timestamp_indexes,
+                'plans': plans,
+                'recommendation': None if timestamp_indexes else self._recommended_index_sql(builder, timestamp_column)
             }
             
+        except Error as e:
+            st.error(f"Error analyzing query plans: {str(e)}")
+            return None
+        except ValueError as e:
+            st.error(f"Invalid table configuration: {str(e)}")
+            return None
+    
+    def create_recommended_index(self, table_name, columns_mapping):
+        """Create the index recommended by advise_indexes on the mapped timestamp column"""
+        if not self.is_connected:
+            return False, "Not connected to MySQL server"
+        
+        try:
+            builder = self.get_query_builder(table_name, columns_mapping)
+            timestamp_column = columns_mapping.get('timestamp')
+            if not builder.timestamp:
+                return False, "No timestamp column mapped"
+            
+            if any(index['columns'][0] == timestamp_column for index in self.get_table_indexes(table_name).values()):
+                return True, f"Column '{timestamp_column}' is already indexed"
+            
+            with self.borrow_cursor() as cursor:
+                cursor.execute(self._recommended_index_sql(builder, timestamp_column))
+            return True, f"Created index on {table_name}({timestamp_column})"
+        except Error as e:
+            return False, f"Error creating index: {str(e)}"
+        except ValueError as e:
+            return False, f"Invalid table configuration: {str(e)}"
+    
+    def create_results_table(self, table_name, column_definitions, index_columns=()):
+        """Create a write-back table if it does not exist; column_definitions is a list of (name, SQL type)"""
+        if not self.is_connected:
+            return False, "Not connected to MySQL server"
+        
+        definitions = ["`id` BIGINT AUTO_INCREMENT PRIMARY KEY"]
+        definitions.extend(f"{SensorQueryBuilder.quote(name)} {sql_type}" for name, sql_type in column_definitions)
+        if index_columns:
+            definitions.append(f"INDEX `idx_{'_'.join(index_columns)}` "
+                               f"({', '.join(SensorQueryBuilder.quote(column) for column in index_columns)})")
+        query = f"CREATE TABLE IF NOT EXISTS {SensorQueryBuilder.quote(table_name)} ({', '.join(definitions)})"
+        try:
+            with self.borrow_cursor() as cursor:
+                cursor.execute(query)
+            self.invalidate_schema_cache()
+            return True, f"Results table '{table_name}' is ready"
+        except Error as e:
+            return False, f"Error creating results table: {str(e)}"
+    
+    def insert_rows(self, table_name, columns, rows):
+        """Insert many rows in one round-trip (the driver rewrites executemany into a multi-row INSERT)"""
+        if not self.is_connected:
+            return False, "Not connected to MySQL server"
+        if not rows:
+            return True, "Nothing to write"
+        
+        query = (
+            f"INSERT INTO {SensorQueryBuilder.quote(table_name)} "
+            f"({', '.join(SensorQueryBuilder.quote(column) for column in columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})"
+        )
+        try:
+            with self.borrow_cursor() as cursor:
+                cursor.executemany(query, rows)
+            return True, f"Wrote {len(rows)} rows to {table_name}"
+        except Error as e:
+            return False, f"Error writing to {table_name}: {str(e)}"
+    
+    def count_records_in_range(self, table_name, timestamp_column, start_datetime, end_datetime):
+        """Exact number of rows in a date range"""
+        if not self.is_connected:
+            return None
+        
+        try:
+            builder = self.get_query_builder(table_name, {'timestamp': timestamp_column})
+            rows = self.execute_prepared(self.limit_execution_time(builder.count_range()),
+                                         (start_datetime, end_datetime))
+            return int(rows[0][0]) if rows else 0
+        except Error as e:
+            st.error(f"Error counting records: {str(e)}")
+            return None
+        except ValueError as e:
+            st.error(f"Invalid table configuration: {str(e)}")
+            return None
+    
+    def estimate_records_in_range(self, table_name, timestamp_column, start_datetime, end_datetime,
+                                  data_bounds=None):
+        """Estimate the rows in a date range without counting them
+        
+        Tries the cached hourly histogram, then the optimizer's index-range estimate from
+        EXPLAIN, then TABLE_ROWS spread uniformly over the data's time span. Returns a dict
+        with 'estimate', 'error_bound', 'method', 'detail' and 'elapsed_ms'.
+        """
+        if not self.is_connected:
+            return None
+        
+        start_time = time.perf_counter()
+        try:
+            builder = self.get_query_builder(table_name, {'timestamp': timestamp_column})
+            estimate = get_date_statistics_cache().estimate_range(
+                self, table_name, timestamp_column, start_datetime, end_datetime
+            )
+            if estimate is None:
+                estimate = self._estimate_from_explain(builder, start_datetime, end_datetime)
+            if estimate is None:
+                estimate = self._estimate_from_table_rows(builder, start_datetime, end_datetime, data_bounds)
+        except Error as e:
+            st.error(f"Error estimating records: {str(e)}")
+            return None
+        except ValueError as e:
+            st.error(f"Invalid table configuration: {str(e)}")
+            return None
+        
+        if estimate is not None:
+            estimate['elapsed_ms'] = (time.perf_counter() - start_time) * 1000
+        return estimate
+    
+    def _estimate_from_explain(self, builder, start_datetime, end_datetime):
+        """Use the optimizer's row estimate when the range is resolved through an index"""
+        plan_rows = self.explain_query(builder.count_range(), (start_datetime, end_datetime))
+        if not plan_rows or plan_rows[0].get('type') != 'range' or plan_rows[0].get('rows') is None:
+            return None
+        
+        # Index dives are usually within a few percent; allow for the stale-statistics case
+        estimate = int(plan_rows[0]['rows'])
+        return {
+            'estimate': estimate,
+            'error_bound': int(np.ceil(estimate * 0.2)),
+            'method': "optimizer index estimate",
+            'detail': f"EXPLAIN range scan on {plan_rows[0].get('key')}"
+        }
+    
+    def _estimate_from_table_rows(self, builder, start_datetime, end_datetime, data_bounds=None):
+        """Spread information_schema TABLE_ROWS uniformly over the data's time span"""
+        with self.borrow_cursor() as cursor:
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                (builder.table_name,)
+            )
+            result = cursor.fetchone()
+            table_rows = int(result[0] or 0) if result else 0
+            
+            if data_bounds is None:
+                cursor.execute(f"SELECT MIN({builder.timestamp}), MAX({builder.timestamp}) FROM {builder.table}")
+                data_bounds = cursor.fetchone()
+        
+        if not table_rows or not data_bounds or data_bounds[0] is None:
+            return {'estimate': 0, 'error_bound': table_rows, 'method': "table statistics",
+                    'detail': "No rows reported by information_schema"}
+        
+        min_date, max_date = pd.Timestamp(data_bounds[0]), pd.Timestamp(data_bounds[1])
+        start, end = max(pd.Timestamp(start_datetime), min_date), min(pd.Timestamp(end_datetime), max_date)
+        span = (max_date - min_date).total_seconds()
+        fraction = 0.0 if end < start else ((end - start).total_seconds() / span if span > 0 else 1.0)
+        estimate = int(round(table_rows * fraction))
+        
+        # TABLE_ROWS itself is approximate for InnoDB and rows may not be spread evenly
+        return {
+            'estimate': estimate,
+            'error_bound': estimate,
+            'method': "table statistics",
+            'detail': f"{table_rows:,} rows (approx.) assumed uniform over {min_date} - {max_date}"
+        }
+    
+    def get_data_by_date_range(self, table_name, columns_mapping, start_datetime, end_datetime, limit=10000,
+                               streaming=False, chunk_size=5000):
+        """Retrieve data from database within specified date range"""
+        if not self.is_connected:
+            return None
+        
+        if streaming:
+            try:
+                result = None
+                for progress in self.iter_data_by_date_range(table_name, columns_mapping, start_datetime,
+                                                             end_datetime, limit=limit, chunk_size=chunk_size):
+                    if progress['done']:
+                        result = progress
+                return self.columns_to_dataframe(result['columns']) if result else None
+            except Error as e:
+                st.error(f"Error streaming data by date range: {str(e)}")
+                return None
+            except ValueError as e:
+                st.error(f"Invalid table configuration: {str(e)}")
+                return None
+        
+        try:
+            builder = self.get_query_builder(table_name, columns_mapping)
+            column_aliases = builder.aliases
+            if not builder.columns:
+                return None
+            
+            # Build query with date range filter
+            if not builder.timestamp:
+                st.warning("No timestamp column specified for date range filtering")
+                return None
+            
+            query = f"""
+            SELECT {builder.select_list} 
+            FROM {builder.table} 
+            WHERE {builder.timestamp} BETWEEN %s AND %s
+            ORDER BY {builder.timestamp} ASC
+            LIMIT %s
+            """
+            
+            # Execute query with parameters
+            with self.borrow_cursor() as cursor:
+                cursor.execute(self.limit_execution_time(query), (start_datetime, end_datetime, limit))
+                rows = cursor.fetchall()
+            
+            # Convert to DataFrame
+            if rows:
+                df = pd.DataFrame(rows, columns=column_aliases)
+                return df
+            else:
+                return pd.DataFrame(columns=column_aliases)
+                
+        except Error as e:
+            st.error(f"Error fetching data by date range: {str(e)}")
+            return None
+        except ValueError as e:
+            st.error(f"Invalid table configuration: {str(e)}")
+            return None
+
+    def iter_data_by_date_range(self, table_name, columns_mapping, start_datetime, end_datetime,
+                                limit=None, chunk_size=5000, dtype=np.float64):
+        """Stream a date range with an unbuffered cursor into preallocated NumPy column arrays
+        
+        Yields a progress dict after every fetchmany() chunk and finally a dict with
+        'done': True and 'columns' mapping each alias to its array. Sensor columns use
+        the requested float dtype (NULL -> NaN); the timestamp is int64 epoch nanoseconds.
+        Progress dicts carry 'columns' views of the rows loaded so far, so callers can use
+        partial data while the load continues. A query stopped by query_timeout ends the
+        stream with the rows already received and 'interrupted' set to the reason; closing
+        the generator early kills the server-side query.
+        """
+        if not self.is_connected:
+            return
+        
+        builder = self.get_query_builder(table_name, columns_mapping)
+        column_aliases = builder.aliases
+        if not builder.columns or not builder.timestamp:
+            return
+        
+        query = f"""
+        SELECT {builder.select_list} 
+        FROM {builder.table} 
+        WHERE {builder.timestamp} BETWEEN %s AND %s
+        ORDER BY {builder.timestamp} ASC
+        """
+        params = [start_datetime, end_datetime]
+        if limit:
+            query += " LIMIT %s"
+            params.append(int(limit))
+        query = self.limit_execution_time(query)
+        
+        # Preallocate column arrays and grow geometrically (never beyond the row limit)
+        capacity = min(int(limit), chunk_size * 8) if limit else chunk_size * 8
+        columns = {
+            alias: np.empty(capacity, dtype=np.int64 if alias == 'timestamp' else dtype)
+            for alias in column_aliases
+        }
+        rows_loaded = 0
+        chunks = 0
+        interrupted = None
+        start_time = time.perf_counter()
+        
+        with self.borrow_cursor(buffered=False) as cursor:
+            # Remember the server thread so an abandoned load can stop its query
+            cursor.execute("SELECT CONNECTION_ID()")
+            connection_id = cursor.fetchall()[0][0]
+            
+            executed = False
+            try:
+                while True:
+                    # The time limit can stop the query before the first row or in the middle of the stream
+                    try:
+                        if not executed:
+                            cursor.execute(query, params)
+                            executed = True
+                        rows = cursor.fetchmany(chunk_size)
+                    except Error as e:
+                        if e.errno not in QUERY_TIMEOUT_ERRNOS:
+                            raise
+                        interrupted = f"Query stopped after the {self.query_timeout:g} s time limit"
+                        break
+                    if not rows:
+                        break
+                    
+                    n_rows = len(rows)
+                    if rows_loaded + n_rows > capacity:
+                        capacity = max(capacity * 2, rows_loaded + n_rows)
+                        if limit:
+                            capacity = min(capacity, int(limit))
+                        for alias in column_aliases:
+                            grown = np.empty(capacity, dtype=columns[alias].dtype)
+                            grown[:rows_loaded] = columns[alias][:rows_loaded]
+                            columns[alias] = grown
+                    
+                    # Transpose the chunk once and convert each column in a single NumPy call
+                    for alias, values in zip(column_aliases, zip(*rows)):
+                        target = columns[alias][rows_loaded:rows_loaded + n_rows]
+                        if alias == 'timestamp':
+                            target[:] = np.array(values, dtype='datetime64[ns]').view(np.int64)
+                        else:
+                            target[:] = np.array(values, dtype=dtype)
+                    
+                    rows_loaded += n_rows
+                    chunks += 1
+                    
+                    elapsed = time.perf_counter() - start_time
+                    yield {
+                        'done': False,
+                        'rows_loaded': rows_loaded,
+                        'chunks': chunks,
+                        'rows_per_second': rows_loaded / elapsed if elapsed > 0 else 0,
+                        'progress': rows_loaded / limit if limit else None,
+                        'columns': {alias: array[:rows_loaded] for alias, array in columns.items()}
+                    }
+            except GeneratorExit:
+                # The consumer stopped early (cancelled load): stop the query so draining the cursor is quick
+                self.kill_query(connection_id)
+                raise
+        
+        yield {
+            'done': True,
+            'rows_loaded': rows_loaded,
+            'chunks': chunks,
+            'elapsed': time.perf_counter() - start_time,
+            'interrupted': interrupted,
+            'columns': {alias: array[:rows_loaded] for alias, array in columns.items()}
+        }
+    
+    @staticmethod
+    def columns_to_dataframe(columns):
+        """Wrap streamed column arrays in a DataFrame without per-row Python objects"""
+        frame_columns = {}
+        for alias, array in columns.items():
+            if alias == 'timestamp':
+                frame_columns[alias] = pd.to_datetime(array.view('datetime64[ns]'))
+            else:
+                frame_columns[alias] = array
+        return pd.DataFrame(frame_columns)
+
+    @staticmethod
+    def choose_bucket_seconds(start_datetime, end_datetime, target_points=2000):
+        """Pick a round bucket width so the range collapses to roughly target_points buckets"""
+        span_seconds = max((end_datetime - start_datetime).total_seconds(), 1)
+        raw_width = span_seconds / max(int(target_points), 1)
+        for width in (1, 2, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 21600, 43200, 86400):
+            if width >= raw_width:
+                return width
+        return int(np.ceil(raw_width / 86400)) * 86400
+
+    def get_aggregated_data_by_date_range(self, table_name, columns_mapping, start_datetime, end_datetime,
+                                          target_points=2000, bucket_seconds=None):
+        """Aggregate a date range server-side into per-bucket min/max/mean/RMS per sensor
+
+        Returns (DataFrame, bucket_seconds). The frame has one row per non-empty bucket with
+        'timestamp' (bucket start), 'samples' and '<sensor>_min/_max/_mean/_rms' columns.
+        """
+        if not self.is_connected:
+            return None, None
+
+        timestamp_column = columns_mapping.get('timestamp')
+        if not timestamp_column or timestamp_column == "None":
+            st.warning("No timestamp column specified for date range aggregation")
+            return None, None
+
+        sensor_columns = [
+            (key, column) for key, column in columns_mapping.items()
+            if key != 'timestamp' and column and column != "None"
+        ]
+        if not sensor_columns:
+            return None, None
+
+        if bucket_seconds is None:
+            bucket_seconds = self.choose_bucket_seconds(start_datetime, end_datetime, target_points)
+        bucket_seconds = int(bucket_seconds)
+
+        try:
+            builder = self.get_query_builder(table_name, columns_mapping)
+            
+            # Build per-sensor aggregates
+            aggregate_parts = []
+            result_columns = ['timestamp', 'samples']
+            for key, column in sensor_columns:
+                column = builder.quote_column(column)
+                aggregate_parts.append(
+                    f"MIN({column}), MAX({column}), AVG({column}), SQRT(AVG({column} * {column}))"
+                )
+                result_columns.extend([f"{key}_min", f"{key}_max", f"{key}_mean", f"{key}_rms"])
+
+            bucket_expr = f"FLOOR(UNIX_TIMESTAMP({builder.timestamp}) / {bucket_seconds})"
+            query = f"""
+            SELECT FROM_UNIXTIME({bucket_expr} * {bucket_seconds}) AS bucket_start,
+                   COUNT(*), {", ".join(aggregate_parts)}
+            FROM {builder.table}
+            WHERE {builder.timestamp} BETWEEN %s AND %s
+            GROUP BY {bucket_expr}
+            ORDER BY {bucket_expr} ASC
+            """
+
+            with self.borrow_cursor() as cursor:
+                cursor.execute(self.limit_execution_time(query), (start_datetime, end_datetime))
+                rows = cursor.fetchall()
+
+            if not rows:
+                return pd.DataFrame(columns=result_columns), bucket_seconds
+
+            df = pd.DataFrame(rows, columns=result_columns)
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            value_columns = result_columns[1:]
+            df[value_columns] = df[value_columns].apply(pd.to_numeric, errors='coerce')
+            return df, bucket_seconds
+
+        except Error as e:
+            st.error(f"Error aggregating data by date range: {str(e)}")
+            return None, None
+        except ValueError as e:
+            st.error(f"Invalid table configuration: {str(e)}")
+            return None, None
+
+    def get_date_range_statistics(self, table_name, timestamp_column, full_refresh=False):
+        """Get statistics about available date ranges in the table
+        
+        Served from the process-wide DateStatisticsCache: the first call per table aggregates
+        the whole table by hour, later calls only aggregate rows newer than the cached MAX(ts).
+        """
+        if not self.is_connected:
+            return None
+        
+        try:
+            return get_date_statistics_cache().get_statistics(
+                self, table_name, timestamp_column, full_refresh=full_refresh
+            )
         except Error as e:
             st.error(f"Error getting date statistics: {str(e)}")
             return None
+        except ValueError as e:
+            st.error(f"Invalid table configuration: {str(e)}")
+            return None
 
     def get_latest_data_with_date_filter(self, table_name, columns_mapping, start_datetime=None, end_datetime=None, limit=1000, order_by_timestamp=True):
         """Enhanced version of get_latest_data with optional date filtering"""
@@ -612,8 +1903,9 @@ class MySQLConnector:
             query += f" LIMIT %s"
             params.append(limit)
             
-            self.cursor.execute(query, params)
-            rows = self.cursor.fetchall()
+            with self.borrow_cursor() as cursor:
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
             
             # Convert to DataFrame
             if rows:
@@ -634,6 +1926,1908 @@ class MySQLConnector:
             st.error(f"Error fetching filtered data: {str(e)}")
             return None
 
+
+class LocalQueryBuilder(SensorQueryBuilder):
+    """SensorQueryBuilder with standard double-quoted identifiers for SQLite and DuckDB"""
+    
+    @staticmethod
+    def quote(identifier):
+        """Double-quote an identifier"""
+        return '"' + str(identifier).replace('"', '""') + '"'
+
+
+class LocalFileBackend(SensorDataBackend):
+    """Sensor tables in a local database file, opened read-only and read through the same API as MySQLConnector"""
+    
+    backend_name = "Local file"
+    driver_errors = ()
+    tables_query = None
+    columns_query = None  # One parameter: the table name
+    
+    def __init__(self):
+        super().__init__()
+        self.connection = None
+        self._lock = threading.Lock()  # One connection per file, used like a single cursor
+        self._tables = None
+        self._columns = {}
+        self._query_builders = {}
+    
+    @abstractmethod
+    def _open(self, path):
+        """Open the file read-only"""
+    
+    @abstractmethod
+    def _day_hour_sql(self, column):
+        """SQL expressions for the calendar date and hour of a timestamp column"""
+    
+    @abstractmethod
+    def _bucket_sql(self, column, bucket_seconds):
+        """SQL expression for the index of the fixed-width epoch bucket a timestamp falls in"""
+    
+    def _to_param(self, value):
+        """Convert a parameter into a type the driver can bind"""
+        if isinstance(value, np.generic) and not isinstance(value, np.datetime64):
+            return value.item()
+        return MySQLConnector._to_python_datetime(value)
+    
+    def connect(self, path):
+        """Open a database file read-only; returns (success, message)"""
+        self.disconnect()
+        if not path or not os.path.isfile(path):
+            return False, f"File not found: {path}"
+        
+        try:
+            self.connection = self._open(path)
+            self.connection_params = {
+                'path': path,
+                'database': os.path.splitext(os.path.basename(path))[0]
+            }
+            self.is_connected = True
+            tables = self.get_tables()
+            return True, f"Opened {self.backend_name} file {os.path.basename(path)} (read-only, {len(tables)} tables)"
+        except self.driver_errors as e:
+            self.disconnect()
+            return False, f"{self.backend_name} error: {str(e)}"
+    
+    def disconnect(self):
+        """Close the database file"""
+        try:
+            if self.connection is not None:
+                self.connection.close()
+            return True, f"Closed {self.backend_name} file"
+        except self.driver_errors as e:
+            return False, f"Error closing file: {str(e)}"
+        finally:
+            self.connection = None
+            self.is_connected = False
+            self.invalidate_schema_cache()
+    
+    def _fetch(self, query, params=()):
+        """Run a read on the file connection"""
+        with self._lock:
+            return self.connection.execute(query, [self._to_param(value) for value in params]).fetchall()
+    
+    @staticmethod
+    def _to_frame(rows, column_aliases):
+        """Build a DataFrame with a datetime timestamp column, whatever type the file stores it as"""
+        df = pd.DataFrame(rows, columns=column_aliases)
+        if 'timestamp' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+            # Text timestamps may mix whole-second and fractional rows, so parse each one as ISO 8601
+            df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce', format='ISO8601')
+        return df
+    
+    def get_databases(self):
+        """The open file is the only database"""
+        return [self.connection_params['database']] if self.is_connected else []
+    
+    def get_tables(self):
+        """Get list of tables in the file"""
+        if not self.is_connected:
+            return []
+        
+        if self._tables is None:
+            try:
+                self._tables = [row[0] for row in self._fetch(self.tables_query)]
+            except self.driver_errors as e:
+                st.error(f"Error fetching tables: {str(e)}")
+                return []
+        return self._tables
+    
+    def get_columns(self, table_name):
+        """Get list of columns for a specific table"""
+        if not self.is_connected:
+            return []
+        
+        if table_name not in self._columns:
+            try:
+                self._columns[table_name] = [row[0] for row in self._fetch(self.columns_query, (table_name,))]
+            except self.driver_errors as e:
+                st.error(f"Error fetching columns: {str(e)}")
+                return []
+        return self._columns[table_name]
+    
+    def invalidate_schema_cache(self, database=None):
+        """Forget cached table and column lists"""
+        self._tables = None
+        self._columns = {}
+        self._query_builders = {}
+    
+    def get_query_builder(self, table_name, columns_mapping):
+        """Get the validated query builder for a table and column mapping"""
+        key = (table_name, tuple((k, v) for k, v in columns_mapping.items() if v and v != "None"))
+        builder = self._query_builders.get(key)
+        if builder is None:
+            builder = LocalQueryBuilder(self, table_name, columns_mapping)
+            self._query_builders[key] = builder
+        return builder
+    
+    def _query_frame(self, table_name, columns_mapping, build_query, params, action):
+        """Run one of the builder's queries and return a DataFrame (None on error or without mapped columns)"""
+        if not self.is_connected:
+            return None
+        
+        try:
+            builder = self.get_query_builder(table_name, columns_mapping)
+            if not builder.columns:
+                return None
+            return self._to_frame(self._fetch(build_query(builder), params), builder.aliases)
+        except self.driver_errors as e:
+            st.error(f"Error {action}: {str(e)}")
+            return None
+        except ValueError as e:
+            st.error(f"Invalid table configuration: {str(e)}")
+            return None
+    
+    def get_latest_data(self, table_name, columns_mapping, limit=1000, order_by_timestamp=True):
+        """Retrieve latest data from the file"""
+        df = self._query_frame(table_name, columns_mapping, lambda builder: builder.latest(order_by_timestamp),
+                               (int(limit),), "fetching data")
+        if df is not None and 'timestamp' in df.columns:
+            df = df.sort_values('timestamp').reset_index(drop=True)
+        return df
+    
+    def get_real_time_data(self, table_name, columns_mapping, last_timestamp=None):
+        """Get real-time data since last timestamp"""
+        if last_timestamp is not None and columns_mapping.get('timestamp'):
+            df = self._query_frame(table_name, columns_mapping, lambda builder: builder.since(),
+                                   (last_timestamp, 100), "fetching real-time data")
+        else:
+            df = self._query_frame(table_name, columns_mapping, lambda builder: builder.latest(order_by_timestamp=False),
+                                   (100,), "fetching real-time data")
+        return df if df is not None and not df.empty else None
+    
+    def init_tail_state(self, table_name, columns_mapping, last_timestamp):
+        """Create the position for tail_real_time_data from the last row already loaded"""
+        seen = 0
+        if self.is_connected and columns_mapping.get('timestamp'):
+            try:
+                builder = self.get_query_builder(table_name, columns_mapping)
+                if last_timestamp is None:
+                    newest = self._to_frame(self._fetch(builder.newest_timestamp()), ['timestamp'])
+                    last_timestamp = newest['timestamp'].iloc[0] if not newest.empty else None
+                    if pd.isna(last_timestamp):
+                        last_timestamp = None
+                if last_timestamp is not None:
+                    rows = self._fetch(builder.count_at(), (last_timestamp,))
+                    seen = int(rows[0][0]) if rows else 0
+            except self.driver_errors + (ValueError,):
+                seen = 0
+        
+        return {
+            'table': table_name,
+            'mapping': tuple(sorted((k, v) for k, v in columns_mapping.items() if v)),
+            'timestamp': last_timestamp,
+            'key': None,
+            'key_column': None,
+            'seen': seen
+        }
+    
+    def tail_real_time_data(self, table_name, columns_mapping, tail_state, batch_size=500, max_batches=20):
+        """Drain rows newer than the last timestamp in bounded batches (same contract as MySQLConnector)"""
+        info = {'rows': 0, 'batches': 0, 'caught_up': True, 'lag_seconds': None, 'elapsed_ms': 0, 'error': None}
+        if not self.is_connected or not columns_mapping.get('timestamp') or tail_state is None:
+            return None, tail_state, info
+        
+        start_time = time.perf_counter()
+        last_timestamp = tail_state.get('timestamp')
+        seen = tail_state.get('seen', 0)
+        frames = []
+        try:
+            builder = self.get_query_builder(table_name, columns_mapping)
+            for _ in range(max_batches):
+                if last_timestamp is None:
+                    query, params = builder.head(), (batch_size,)
+                else:
+                    query, params = builder.tail(), (last_timestamp, seen + batch_size)
+                batch = self._to_frame(self._fetch(query, params), builder.aliases)
+                info['batches'] += 1
+                exhausted = len(batch) < params[-1]
+                
+                if last_timestamp is not None:
+                    # Rows at the last timestamp sort first; skip the ones already read
+                    at_last = (batch['timestamp'] == last_timestamp).to_numpy()
+                    skip = min(seen, len(batch) if at_last.all() else int(np.argmin(at_last)))
+                    batch = batch.iloc[skip:]
+                
+                if batch.empty:
+                    break
+                
+                frames.append(batch)
+                boundary = batch['timestamp'].iloc[-1]
+                at_boundary = int((batch['timestamp'] == boundary).sum())
+                seen = seen + at_boundary if boundary == last_timestamp else at_boundary
+                last_timestamp = boundary
+                if exhausted:
+                    break
+            else:
+                # Hit max_batches with full batches: more rows are waiting
+                info['caught_up'] = False
+        except self.driver_errors as e:
+            info['error'] = f"Error tailing real-time data: {str(e)}"
+            st.error(info['error'])
+            return None, tail_state, info
+        except ValueError as e:
+            info['error'] = f"Invalid table configuration: {str(e)}"
+            st.error(info['error'])
+            return None, tail_state, info
+        
+        new_state = dict(tail_state, timestamp=last_timestamp, seen=seen)
+        info['elapsed_ms'] = (time.perf_counter() - start_time) * 1000
+        if not frames:
+            return None, new_state, info
+        
+        new_data = pd.concat(frames, ignore_index=True)
+        info['rows'] = len(new_data)
+        if pd.notna(last_timestamp):
+            info['lag_seconds'] = max(0.0, (datetime.now() - pd.Timestamp(last_timestamp).to_pydatetime()).total_seconds())
+        return new_data, new_state, info
+    
+    def get_data_by_date_range(self, table_name, columns_mapping, start_datetime, end_datetime, limit=10000,
+                               streaming=False, chunk_size=5000):
+        """Retrieve data from the file within specified date range (local reads need no streaming)"""
+        if not columns_mapping.get('timestamp') or columns_mapping['timestamp'] == "None":
+            st.warning("No timestamp column specified for date range filtering")
+            return None
+        return self._query_frame(table_name, columns_mapping, lambda builder: builder.date_range(),
+                                 (start_datetime, end_datetime, int(limit)), "fetching data by date range")
+    
+    def get_aggregated_data_by_date_range(self, table_name, columns_mapping, start_datetime, end_datetime,
+                                          target_points=2000, bucket_seconds=None):
+        """Aggregate a date range into per-bucket min/max/mean/RMS per sensor (same frame as MySQLConnector)"""
+        if not self.is_connected:
+            return None, None
+        
+        timestamp_column = columns_mapping.get('timestamp')
+        if not timestamp_column or timestamp_column == "None":
+            st.warning("No timestamp column specified for date range aggregation")
+            return None, None
+        
+        sensor_columns = [
+            (key, column) for key, column in columns_mapping.items()
+            if key != 'timestamp' and column and column != "None"
+        ]
+        if not sensor_columns:
+            return None, None
+        
+        if bucket_seconds is None:
+            bucket_seconds = MySQLConnector.choose_bucket_seconds(start_datetime, end_datetime, target_points)
+        bucket_seconds = int(bucket_seconds)
+        
+        try:
+            builder = self.get_query_builder(table_name, columns_mapping)
+            
+            # Mean square in SQL and the root in NumPy: SQLite builds may lack SQRT()
+            aggregate_parts = []
+            result_columns = ['timestamp', 'samples']
+            for key, column in sensor_columns:
+                column = builder.quote_column(column)
+                aggregate_parts.append(f"MIN({column}), MAX({column}), AVG({column}), AVG({column} * {column})")
+                result_columns.extend([f"{key}_min", f"{key}_max", f"{key}_mean", f"{key}_rms"])
+            
+            bucket_expr = self._bucket_sql(builder.timestamp, bucket_seconds)
+            query = f"""
+            SELECT {bucket_expr} * {bucket_seconds}, COUNT(*), {", ".join(aggregate_parts)}
+            FROM {builder.table}
+            WHERE {builder.timestamp} BETWEEN ? AND ?
+            GROUP BY {bucket_expr}
+            ORDER BY {bucket_expr} ASC
+            """
+            rows = self._fetch(query, (start_datetime, end_datetime))
+        except self.driver_errors as e:
+            st.error(f"Error aggregating data by date range: {str(e)}")
+            return None, None
+        except ValueError as e:
+            st.error(f"Invalid table configuration: {str(e)}")
+            return None, None
+        
+        if not rows:
+            return pd.DataFrame(columns=result_columns), bucket_seconds
+        
+        df = pd.DataFrame(rows, columns=result_columns)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+        value_columns = result_columns[1:]
+        df[value_columns] = df[value_columns].apply(pd.to_numeric, errors='coerce')
+        rms_columns = [column for column in result_columns if column.endswith('_rms')]
+        df[rms_columns] = np.sqrt(df[rms_columns])
+        return df, bucket_seconds
+    
+    def get_date_range_statistics(self, table_name, timestamp_column, full_refresh=False):
+        """Get statistics about available date ranges with one grouped scan of the file"""
+        if not self.is_connected:
+            return None
+        
+        try:
+            builder = self.get_query_builder(table_name, {'timestamp': timestamp_column})
+            day_sql, hour_sql = self._day_hour_sql(builder.timestamp)
+            rows = self._fetch(
+                f"SELECT {day_sql}, {hour_sql}, COUNT(*), MIN({builder.timestamp}), MAX({builder.timestamp}) "
+                f"FROM {builder.table} WHERE {builder.timestamp} IS NOT NULL GROUP BY 1, 2"
+            )
+        except self.driver_errors as e:
+            st.error(f"Error getting date statistics: {str(e)}")
+            return None
+        except ValueError as e:
+            st.error(f"Invalid table configuration: {str(e)}")
+            return None
+        
+        # Same hourly buckets as the MySQL statistics cache, summarized the same way
+        buckets = {
+            (pd.Timestamp(day).date(), int(hour)): [
+                int(count), pd.Timestamp(first_record).to_pydatetime(), pd.Timestamp(last_record).to_pydatetime()
+            ]
+            for day, hour, count, first_record, last_record in rows
+        }
+        return DateStatisticsCache._summarize({'buckets': buckets})
+    
+    def count_records_in_range(self, table_name, timestamp_column, start_datetime, end_datetime):
+        """Exact number of rows in a date range"""
+        if not self.is_connected:
+            return None
+        
+        try:
+            builder = self.get_query_builder(table_name, {'timestamp': timestamp_column})
+            rows = self._fetch(builder.count_range(), (start_datetime, end_datetime))
+            return int(rows[0][0]) if rows else 0
+        except self.driver_errors as e:
+            st.error(f"Error counting records: {str(e)}")
+            return None
+        except ValueError as e:
+            st.error(f"Invalid table configuration: {str(e)}")
+            return None
+    
+    def estimate_records_in_range(self, table_name, timestamp_column, start_datetime, end_datetime,
+                                  data_bounds=None):
+        """Local files are scanned quickly enough to answer with the exact count"""
+        start_time = time.perf_counter()
+        count = self.count_records_in_range(table_name, timestamp_column, start_datetime, end_datetime)
+        if count is None:
+            return None
+        return {
+            'estimate': count,
+            'error_bound': 0,
+            'method': "exact count",
+            'detail': f"Counted in the local {self.backend_name} file",
+            'elapsed_ms': (time.perf_counter() - start_time) * 1000
+        }
+
+
+class SQLiteBackend(LocalFileBackend):
+    """SQLite database file; timestamps are expected as ISO-8601 text, as written by pandas.to_sql"""
+    
+    backend_name = "SQLite"
+    driver_errors = (sqlite3.Error,)
+    tables_query = "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    columns_query = "SELECT name FROM pragma_table_info(?) ORDER BY cid"
+    
+    def _open(self, path):
+        # Streamlit reruns a session on different threads; _fetch serializes access
+        return sqlite3.connect(f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro", uri=True, check_same_thread=False)
+    
+    def _day_hour_sql(self, column):
+        return f"date({column})", f"CAST(strftime('%H', {column}) AS INTEGER)"
+    
+    def _bucket_sql(self, column, bucket_seconds):
+        return f"(CAST(strftime('%s', {column}) AS INTEGER) / {bucket_seconds})"
+    
+    def _to_param(self, value):
+        """Bind timestamps as ISO-8601 text so they compare with the stored strings"""
+        if isinstance(value, (datetime, np.datetime64)):
+            return pd.Timestamp(value).isoformat(sep=' ')
+        return super()._to_param(value)
+
+
+class DuckDBBackend(LocalFileBackend):
+    """DuckDB database file for columnar scans over exported history"""
+    
+    backend_name = "DuckDB"
+    driver_errors = (duckdb.Error,) if DUCKDB_AVAILABLE else ()
+    tables_query = "SELECT table_name FROM information_schema.tables WHERE table_schema = current_schema() ORDER BY table_name"
+    columns_query = ("SELECT column_name FROM information_schema.columns "
+                     "WHERE table_schema = current_schema() AND table_name = ? ORDER BY ordinal_position")
+    
+    def _open(self, path):
+        return duckdb.connect(path, read_only=True)
+    
+    def _day_hour_sql(self, column):
+        return f"CAST({column} AS DATE)", f"hour({column})"
+    
+    def _bucket_sql(self, column, bucket_seconds):
+        return f"CAST(FLOOR(epoch({column}) / {bucket_seconds}) AS BIGINT)"
+
+
+# Storage backends selectable in the sidebar
+STORAGE_BACKENDS = {
+    'mysql': "MySQL Server",
+    'sqlite': "SQLite File",
+    'duckdb': "DuckDB File"
+}
+
+def create_storage_backend(kind):
+    """Create an unconnected backend of the given kind (None if its driver is not installed)"""
+    if kind == 'sqlite':
+        return SQLiteBackend()
+    if kind == 'duckdb':
+        return DuckDBBackend() if DUCKDB_AVAILABLE else None
+    return MySQLConnector() if MYSQL_AVAILABLE else None
+
+
+class SchemaMetadataCache:
+    """TTL cache of database, table and column names shared by all sessions"""
+    
+    def __init__(self, ttl_seconds=300):
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Get a cached name list, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                return None
+            return list(entry[0])
+    
+    def put(self, key, names):
+        """Cache a name list for ttl_seconds"""
+        with self._lock:
+            self._entries[key] = (list(names), time.monotonic() + self.ttl_seconds)
+    
+    def invalidate(self, identity, database=None):
+        """Drop cached names of a server (or only those of one database)"""
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] != identity:
+                    continue
+                if database is None or (len(key) > 2 and key[2] == database):
+                    del self._entries[key]
+
+
+@st.cache_resource
+def get_schema_metadata_cache():
+    """Process-wide schema metadata cache shared by all sessions"""
+    return SchemaMetadataCache()
+
+
+class DateStatisticsCache:
+    """Per-hour record counts for each (server, table, timestamp column), refreshed incrementally"""
+    
+    def __init__(self, min_refresh_seconds=5):
+        self.min_refresh_seconds = min_refresh_seconds
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+    
+    def _get_key_lock(self, key):
+        """One lock per table so concurrent sessions share a single refresh"""
+        with self._lock:
+            if key not in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+            return self._key_locks[key]
+    
+    def get_statistics(self, connector, table_name, timestamp_column, full_refresh=False):
+        """Refresh the cached buckets if due and summarize them like a full-table scan would"""
+        key = (connector.get_cache_identity(), table_name, timestamp_column)
+        
+        with self._get_key_lock(key):
+            entry = None if full_refresh else self._entries.get(key)
+            if entry is None:
+                entry = {'buckets': {}, 'max_ts': None, 'refreshed_at': 0.0}
+                self._aggregate_new_rows(connector, table_name, timestamp_column, entry)
+            elif time.monotonic() - entry['refreshed_at'] >= self.min_refresh_seconds:
+                self._aggregate_new_rows(connector, table_name, timestamp_column, entry)
+            
+            with self._lock:
+                self._entries[key] = entry
+            return self._summarize(entry)
+    
+    def _aggregate_new_rows(self, connector, table_name, timestamp_column, entry):
+        """Re-aggregate the newest cached hour and everything after it, replacing those buckets
+        
+        Counting from the start of the hour that holds the cached MAX(ts) (>=, not > MAX(ts))
+        picks up rows inserted later at that same timestamp and late rows elsewhere in the hour.
+        """
+        builder = connector.get_query_builder(table_name, {'timestamp': timestamp_column})
+        if entry['max_ts'] is None:
+            rows = connector.execute_prepared(builder.hourly_counts())
+        else:
+            newest_hour = entry['max_ts'].replace(minute=0, second=0, microsecond=0)
+            rows = connector.execute_prepared(builder.hourly_counts(incremental=True), (newest_hour,))
+        
+        buckets = entry['buckets']
+        for day, hour, count, first_record, last_record in rows:
+            first_record = pd.Timestamp(first_record).to_pydatetime()
+            last_record = pd.Timestamp(last_record).to_pydatetime()
+            buckets[(pd.Timestamp(day).date(), int(hour))] = [int(count), first_record, last_record]
+            if entry['max_ts'] is None or last_record > entry['max_ts']:
+                entry['max_ts'] = last_record
+        
+        entry['refreshed_at'] = time.monotonic()
+    
+    def estimate_range(self, connector, table_name, timestamp_column, start_datetime, end_datetime):
+        """Estimate the rows in [start, end] from the cached hourly buckets without querying MySQL
+        
+        Buckets inside the range count exactly; partially covered buckets are interpolated
+        linearly between their first and last row, and bound the error. A range reaching past
+        the newest cached row first aggregates the newer rows (at most every
+        min_refresh_seconds). None if not cached or the range lies wholly past the cached rows.
+        """
+        key = (connector.get_cache_identity(), table_name, timestamp_column)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        start = pd.Timestamp(start_datetime).to_pydatetime()
+        end = pd.Timestamp(end_datetime).to_pydatetime()
+        if entry['max_ts'] is None or end > entry['max_ts']:
+            with self._get_key_lock(key):
+                if time.monotonic() - entry['refreshed_at'] >= self.min_refresh_seconds:
+                    self._aggregate_new_rows(connector, table_name, timestamp_column, entry)
+            if entry['max_ts'] is None or start > entry['max_ts']:
+                return None  # Nothing cached covers the range; the caller falls back to EXPLAIN
+        estimate = 0.0
+        error_bound = 0.0
+        for count, first_record, last_record in list(entry['buckets'].values()):
+            if last_record < start or first_record > end:
+                continue
+            if first_record >= start and last_record <= end:
+                estimate += count
+                continue
+            span = (last_record - first_record).total_seconds()
+            overlap = (min(last_record, end) - max(first_record, start)).total_seconds()
+            partial = count * (overlap / span if span > 0 else 1.0)
+            estimate += partial
+            error_bound += max(partial, count - partial)
+        
+        return {
+            'estimate': int(round(estimate)),
+            'error_bound': int(np.ceil(error_bound)),
+            'method': "cached hourly histogram",
+            'detail': f"Rows up to {entry['max_ts']} (newer rows are not included)"
+        }
+    
+    @staticmethod
+    def _summarize(entry):
+        """Build the date range statistics from the hourly buckets"""
+        if not entry['buckets']:
+            return None
+        
+        days = {}
+        hourly = {}
+        recent_cutoff = datetime.now() - timedelta(days=7)
+        for (day, hour), (count, first_record, last_record) in entry['buckets'].items():
+            day_stats = days.get(day)
+            if day_stats is None:
+                days[day] = [count, first_record, last_record]
+            else:
+                day_stats[0] += count
+                day_stats[1] = min(day_stats[1], first_record)
+                day_stats[2] = max(day_stats[2], last_record)
+            if last_record >= recent_cutoff:
+                hourly[hour] = hourly.get(hour, 0) + count
+        
+        daily_stats = sorted(
+            ((day, count, first_record, last_record) for day, (count, first_record, last_record) in days.items()),
+            reverse=True
+        )
+        
+        return {
+            'min_date': min(stats[2] for stats in daily_stats),
+            'max_date': max(stats[3] for stats in daily_stats),
+            'total_records': sum(stats[1] for stats in daily_stats),
+            'unique_days': len(daily_stats),
+            'daily_distribution': daily_stats[:30],
+            'hourly_distribution': sorted(hourly.items())
+        }
+
+
+@st.cache_resource
+def get_date_statistics_cache():
+    """Process-wide date statistics cache shared by all sessions"""
+    return DateStatisticsCache()
+
+
+class HistoricalParquetCache:
+    """Size-bounded local Parquet cache of historical MySQL ranges, partitioned by table and day
+    
+    The manifest records which [start, end) intervals (epoch ns) of each dataset are
+    materialized on disk, so overlapping requests only fetch the missing sub-intervals.
+    Data newer than settle_seconds is returned but never marked as cached.
+    """
+    
+    DAY_NS = 86400 * 10**9
+    
+    def __init__(self, cache_dir, max_bytes=2 * 1024**3, settle_seconds=300):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.settle_seconds = settle_seconds
+        self.manifest_path = os.path.join(cache_dir, 'manifest.json')
+        self._lock = threading.RLock()
+        self._dataset_locks = {}
+        self._pinned = {}  # Fragment file -> number of loads reading it; eviction skips these
+        os.makedirs(cache_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+    
+    def _load_manifest(self):
+        """Load the interval manifest, starting empty if it is missing or unreadable"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == 1:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {'version': 1, 'datasets': {}}
+    
+    def _save_manifest(self):
+        """Atomically persist the manifest"""
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+    
+    @staticmethod
+    def dataset_key(identity, table_name, columns_mapping):
+        """Key a dataset by server/database, table and the mapped columns"""
+        active_mapping = sorted((k, c) for k, c in columns_mapping.items() if c and c != "None")
+        payload = json.dumps([list(identity), table_name, active_mapping], default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+    
+    def _get_dataset_lock(self, key):
+        """One lock per dataset so concurrent sessions never fetch the same gap twice"""
+        with self._lock:
+            if key not in self._dataset_locks:
+                self._dataset_locks[key] = threading.Lock()
+            return self._dataset_locks[key]
+    
+    @staticmethod
+    def _merge_intervals(intervals):
+        """Merge overlapping or touching [start, end) intervals"""
+        merged = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
+    
+    @staticmethod
+    def _subtract_interval(intervals, start, end):
+        """Remove [start, end) from a list of intervals"""
+        remaining = []
+        for iv_start, iv_end in intervals:
+            if iv_end <= start or iv_start >= end:
+                remaining.append([iv_start, iv_end])
+                continue
+            if iv_start < start:
+                remaining.append([iv_start, start])
+            if iv_end > end:
+                remaining.append([end, iv_end])
+        return remaining
+    
+    @staticmethod
+    def _split_range(intervals, start, end):
+        """Split [start, end) into ordered (start, end, cached) segments"""
+        segments = []
+        position = start
+        for iv_start, iv_end in intervals:
+            if iv_end <= position:
+                continue
+            if iv_start >= end:
+                break
+            if iv_start > position:
+                segments.append((position, iv_start, False))
+            segment_end = min(iv_end, end)
+            segments.append((max(iv_start, position), segment_end, True))
+            position = segment_end
+        if position < end:
+            segments.append((position, end, False))
+        return segments
+    
+    def _pin(self, fragments, delta):
+        """Mark fragments as being read (delta 1) or done (delta -1), lock held"""
+        for fragment in fragments:
+            count = self._pinned.get(fragment['file'], 0) + delta
+            if count > 0:
+                self._pinned[fragment['file']] = count
+            else:
+                self._pinned.pop(fragment['file'], None)
+    
+    def _drop_fragment(self, dataset, fragment):
+        """Delete a fragment file and forget the interval it covered"""
+        if fragment.get('file'):
+            try:
+                os.remove(os.path.join(self.cache_dir, fragment['file']))
+            except OSError:
+                pass
+        dataset['fragments'].remove(fragment)
+        dataset['intervals'] = self._subtract_interval(dataset['intervals'], fragment['start'], fragment['end'])
+    
+    def load_range(self, connector, table_name, columns_mapping, start_datetime, end_datetime,
+                   limit=None, progress_callback=None):
+        """Load an inclusive date range, serving cached intervals from disk and fetching only the gaps
+        
+        Returns (DataFrame, info) where info counts cached rows, fetched rows and fetched gaps.
+        If a gap fetch is stopped by the query time limit, the rows up to that point are
+        returned and info['interrupted'] holds the reason.
+        """
+        aliases = [key for key, column in columns_mapping.items() if column and column != "None"]
+        if 'timestamp' not in aliases:
+            return None, None
+        
+        key = self.dataset_key(connector.get_cache_identity(), table_name, columns_mapping)
+        start_ns = pd.Timestamp(start_datetime).value
+        end_ns = pd.Timestamp(end_datetime).value + 1000  # BETWEEN is inclusive at microsecond resolution
+        settled_ns = pd.Timestamp(datetime.now() - timedelta(seconds=self.settle_seconds)).value
+        remaining = int(limit) if limit else None
+        info = {'cached_rows': 0, 'fetched_rows': 0, 'gaps_fetched': 0, 'interrupted': None}
+        frames = []
+        
+        with self._get_dataset_lock(key):
+            with self._lock:
+                dataset = self.manifest['datasets'].setdefault(key, {
+                    'table': table_name,
+                    'aliases': aliases,
+                    'intervals': [],
+                    'fragments': []
+                })
+                # Files removed behind our back no longer count as cached
+                for fragment in list(dataset['fragments']):
+                    if not os.path.exists(os.path.join(self.cache_dir, fragment['file'])):
+                        self._drop_fragment(dataset, fragment)
+                segments = self._split_range(dataset['intervals'], start_ns, end_ns)
+                # Loads of other datasets may evict while we read: read a snapshot of pinned fragments
+                now = time.time()
+                fragments = [f for f in dataset['fragments'] if f['end'] > start_ns and f['start'] < end_ns]
+                for fragment in fragments:
+                    fragment['last_access'] = now
+                self._pin(fragments, 1)
+            
+            try:
+                for segment_start, segment_end, cached in segments:
+                    if cached:
+                        frame = self._read_segment(fragments, aliases, segment_start, segment_end)
+                        info['cached_rows'] += len(frame)
+                    else:
+                        frame, info['interrupted'] = self._fetch_segment(
+                            connector, table_name, columns_mapping, dataset, key,
+                            segment_start, segment_end, settled_ns, remaining, progress_callback
+                        )
+                        if frame is None:
+                            return None, info
+                        info['fetched_rows'] += len(frame)
+                        info['gaps_fetched'] += 1
+                    
+                    if remaining is not None:
+                        frame = frame.iloc[:remaining]
+                        remaining -= len(frame)
+                    frames.append(frame)
+                    # Later segments would leave a hole after an interrupted fetch
+                    if info['interrupted'] or (remaining is not None and remaining <= 0):
+                        break
+            finally:
+                with self._lock:
+                    self._pin(fragments, -1)
+                    self._enforce_size_limit()
+                    self._save_manifest()
+        
+        if not frames:
+            return pd.DataFrame(columns=aliases), info
+        return pd.concat(frames, ignore_index=True)[aliases], info
+    
+    def _read_segment(self, fragments, aliases, start_ns, end_ns):
+        """Read the cached rows of [start, end) from memory-mapped Parquet fragments (pinned by the caller)"""
+        pieces = []
+        start_ts, end_ts = pd.Timestamp(start_ns), pd.Timestamp(end_ns)
+        for fragment in fragments:
+            if fragment['end'] <= start_ns or fragment['start'] >= end_ns:
+                continue
+            table = pq.read_table(
+                os.path.join(self.cache_dir, fragment['file']),
+                columns=aliases,
+                memory_map=True,
+                filters=[('timestamp', '>=', start_ts), ('timestamp', '<', end_ts)]
+            )
+            pieces.append(table)
+        
+        if not pieces:
+            return pd.DataFrame(columns=aliases)
+        return pa.concat_tables(pieces).to_pandas()
+    
+    def _fetch_segment(self, connector, table_name, columns_mapping, dataset, key, start_ns, end_ns,
+                       settled_ns, limit, progress_callback):
+        """Fetch a missing interval from MySQL and materialize its settled part on disk
+        
+        Returns (DataFrame, interrupted) where interrupted is the reason a time-limited
+        fetch stopped early, or None.
+        """
+        result = None
+        stream = connector.iter_data_by_date_range(
+            table_name, columns_mapping,
+            pd.Timestamp(start_ns).to_pydatetime(), pd.Timestamp(end_ns - 1000).to_pydatetime(),
+            limit=limit
+        )
+        try:
+            for progress in stream:
+                if progress['done']:
+                    result = progress
+                elif progress_callback:
+                    progress_callback(progress)
+        finally:
+            # Cancels the server-side query if the callback interrupted the load
+            stream.close()
+        
+        if result is None:
+            return None, None
+        
+        columns = result['columns']
+        timestamps = columns['timestamp']
+        covered_end = min(end_ns, settled_ns)
+        if (result['interrupted'] or (limit and result['rows_loaded'] >= limit)) and len(timestamps):
+            # LIMIT or the time limit may have cut rows sharing the last timestamp
+            covered_end = min(covered_end, int(timestamps[-1]))
+        elif result['interrupted']:
+            covered_end = start_ns
+        
+        if covered_end > start_ns:
+            with self._lock:
+                self._store_fragments(dataset, key, columns, start_ns, covered_end)
+        
+        return connector.columns_to_dataframe(columns), result['interrupted']
+    
+    def _store_fragments(self, dataset, key, columns, start_ns, end_ns):
+        """Write [start, end) as one Parquet fragment per day and mark it as covered"""
+        timestamps = columns['timestamp']
+        safe_table = "".join(c if c.isalnum() or c in '_-' else '_' for c in dataset['table'])
+        now = time.time()
+        day_start = start_ns - start_ns % self.DAY_NS
+        
+        while day_start < end_ns:
+            lo = max(start_ns, day_start)
+            hi = min(end_ns, day_start + self.DAY_NS)
+            i0, i1 = np.searchsorted(timestamps, [lo, hi], side='left')
+            if i1 > i0:
+                day = pd.Timestamp(day_start).strftime('%Y-%m-%d')
+                relative_path = os.path.join(f"{safe_table}-{key}", f"date={day}", f"part-{lo}-{hi}.parquet")
+                path = os.path.join(self.cache_dir, relative_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                
+                arrays = {}
+                for alias, array in columns.items():
+                    chunk = array[i0:i1]
+                    arrays[alias] = pa.array(chunk.view('datetime64[ns]') if alias == 'timestamp' else chunk)
+                pq.write_table(pa.table(arrays), path)
+                
+                dataset['fragments'].append({
+                    'file': relative_path,
+                    'start': int(lo),
+                    'end': int(hi),
+                    'rows': int(i1 - i0),
+                    'bytes': os.path.getsize(path),
+                    'last_access': now
+                })
+            day_start += self.DAY_NS
+        
+        dataset['fragments'].sort(key=lambda fragment: fragment['start'])
+        dataset['intervals'] = self._merge_intervals(dataset['intervals'] + [[int(start_ns), int(end_ns)]])
+    
+    def _enforce_size_limit(self):
+        """Evict least recently used fragments until the cache fits in max_bytes (never ones being read)"""
+        entries = [
+            (fragment['last_access'], dataset, fragment)
+            for dataset in self.manifest['datasets'].values()
+            for fragment in dataset['fragments']
+        ]
+        total_bytes = sum(fragment['bytes'] for _, _, fragment in entries)
+        for _, dataset, fragment in sorted(entries, key=lambda entry: entry[0]):
+            if total_bytes <= self.max_bytes:
+                break
+            if fragment['file'] in self._pinned:
+                continue
+            total_bytes -= fragment['bytes']
+            self._drop_fragment(dataset, fragment)
+    
+    def stats(self):
+        """Get current cache size"""
+        with self._lock:
+            fragments = [f for dataset in self.manifest['datasets'].values() for f in dataset['fragments']]
+            return {
+                'datasets': len(self.manifest['datasets']),
+                'fragments': len(fragments),
+                'rows': sum(f['rows'] for f in fragments),
+                'bytes': sum(f['bytes'] for f in fragments),
+                'max_bytes': self.max_bytes
+            }
+    
+    def clear(self):
+        """Delete every cached fragment"""
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.manifest = {'version': 1, 'datasets': {}}
+            self._save_manifest()
+
+
+HISTORICAL_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".mysql_cache")
+
+
+@st.cache_resource
+def get_historical_cache():
+    """Process-wide local Parquet cache shared by all sessions"""
+    return HistoricalParquetCache(HISTORICAL_CACHE_DIR)
+
+
+SENSOR_CHANNELS = ('Fx', 'Fy', 'Fz', 'v0')
+
+
+class SensorRingBuffer:
+    """Fixed-capacity ring buffer of the real-time window: int64 timestamps plus one float64 row per channel
+    
+    Every row is written twice, at slot i and i + capacity of arrays twice the capacity long, so
+    the newest n rows are always one contiguous slice. append() costs O(new rows) however large
+    the buffer is, and window()/channel() return read-only views without copying. Views alias
+    slots that later appends overwrite, so they are valid only until the next append or resize;
+    copy them to keep rows longer. Timestamps are epoch nanoseconds; channels missing from the
+    loaded data read as NaN.
+    
+    `generation` is renewed, process-wide unique, whenever the rows are replaced instead of
+    appended (clear, load, copy_from, resize); with total_rows it identifies the contents of
+    the buffer's views even when a refill lands in the same slots.
+    """
+    
+    _generations = itertools.count(1)
+    
+    def __init__(self, capacity=1000, channels=SENSOR_CHANNELS):
+        self.channels = tuple(channels)
+        self._allocate(capacity)
+        self.total_rows = 0  # Rows appended since creation; positions for incremental readers
+        self.present = set()  # Channels that came with the data
+        self.source = None  # (publisher, position) while this buffer mirrors another one incrementally
+    
+    def _allocate(self, capacity):
+        self._capacity = max(int(capacity), 1)
+        self._timestamps = np.zeros(2 * self._capacity, dtype=np.int64)
+        self._values = np.full((len(self.channels), 2 * self._capacity), np.nan)
+        self._head = 0  # Slot the next row is written to
+        self._size = 0
+        self.generation = next(SensorRingBuffer._generations)
+    
+    def __len__(self):
+        return self._size
+    
+    @property
+    def capacity(self):
+        return self._capacity
+    
+    def clear(self):
+        """Drop all rows (the arrays are kept)"""
+        self._head = 0
+        self._size = 0
+        self.generation = next(SensorRingBuffer._generations)
+        self.present = set()
+        self.source = None
+    
+    def resize(self, capacity):
+        """Change the capacity, keeping the newest rows"""
+        capacity = max(int(capacity), 1)
+        if capacity == self._capacity:
+            return
+        timestamps, values = self._slice(min(self._size, capacity))
+        self._allocate(capacity)
+        self._write(timestamps, values)
+    
+    def load(self, frame):
+        """Replace the contents with the newest rows of a DataFrame with 'timestamp' and channel columns"""
+        self.clear()
+        self.append(frame)
+    
+    def append(self, frame):
+        """Append the rows of a DataFrame in O(len(frame))"""
+        if frame is None or frame.empty or 'timestamp' not in frame.columns:
+            return
+        self.source = None  # Rows from elsewhere end incremental mirroring
+        timestamps = pd.to_datetime(frame['timestamp']).to_numpy(dtype='datetime64[ns]').view(np.int64)
+        values = np.full((len(self.channels), len(frame)), np.nan)
+        for row, name in enumerate(self.channels):
+            if name in frame.columns:
+                values[row] = pd.to_numeric(frame[name], errors='coerce').to_numpy(dtype=np.float64)
+                self.present.add(name)
+        self.append_arrays(timestamps, values)
+    
+    def append_arrays(self, timestamps, values):
+        """Append timestamps (n,) and channel values (channels, n); only the newest capacity rows are kept"""
+        self.total_rows += len(timestamps)
+        self._write(timestamps, values)
+    
+    def _write(self, timestamps, values):
+        n_rows = len(timestamps)
+        if n_rows > self._capacity:
+            timestamps, values = timestamps[-self._capacity:], values[:, -self._capacity:]
+            n_rows = self._capacity
+        
+        slots = (self._head + np.arange(n_rows)) % self._capacity
+        for offset in (0, self._capacity):
+            self._timestamps[slots + offset] = timestamps
+            self._values[:, slots + offset] = values
+        self._head = (self._head + n_rows) % self._capacity
+        self._size = min(self._size + n_rows, self._capacity)
+    
+    def rows_since(self, position):
+        """Copy the rows appended after total_rows was `position`; None if they were already overwritten"""
+        n_rows = self.total_rows - position
+        if n_rows < 0 or n_rows > self._size:
+            return None
+        timestamps, values = self._slice(n_rows)
+        return timestamps.copy(), values.copy()
+    
+    def copy_from(self, other):
+        """Replace the contents with another buffer's newest rows"""
+        timestamps, values = other._slice(min(len(other), self._capacity))
+        self.clear()
+        self.present = set(other.present)
+        self._write(timestamps, values)
+    
+    def _slice(self, n_rows):
+        """Contiguous views of the newest n_rows"""
+        end = self._head + self._capacity
+        return self._timestamps[end - n_rows:end], self._values[:, end - n_rows:end]
+    
+    @staticmethod
+    def _read_only(view):
+        view.flags.writeable = False
+        return view
+    
+    def timestamps(self, n_rows=None):
+        """Read-only view of the newest timestamps (int64 epoch nanoseconds)"""
+        n_rows = self._size if n_rows is None else min(int(n_rows), self._size)
+        return self._read_only(self._slice(n_rows)[0])
+    
+    def channel(self, name, n_rows=None):
+        """Read-only view of the newest values of one channel"""
+        n_rows = self._size if n_rows is None else min(int(n_rows), self._size)
+        return self._read_only(self._slice(n_rows)[1][self.channels.index(name)])
+    
+    def window(self, n_rows=None):
+        """Read-only views of the newest rows: {'timestamp': ..., channel: ...} for the present channels"""
+        views = {'timestamp': self.timestamps(n_rows)}
+        for name in self.channels:
+            if name in self.present:
+                views[name] = self.channel(name, n_rows)
+        return views
+    
+    @property
+    def last_timestamp(self):
+        return pd.Timestamp(int(self._timestamps[self._head + self._capacity - 1])) if self._size else None
+    
+    def channel_frame(self, names, time_vector=None, n_rows=None):
+        """ChannelFrame over the newest rows; shares memory when the names are consecutive channels
+        
+        The frame records total_rows as its position and the buffer generation, so spectra
+        cached for it are never reused for the rows a later append or refill writes into the
+        same slots.
+        """
+        n_rows = self._size if n_rows is None else min(int(n_rows), self._size)
+        rows = [self.channels.index(name) for name in names]
+        values = self._slice(n_rows)[1]
+        if rows and rows == list(range(rows[0], rows[0] + len(rows))):
+            values = values[rows[0]:rows[0] + len(rows)]
+        else:
+            values = values[rows]
+        return ChannelFrame(names, values, time_vector, position=self.total_rows, generation=self.generation)
+    
+    def to_frame(self, n_rows=None):
+        """Copy the newest rows into a DataFrame (for display and seeding)"""
+        columns = self.window(n_rows)
+        frame = pd.DataFrame({name: np.array(view) for name, view in columns.items()})
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'])
+        return frame
+
+
+class ChannelFrame(Mapping):
+    """Aligned multi-channel signal block: one (channels x samples) float64 array on a shared time base
+    
+    Missing readings stay in place as NaN and are flagged in `valid` instead of being dropped
+    per axis, so every channel has the same length and lines up with time_vector. The frame is
+    also a read-only mapping of channel name -> valid samples (a view unless the channel has
+    gaps), so code written against {axis: signal} dicts keeps working.
+    """
+    
+    def __init__(self, names, data, time_vector=None, position=None, generation=None):
+        self.names = tuple(names)
+        self.data = np.asarray(data, dtype=np.float64).reshape(len(self.names), -1)
+        self.data.flags.writeable = False
+        self.valid = ~np.isnan(self.data)
+        self.complete = self.valid.all(axis=1)
+        self.time_vector = time_vector
+        self.position = position  # Ring buffer total_rows when the rows were read (None if not from a buffer)
+        self.generation = generation  # Ring buffer generation when the rows were read
+        self._rows = {name: row for row, name in enumerate(self.names)}
+        self._filled = {}  # Gap-filled copies by row tuple, so every consumer sees the same block
+    
+    @property
+    def cache_position(self):
+        """Identity of the buffer contents the rows were read from, for SpectrumCache (None if not from a buffer)"""
+        return None if self.position is None else (self.generation, self.position)
+    
+    @classmethod
+    def from_columns(cls, columns, names=None, time_vector=None):
+        """Stack equally long columns (arrays or Series, NaN for missing) into one block"""
+        names = list(columns) if names is None else list(names)
+        n_samples = len(columns[names[0]]) if names else 0
+        data = np.empty((len(names), n_samples), dtype=np.float64)
+        for row, name in enumerate(names):
+            data[row] = columns[name]
+        return cls(names, data, time_vector)
+    
+    def __getitem__(self, name):
+        row = self._rows[name]
+        return self.data[row] if self.complete[row] else self.data[row][self.valid[row]]
+    
+    def __iter__(self):
+        return iter(self.names)
+    
+    def __len__(self):
+        return len(self.names)
+    
+    @property
+    def n_samples(self):
+        return self.data.shape[1]
+    
+    def channel(self, name):
+        """Full aligned row of one channel (NaN where the reading is missing)"""
+        return self.data[self._rows[name]]
+    
+    def filled(self, names=None):
+        """Block of the given channels with gaps linearly interpolated along the sample axis
+        
+        Analysis runs on this block so spectra keep the shared time base. Consecutive complete
+        channels are returned as a view; blocks with gaps are copied once per frame and read-only.
+        """
+        rows = [self._rows[name] for name in (self.names if names is None else names)]
+        if tuple(rows) in self._filled:
+            return self._filled[tuple(rows)]
+        if rows and rows == list(range(rows[0], rows[0] + len(rows))):
+            block = self.data[rows[0]:rows[0] + len(rows)]
+        else:
+            block = self.data[rows]
+        if self.complete[rows].all():
+            return block
+        
+        block = np.array(block)
+        samples = np.arange(self.n_samples)
+        for values, valid in zip(block, self.valid[rows]):
+            if valid.any():
+                values[~valid] = np.interp(samples[~valid], samples[valid], values[valid])
+            else:
+                values[:] = 0.0
+        block.flags.writeable = False
+        self._filled[tuple(rows)] = block
+        return block
+
+
+class IngestWorker:
+    """Per-machine pipeline thread: tails one (connection, table, mapping), analyzes and publishes
+    
+    Reruns only take snapshot() of the status and sync_buffer() into their own ring buffer, which
+    copies just the rows published since the session's last sync, so rendering never waits on
+    MySQL. Sessions share the worker's AIAnalyzer; after every poll that brings new rows the
+    worker re-analyzes the window once per requested (channels, sampling rate, rows) and publishes the
+    result with the buffer, so viewers of the same machine get it from analysis_for() instead of
+    analyzing themselves. The worker stops by itself once no session has read a snapshot for
+    idle_timeout seconds.
+    
+    _lock only guards the buffer and the published state and is never held while analyzing, so
+    snapshot() and sync_buffer() stay fast; _analysis_lock serializes every use of the shared
+    analyzer, which keeps per-call state (such as its spectrum cache) and copy_analyzer() consistent.
+    Sessions never use the shared analyzer's spectrum cache from the script thread.
+    
+    The thread never touches st: the query builder, pool registry and statement cache are
+    resolved on the script thread and passed in, and errors are reported through info.
+    """
+    
+    def __init__(self, connection_params, table_name, columns_mapping, seed_data, last_timestamp,
+                 query_builder, pool_registry, statement_cache,
+                 buffer_rows=1000, poll_interval=1.0, batch_size=500, idle_timeout=120):
+        self.connection_params = dict(connection_params)
+        self.table_name = table_name
+        self.columns_mapping = dict(columns_mapping)
+        self.query_builder = query_builder
+        self.pool_registry = pool_registry
+        self.statement_cache = statement_cache
+        self.buffer_rows = int(buffer_rows)
+        self.poll_interval = float(poll_interval)
+        self.batch_size = int(batch_size)
+        self.idle_timeout = idle_timeout
+        
+        self._buffer = SensorRingBuffer(self.buffer_rows)
+        self._buffer.copy_from(seed_data)
+        self._last_timestamp = last_timestamp
+        self._tail_state = None
+        self._lock = threading.Lock()
+        self._analysis_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.version = 0
+        self.info = None
+        self.error = None
+        self.last_poll = None
+        self.last_read = time.monotonic()
+        self.analyzer = None
+        self.analyzer_generation = 0
+        self._analysis_requests = {}  # (channels, sampling rate, rows) -> last time a session asked for it
+        self._analyses = {}  # (channels, sampling rate, rows) -> (buffer position, analyzer generation, result)
+        self._thread = threading.Thread(
+            target=self._run, name=f"mysql-ingest-{table_name}", daemon=True
+        )
+    
+    def start(self):
+        """Start polling in the background"""
+        self._thread.start()
+    
+    def stop(self):
+        """Ask the worker to stop after the current poll"""
+        self._stop_event.set()
+    
+    def is_alive(self):
+        return self._thread.is_alive()
+    
+    def configure(self, buffer_rows=None, poll_interval=None, batch_size=None):
+        """Adjust settings from a session sharing this worker (the most demanding request wins)"""
+        with self._lock:
+            if buffer_rows:
+                self.buffer_rows = max(self.buffer_rows, int(buffer_rows))
+                self._buffer.resize(self.buffer_rows)
+            if poll_interval:
+                self.poll_interval = min(self.poll_interval, float(poll_interval))
+            if batch_size:
+                self.batch_size = max(self.batch_size, int(batch_size))
+    
+    def snapshot(self):
+        """Get the ingest status and the number of rows buffered"""
+        with self._lock:
+            self.last_read = time.monotonic()
+            return {
+                'rows': len(self._buffer),
+                'position': self._buffer.total_rows,
+                'version': self.version,
+                'last_timestamp': self._last_timestamp,
+                'info': self.info,
+                'error': self.error,
+                'last_poll': self.last_poll,
+                'running': self._thread.is_alive()
+            }
+    
+    def sync_buffer(self, buffer):
+        """Bring a session's ring buffer up to date with the worker's
+        
+        Only rows published since the buffer's previous sync are copied; a buffer that was
+        synced from elsewhere, changed since, or fell behind by more than the worker keeps
+        gets a full copy.
+        """
+        with self._lock:
+            source = buffer.source
+            rows = self._buffer.rows_since(source[1]) if source is not None and source[0] is self else None
+            if rows is None:
+                buffer.copy_from(self._buffer)
+            else:
+                buffer.append_arrays(*rows)
+            buffer.source = (self, self._buffer.total_rows)
+    
+    def attach_analyzer(self, analyzer):
+        """Get the machine's shared analyzer, adopting the caller's if the worker has none yet"""
+        with self._lock:
+            if self.analyzer is None:
+                self.analyzer = analyzer
+            return self.analyzer
+    
+    def set_analyzer(self, analyzer):
+        """Replace the shared analyzer (after training or reconfiguration); published results are dropped"""
+        with self._lock:
+            self.analyzer = analyzer
+            self.analyzer_generation += 1
+            self._analyses.clear()
+    
+    def copy_analyzer(self):
+        """Get a private copy of the shared analyzer, taken while no analysis is using it"""
+        with self._analysis_lock:
+            return copy.deepcopy(self.analyzer)
+    
+    def analyze(self, analyzer, signals, sampling_rate):
+        """Run one analysis with the shared analyzer to itself
+        
+        The analyzer's spectrum cache is emptied afterwards, so it never keeps a session's
+        buffers alive; sessions plot spectra with their own cache.
+        """
+        with self._analysis_lock:
+            try:
+                return analyzer.analyze_signals(signals, sampling_rate)
+            finally:
+                analyzer.spectrum_cache.clear()
+    
+    def analysis_for(self, signals, sampling_rate, position):
+        """Get the published analysis of a session's synced window, analyzing it here if none matches
+        
+        `signals` is the ChannelFrame the session built from its buffer at `position`. A result
+        computed here for the worker's current position is published for the other viewers.
+        """
+        key = (tuple(signals.names), float(sampling_rate), signals.n_samples)
+        with self._lock:
+            self._analysis_requests[key] = time.monotonic()
+            published = self._analyses.get(key)
+            if published is not None and published[:2] == (position, self.analyzer_generation):
+                return published[2]
+            analyzer, generation = self.analyzer, self.analyzer_generation
+        
+        result = self.analyze(analyzer, signals, sampling_rate)
+        with self._lock:
+            if position == self._buffer.total_rows and generation == self.analyzer_generation:
+                self._analyses[key] = (position, generation, result)
+        return result
+    
+    def _analysis_jobs(self):
+        """Copy the current window for every combination a session asked for recently (lock held)"""
+        jobs = []
+        now = time.monotonic()
+        for key, requested in list(self._analysis_requests.items()):
+            if now - requested > self.idle_timeout:
+                del self._analysis_requests[key]
+                self._analyses.pop(key, None)
+                continue
+            
+            names, sampling_rate, n_rows = key
+            if self.analyzer is None or not set(names) <= self._buffer.present:
+                continue
+            frame = self._buffer.channel_frame(names, n_rows=n_rows)
+            # Buffer views are only valid until the next append, which may happen while analyzing
+            frame = ChannelFrame(frame.names, frame.data.copy(), position=frame.position, generation=frame.generation)
+            jobs.append((key, frame, self.analyzer, self.analyzer_generation))
+        return jobs
+    
+    def _publish_analyses(self, jobs):
+        """Analyze the copied windows outside the buffer lock and publish results that are still current"""
+        for key, frame, analyzer, generation in jobs:
+            try:
+                result = self.analyze(analyzer, frame, key[1])
+            except Exception:
+                result = None  # The next viewer analyzes in its session and sees the error
+            with self._lock:
+                if result is None:
+                    self._analyses.pop(key, None)
+                elif frame.position == self._buffer.total_rows and generation == self.analyzer_generation:
+                    self._analyses[key] = (frame.position, generation, result)
+    
+    def _run(self):
+        connector = MySQLConnector(pool_registry=self.pool_registry, statement_cache=self.statement_cache)
+        try:
+            params = self.connection_params
+            success, message = connector.connect(
+                params['host'], params['port'], params['database'], params['username'], params['password'],
+                use_pool=params.get('use_pool', True), driver_mode=params.get('driver_mode', 'auto')
+            )
+            if not success:
+                with self._lock:
+                    self.error = message
+                return
+            connector.adopt_query_builder(self.query_builder, self.columns_mapping)
+            
+            while not self._stop_event.is_set():
+                if time.monotonic() - self.last_read > self.idle_timeout:
+                    break
+                try:
+                    self._poll_once(connector)
+                except Exception as e:
+                    with self._lock:
+                        self.error = f"Background ingest error: {str(e)}"
+                        self.last_poll = datetime.now()
+                self._stop_event.wait(self.poll_interval)
+        finally:
+            connector.disconnect()
+    
+    def _poll_once(self, connector):
+        """Drain new rows and publish a new buffer if any arrived"""
+        if self._tail_state is None:
+            self._tail_state = connector.init_tail_state(self.table_name, self.columns_mapping, self._last_timestamp)
+        
+        new_data, self._tail_state, info = connector.drain_tail(
+            self.table_name, self.columns_mapping, self._tail_state, batch_size=self.batch_size
+        )
+        
+        jobs = []
+        with self._lock:
+            if new_data is not None and not new_data.empty:
+                self._buffer.append(new_data)
+                self._last_timestamp = new_data['timestamp'].iloc[-1]
+                self.version += 1
+                jobs = self._analysis_jobs()
+            self.info = info
+            self.error = info['error']
+            self.last_poll = datetime.now()
+        self._publish_analyses(jobs)
+
+
+class IngestWorkerRegistry:
+    """Process-wide map of ingest workers keyed by (server, user, database, table, mapping)"""
+    
+    def __init__(self):
+        self._workers = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def worker_key(connector, table_name, columns_mapping):
+        return (
+            connector.get_schema_identity(), connector.get_cache_identity()[2], table_name,
+            tuple(sorted((k, v) for k, v in columns_mapping.items() if v and v != "None"))
+        )
+    
+    def get_worker(self, connector, table_name, columns_mapping, seed_data, last_timestamp, **settings):
+        """Get the running worker for this source, starting one seeded with the caller's buffer if needed"""
+        key = self.worker_key(connector, table_name, columns_mapping)
+        with self._lock:
+            worker = self._workers.get(key)
+            if worker is not None and worker.is_alive():
+                worker.configure(**settings)
+                return worker
+            
+            # Resolved here on the script thread; the worker thread must not reach st
+            worker = IngestWorker(connector.connection_params, table_name, columns_mapping, seed_data, last_timestamp,
+                                  connector.get_query_builder(table_name, columns_mapping),
+                                  get_connection_pool_registry(), get_prepared_statement_cache(), **settings)
+            self._workers[key] = worker
+            worker.start()
+            return worker
+    
+    def stats(self):
+        """Get the number of running workers"""
+        with self._lock:
+            return sum(1 for worker in self._workers.values() if worker.is_alive())
+
+
+@st.cache_resource
+def get_ingest_worker_registry():
+    """Process-wide ingest worker registry shared by all sessions"""
+    return IngestWorkerRegistry()
+
+
+class HealthResultsWriter:
+    """Buffers each analysis cycle's health scores and features and writes them to a MySQL table in batches
+    
+    Rows are flushed when batch_size rows are pending or flush_interval seconds have passed
+    since the last flush, so a monitoring session costs one INSERT per batch instead of one
+    per cycle. Rows that fail to write stay pending (up to max_pending) for the next flush.
+    """
+    
+    COLUMNS = [
+        ('recorded_at', "DATETIME(3) NOT NULL"),
+        ('machine_id', "VARCHAR(64) NOT NULL"),
+        ('data_source', "VARCHAR(32)"),
+        ('health_score', "DOUBLE"),
+        ('status', "VARCHAR(16)"),
+        ('anomaly', "TINYINT(1)"),
+        ('confidence', "DOUBLE"),
+        ('fx_score', "DOUBLE"),
+        ('fy_score', "DOUBLE"),
+        ('fz_score', "DOUBLE"),
+        ('v0_score', "DOUBLE"),
+        ('features', "JSON")
+    ]
+    AXIS_FEATURES = ['rms', 'peak', 'crest_factor', 'dominant_freq', 'mean_temp', 'max_temp', 'min_temp', 'temp_rise_rate']
+    
+    def __init__(self, table_name="health_results", batch_size=20, flush_interval=60, max_pending=2000):
+        self.table_name = table_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.last_error = None
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._ready_tables = set()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _finite(value):
+        """Plain float, or None for missing and non-finite values (JSON and MySQL reject NaN)"""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        return value if np.isfinite(value) else None
+    
+    @classmethod
+    def build_row(cls, machine_id, data_source, analysis_result, status, recorded_at=None):
+        """Flatten one analysis result into a row matching COLUMNS"""
+        axis_analysis = analysis_result.get("axis_analysis", {})
+        
+        # Feature vector: per-axis time/frequency features, fault indicators and the model's input vector
+        features = {}
+        for axis_key, analysis in axis_analysis.items():
+            for name in cls.AXIS_FEATURES:
+                if name in analysis:
+                    features[f"{axis_key}_{name}"] = cls._finite(analysis[name])
+            for name, value in analysis.get('fault_indicators', {}).items():
+                features[f"{axis_key}_{name}"] = cls._finite(value)
+        model_features = analysis_result.get("features", [])
+        if len(model_features) > 0:
+            features['model'] = [cls._finite(value) for value in model_features]
+        
+        def axis_score(axis_key):
+            return cls._finite(axis_analysis[axis_key].get('health_score')) if axis_key in axis_analysis else None
+        
+        return (
+            recorded_at or datetime.now(),
+            str(machine_id),
+            data_source,
+            cls._finite(analysis_result.get("health_score")),
+            status,
+            int(bool(analysis_result.get("anomaly"))),
+            cls._finite(analysis_result.get("confidence")),
+            axis_score('Fx'),
+            axis_score('Fy'),
+            axis_score('Fz'),
+            axis_score('v0'),
+            json.dumps(features)
+        )
+    
+    def add(self, connector, row):
+        """Queue a row and flush if the batch is full or the interval has passed; returns the flush message or None"""
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) > self.max_pending:
+                overflow = len(self._pending) - self.max_pending
+                del self._pending[:overflow]
+                self.rows_dropped += overflow
+            due = (len(self._pending) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        return self.flush(connector) if due else None
+    
+    def flush(self, connector):
+        """Write all pending rows in one batch; returns the result message"""
+        with self._lock:
+            rows = self._pending
+            self._pending = []
+            self._last_flush = time.monotonic()
+        if not rows:
+            return None
+        
+        if self.table_name not in self._ready_tables:
+            success, message = connector.create_results_table(self.table_name, self.COLUMNS,
+                                                              index_columns=('machine_id', 'recorded_at'))
+            if not success:
+                return self._requeue(rows, message)
+            self._ready_tables.add(self.table_name)
+        
+        success, message = connector.insert_rows(self.table_name, [name for name, _ in self.COLUMNS], rows)
+        if not success:
+            return self._requeue(rows, message)
+        
+        with self._lock:
+            self.rows_written += len(rows)
+            self.last_error = None
+        return message
+    
+    def _requeue(self, rows, message):
+        """Put unwritten rows back in front of anything queued meanwhile"""
+        with self._lock:
+            pending = rows + self._pending
+            overflow = max(0, len(pending) - self.max_pending)
+            self._pending = pending[overflow:]
+            self.rows_dropped += overflow
+            self.last_error = message
+        return message
+    
+    def stats(self):
+        """Get pending and written row counts"""
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'written': self.rows_written,
+                'dropped': self.rows_dropped,
+                'last_error': self.last_error
+            }
+
+
+class ResultsWindowGate:
+    """Last analyzed window written per results series, so each window becomes one results row
+    
+    Reruns without new data and every session viewing the same machine analyze the same
+    window; only the first to claim it queues a row.
+    """
+    
+    def __init__(self):
+        self._last_window = {}
+        self._lock = threading.Lock()
+    
+    def claim(self, series, window):
+        """Whether `window` is new for the series; a new window is marked as written"""
+        with self._lock:
+            if self._last_window.get(series) == window:
+                return False
+            self._last_window[series] = window
+            return True
+
+
+@st.cache_resource
+def get_results_window_gate():
+    """Process-wide results window gate shared by all sessions"""
+    return ResultsWindowGate()
+
+
+class HealthHistoryTier:
+    """Time-bounded archive of one series' health score at a fixed step
+    
+    The score recorded at time t is consolidated into bucket t // step together with its count,
+    sum, min, max and worst status. Buckets are kept in time order in columns that grow as they
+    fill, and buckets more than retention older than the newest are dropped, so memory follows
+    what was actually recorded. Reading a window is a binary search over the buckets.
+    """
+    
+    COLUMNS = (
+        ('bucket', np.int64), ('count', np.int64), ('total', np.float64),
+        ('low', np.float64), ('high', np.float64), ('worst', np.int8)  # worst indexes HEALTH_STATUSES
+    )
+    
+    def __init__(self, step_ns, retention_ns, capacity=64):
+        self.step_ns = int(step_ns)
+        self.retention_ns = int(retention_ns)
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS}
+        self._start = 0
+        self._end = 0
+    
+    def __len__(self):
+        return self._end - self._start
+    
+    def _column(self, name):
+        return self._columns[name][self._start:self._end]
+    
+    @property
+    def newest_ns(self):
+        return int(self._columns['bucket'][self._end - 1]) * self.step_ns if len(self) else None
+    
+    def covers(self, start_ns):
+        """Whether every score recorded since start_ns is still held"""
+        return len(self) > 0 and start_ns >= self.newest_ns - self.retention_ns
+    
+    def record(self, timestamp_ns, value, status_code):
+        """Fold one score into its bucket; scores older than the newest bucket are ignored"""
+        bucket = timestamp_ns // self.step_ns
+        columns = self._columns
+        if len(self):
+            last = self._end - 1
+            if bucket < columns['bucket'][last]:
+                return
+            if bucket == columns['bucket'][last]:
+                columns['count'][last] += 1
+                columns['total'][last] += value
+                columns['low'][last] = min(columns['low'][last], value)
+                columns['high'][last] = max(columns['high'][last], value)
+                columns['worst'][last] = max(columns['worst'][last], status_code)
+                return
+        
+        if self._end == len(columns['bucket']):
+            # Grow, or just compact when most of the columns hold dropped buckets
+            size = len(self)
+            for name, dtype in self.COLUMNS:
+                column = np.zeros(max(2 * size, 64), dtype=dtype)
+                column[:size] = self._column(name)
+                columns[name] = column
+            self._start, self._end = 0, size
+        
+        row = self._end
+        columns['bucket'][row] = bucket
+        columns['count'][row] = 1
+        columns['total'][row] = value
+        columns['low'][row] = value
+        columns['high'][row] = value
+        columns['worst'][row] = status_code
+        self._end += 1
+        self._prune()
+    
+    def _prune(self):
+        """Drop the buckets that fell out of the retention window"""
+        oldest = -(-(self.newest_ns - self.retention_ns) // self.step_ns)
+        self._start += int(np.searchsorted(self._column('bucket'), oldest, side='left'))
+    
+    def query(self, start_ns, end_ns, max_rows=None):
+        """Columns (timestamp ns, mean, min, max, count, worst status code) of the buckets between start and end
+        
+        Returns copies, or None when more than max_rows buckets fall in the window.
+        """
+        buckets = self._column('bucket')
+        first = np.searchsorted(buckets, start_ns // self.step_ns, side='left')
+        last = np.searchsorted(buckets, end_ns // self.step_ns, side='right')
+        if max_rows is not None and last - first > max_rows:
+            return None
+        part = {name: self._column(name)[first:last].copy() for name, _ in self.COLUMNS}
+        return (part['bucket'] * self.step_ns, part['total'] / part['count'], part['low'], part['high'],
+                part['count'], part['worst'])
+    
+    def arrays(self, prefix):
+        return {f'{prefix}_{name}': self._column(name) for name, _ in self.COLUMNS}
+    
+    def restore(self, arrays, prefix):
+        """Adopt persisted columns, in bucket order and without unused slots"""
+        buckets = arrays[f'{prefix}_bucket'].astype(np.int64)
+        order = np.argsort(buckets, kind='stable')
+        order = order[buckets[order] >= 0]
+        self._columns = {name: arrays[f'{prefix}_{name}'].astype(dtype)[order] for name, dtype in self.COLUMNS}
+        self._start, self._end = 0, len(order)
+        if len(order):
+            self._prune()
+
+
+HEALTH_STATUSES = ("HEALTHY", "WARNING", "CRITICAL")  # Ordered from best to worst
+
+
+class HealthHistoryStore:
+    """Persistent multi-resolution health-score history, one set of columnar arrays per machine and data source
+    
+    Every score and status is kept raw for 24 hours and consolidated into 1-minute buckets for
+    30 days and 1-hour buckets for ten years (HealthHistoryTier, bounded by time and grown as
+    scores arrive). Series changed since their last save are written to one compressed .npz
+    file each, at most every flush_seconds. query() picks the finest tier that holds the whole
+    window and returns at most max_points points, so a chart costs the same at any zoom level.
+    
+    record() takes a digest of the analyzed window and skips a window it has just recorded,
+    so reruns and other sessions showing the same data add one point between them.
+    """
+    
+    RAW_RETENTION_SECONDS = 86400
+    TIERS = (  # (name, step seconds, retention seconds)
+        ('1 minute', 60, 30 * 86400),
+        ('1 hour', 3600, 10 * 366 * 86400)
+    )
+    
+    def __init__(self, history_dir, max_points=2000, flush_seconds=60):
+        self.history_dir = history_dir
+        self.max_points = max_points
+        self.flush_seconds = flush_seconds
+        self._machines = {}
+        self._last_flush = {}
+        self._dirty = set()  # Series with scores not yet written to disk
+        self._last_window = {}  # Digest of the window each series recorded last
+        self._lock = threading.Lock()
+        os.makedirs(history_dir, exist_ok=True)
+    
+    def _path(self, series):
+        safe_id = hashlib.sha256(json.dumps([str(part) for part in series]).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.history_dir, f'{safe_id}.npz')
+    
+    def _machine(self, series):
+        """Get the tiers of a (machine id, data source) series, loading them from disk on first use"""
+        if series not in self._machines:
+            raw = HealthHistoryTier(1, self.RAW_RETENTION_SECONDS * 10**9)
+            tiers = {name: HealthHistoryTier(step * 10**9, retention * 10**9) for name, step, retention in self.TIERS}
+            try:
+                with np.load(self._path(series)) as arrays:
+                    raw.restore(arrays, 'raw')
+                    for index, name in enumerate(tiers):
+                        tiers[name].restore(arrays, f'tier{index}')
+            except (OSError, KeyError, ValueError):
+                pass
+            self._machines[series] = {'raw': raw, 'tiers': tiers}
+            self._last_flush[series] = time.time()
+        return self._machines[series]
+    
+    @staticmethod
+    def window_digest(signals):
+        """Digest of an analyzed window's samples (a ChannelFrame or a dict of arrays)"""
+        digest = hashlib.blake2b(digest_size=16)
+        for name in signals:
+            digest.update(str(name).encode('utf-8'))
+            digest.update(np.ascontiguousarray(signals[name], dtype=np.float64))
+        return digest.digest()
+    
+    def record(self, machine_id, data_source, timestamp, health_score, status, window=None):
+        """Add one score to every tier of the series and persist it if the flush interval has passed
+        
+        `window` is the window_digest() of the analyzed samples; the score is skipped when the
+        series recorded the same window last. Returns whether a point was added.
+        """
+        series = (machine_id, data_source)
+        timestamp_ns = pd.Timestamp(timestamp).value
+        value = float(health_score)
+        status_code = HEALTH_STATUSES.index(status)
+        with self._lock:
+            if window is not None and self._last_window.get(series) == window:
+                return False
+            machine = self._machine(series)
+            raw = machine['raw']
+            if len(raw) and timestamp_ns < raw.newest_ns:
+                return False  # Clock went backwards; keep the raw tier sorted
+            self._last_window[series] = window
+            raw.record(timestamp_ns, value, status_code)
+            for tier in machine['tiers'].values():
+                tier.record(timestamp_ns, value, status_code)
+            self._dirty.add(series)
+            if time.time() - self._last_flush[series] >= self.flush_seconds:
+                self._save(series)
+        return True
+    
+    def _save(self, series):
+        """Atomically write one series' arrays, compressed"""
+        machine = self._machines[series]
+        arrays = machine['raw'].arrays('raw')
+        for index, tier in enumerate(machine['tiers'].values()):
+            arrays.update(tier.arrays(f'tier{index}'))
+        path = self._path(series)
+        tmp_path = path + '.tmp.npz'
+        try:
+            np.savez_compressed(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+            self._dirty.discard(series)
+        except OSError:
+            pass
+        self._last_flush[series] = time.time()
+    
+    def flush(self):
+        """Persist every series with unsaved scores now"""
+        with self._lock:
+            for series in list(self._dirty):
+                self._save(series)
+    
+    @staticmethod
+    def _frame(columns):
+        timestamps, mean, low, high, count, worst = columns
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(timestamps), 'health_score': mean, 'min': low, 'max': high, 'count': count,
+            'status': np.array(HEALTH_STATUSES, dtype=object)[worst.astype(np.int64)]
+        })
+    
+    def query(self, machine_id, data_source, start, end):
+        """Health scores of a series between start and end from the tier that fits the window
+        
+        Returns (DataFrame with timestamp/health_score/min/max/count/status, tier name), where
+        status is the worst status of each aggregated bucket. The raw scores are used only
+        while they still reach back to start; every tier is located with a binary search.
+        """
+        start_ns, end_ns = pd.Timestamp(start).value, pd.Timestamp(end).value
+        span_ns = end_ns - start_ns
+        with self._lock:
+            machine = self._machine((machine_id, data_source))
+            raw = machine['raw']
+            if raw.covers(start_ns):
+                columns = raw.query(start_ns, end_ns, max_rows=self.max_points)
+                if columns is not None:
+                    return self._frame(columns), 'Raw'
+            
+            tier_name, tier = list(machine['tiers'].items())[-1]
+            for name, candidate in machine['tiers'].items():
+                if span_ns <= candidate.retention_ns and span_ns // candidate.step_ns < self.max_points:
+                    tier_name, tier = name, candidate
+                    break
+            columns = tier.query(start_ns, end_ns)
+        return self._frame(columns), tier_name
+
+
+HEALTH_HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".health_history")
+
+
+@st.cache_resource
+def get_health_history():
+    """Process-wide health-score history shared by all sessions"""
+    return HealthHistoryStore(HEALTH_HISTORY_DIR)
+
+
 class VibrationDataGenerator:
     """Simulates multi-axis vibration sensor data with various fault conditions"""
     
@@ -718,6 +3912,135 @@ class VibrationDataGenerator:
             # Normal temperature
             return base_temp + temp_variation
 
+class RealFFTEngine:
+    """Real-input FFT used by every spectral path, with optional zero padding and Welch averaging
+    
+    Frequency-resolution contract for a signal of N samples at sampling rate fs:
+    - The analysis length M is N in 'fft' mode. In 'welch' mode it is segment_length when N
+      is longer: the signal is cut into M-sample segments overlapping by `overlap`, each is
+      Hann-windowed, and their power spectra are averaged. Spectral cost and resolution then
+      depend on the segment size, not on how many rows were fetched.
+    - Each transform runs at n_fft = M, or at next_fast_len(M) (a 2/3/5-smooth length) when
+      padding is 'fast', so arbitrary MySQL row counts never hit slow prime-length FFTs, and
+      buffers of neighbouring sizes share one n_fft and therefore one cached scipy plan.
+    - Bins are the positive half of the grid, k * fs / n_fft for k < n_fft // 2. Magnitudes
+      are unnormalized |X[k]| of an M-point transform; Welch magnitudes are the RMS average
+      rescaled by M / sum(window), so a sinusoid's peak height matches a rectangular window.
+    - Padding interpolates the spectrum; the true resolution stays fs / M. Sums of magnitudes
+      over a frequency band grow with the bin density, so band and total energies are
+      multiplied by bin_scale = M / n_fft to stay comparable across buffer sizes and settings.
+    """
+    
+    PADDING_MODES = ('none', 'fast')
+    MODES = ('fft', 'welch')
+    
+    def __init__(self, padding='fast', mode='fft', segment_length=1024, overlap=0.5):
+        self.padding = padding
+        self.mode = mode
+        self.segment_length = segment_length
+        self.overlap = overlap
+    
+    def settings(self):
+        """Hashable settings, part of every spectrum cache key"""
+        return (self.padding, self.mode, self.segment_length, self.overlap)
+    
+    def analysis_length(self, n_samples):
+        """Samples per transform: the whole signal, or one Welch segment of a longer one"""
+        return self.segment_length if self.mode == 'welch' and n_samples > self.segment_length else n_samples
+    
+    def n_fft(self, n_samples):
+        length = self.analysis_length(n_samples)
+        return next_fast_len(length, real=True) if self.padding == 'fast' and length > 1 else length
+    
+    def bin_scale(self, n_samples):
+        """Factor that makes band sums comparable to an unpadded transform of the analysis length"""
+        return self.analysis_length(n_samples) / self.n_fft(n_samples) if n_samples else 1.0
+    
+    def magnitude_spectrum(self, samples, sampling_rate):
+        """(positive frequencies, |X|) along the last axis of a 1-D signal or (... x samples) block"""
+        n_samples = samples.shape[-1]
+        length = self.analysis_length(n_samples)
+        n_fft = self.n_fft(n_samples)
+        
+        if length < n_samples:
+            # Welch: all overlapping segments of every row in one batched transform
+            step = max(1, int(round(length * (1 - self.overlap))))
+            segments = np.lib.stride_tricks.sliding_window_view(samples, length, axis=-1)[..., ::step, :]
+            window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(length) / length)  # Periodic Hann
+            power = np.mean(np.abs(rfft(segments * window, n=n_fft, axis=-1))**2, axis=-2)
+            magnitude = np.sqrt(power[..., :n_fft // 2]) * (length / window.sum())
+        else:
+            magnitude = np.abs(rfft(samples, n=n_fft, axis=-1))[..., :n_fft // 2]
+        freqs = rfftfreq(n_fft, 1/sampling_rate)[:n_fft // 2]
+        return freqs, magnitude
+
+
+class SpectrumCache:
+    """One-sided magnitude spectra of the current analysis cycle, keyed by signal buffer identity
+    
+    Validation, feature extraction, axis analysis and the spectrum plot all transform the same
+    signals; the first caller computes a spectrum and the others reuse it. Keys are the data
+    pointer, shape, strides, dtype, sampling rate, spectrum settings and the ring buffer position
+    (generation and total_rows, see ChannelFrame.cache_position) the signals were read at, and
+    each entry keeps a reference to its source array so the memory cannot be reused by another
+    signal while the entry lives. Rows of a cached (channels x samples)
+    block are registered as well, so looking up one axis view hits the block's transform. The
+    owner calls clear(position) at the start of every cycle; ring buffer views are rewritten in
+    place by the next append or refill, and the position keeps their old spectra from matching.
+    """
+    
+    def __init__(self, engine, max_entries=256):
+        self.engine = engine
+        self.max_entries = max_entries
+        self._entries = {}
+        self.position = None  # Ring buffer position of the current cycle's signals
+        self.hits = 0
+        self.misses = 0
+    
+    def __deepcopy__(self, memo):
+        # Copies of an analyzer start their own cycle with the copied engine
+        return SpectrumCache(copy.deepcopy(self.engine, memo), self.max_entries)
+    
+    @staticmethod
+    def _key(array, sampling_rate, settings, position):
+        return (array.__array_interface__['data'][0], array.shape, array.strides, array.dtype.str,
+                float(sampling_rate), settings, position)
+    
+    def clear(self, position=None):
+        """Start a new cycle for signals read at a ring buffer position (None if not from a buffer)"""
+        self._entries = {}
+        self.position = position
+    
+    def spectrum(self, samples, sampling_rate, position=None):
+        """(positive frequencies, magnitudes) of a 1-D signal or of every row of a 2-D block
+        
+        Computed by the engine (see RealFFTEngine for the bin grid and scaling). The returned
+        arrays are read-only and shared with other callers in the same cycle. `position`
+        defaults to the cycle's.
+        """
+        samples = np.asarray(samples)
+        settings = self.engine.settings()
+        position = self.position if position is None else position
+        key = self._key(samples, sampling_rate, settings, position)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry[1], entry[2]
+        
+        self.misses += 1
+        freqs, magnitude = self.engine.magnitude_spectrum(samples, sampling_rate)
+        magnitude.flags.writeable = False
+        freqs.flags.writeable = False
+        
+        if len(self._entries) >= self.max_entries:
+            self._entries = {}
+        self._entries[key] = (samples, freqs, magnitude)
+        if samples.ndim == 2:
+            for row in range(samples.shape[0]):
+                self._entries[self._key(samples[row], sampling_rate, settings, position)] = (samples, freqs, magnitude[row])
+        return freqs, magnitude
+
+
 class AIAnalyzer:
     """AI-based multi-axis vibration and temperature analysis system with enhanced reliability"""
     
@@ -725,6 +4048,9 @@ class AIAnalyzer:
         self.scaler = StandardScaler()
         self.anomaly_detector = IsolationForest(contamination=0.1, random_state=42)
         self.is_trained = False
+        self.fft_engine = RealFFTEngine()
+        self.spectrum_cache = SpectrumCache(self.fft_engine)
+        self._band_plans = {}  # Fault-band bin ranges per spectrum grid and machine configuration
         
         # Machine-specific parameters (configurable)
         self.machine_config = {
@@ -766,6 +4092,12 @@ class AIAnalyzer:
             'training_stats': self.training_stats,
             'machine_config': self.machine_config,
             'health_weights': self.health_weights,
+            'spectrum_settings': {
+                'padding': self.fft_engine.padding,
+                'mode': self.fft_engine.mode,
+                'segment_length': self.fft_engine.segment_length,
+                'overlap': self.fft_engine.overlap
+            },
             'scaler_params': {
                 'mean': self.scaler.mean_ if hasattr(self.scaler, 'mean_') else None,
                 'scale': self.scaler.scale_ if hasattr(self.scaler, 'scale_') else None
@@ -789,8 +4121,18 @@ class AIAnalyzer:
             self.training_features = training_package.get('training_features', [])
             self.training_stats = training_package.get('training_stats', {})
             self.machine_config.update(training_package.get('machine_config', {}))
+            self._band_plans = {}
             self.health_weights.update(training_package.get('health_weights', {}))
             
+            # Spectral features were trained with these settings; older packages predate padding and Welch
+            spectrum_settings = training_package.get('spectrum_settings', {})
+            self.configure_spectrum(
+                padding=spectrum_settings.get('padding', 'none'),
+                mode=spectrum_settings.get('mode', 'fft'),
+                segment_length=spectrum_settings.get('segment_length'),
+                overlap=spectrum_settings.get('overlap')
+            )
+            
             # Restore scaler if available
             scaler_params = training_package.get('scaler_params', {})
             if scaler_params.get('mean') is not None:
@@ -972,9 +4314,29 @@ class AIAnalyzer:
         if machine_type:
             # Set machine-specific normal ranges
             self.machine_config['normal_ranges'] = self._get_machine_specific_ranges(machine_type)
+        
+        # Fault bands move with the rotation and bearing frequencies
+        self._band_plans = {}
             
         return f"Machine configured: {motor_rpm} RPM, Type: {machine_type}"
     
+    def configure_spectrum(self, padding=None, mode=None, segment_length=None, overlap=None):
+        """Configure the FFT engine shared by all spectral analysis"""
+        engine = self.fft_engine
+        if padding in RealFFTEngine.PADDING_MODES:
+            engine.padding = padding
+        if mode in RealFFTEngine.MODES:
+            engine.mode = mode
+        if segment_length:
+            engine.segment_length = max(16, int(segment_length))
+        if overlap is not None:
+            engine.overlap = min(max(float(overlap), 0.0), 0.95)
+        self.spectrum_cache.clear()
+        
+        if engine.mode == 'welch':
+            return f"Spectrum configured: Welch, {engine.segment_length}-sample segments, {engine.overlap:.0%} overlap, padding {engine.padding}"
+        return f"Spectrum configured: full FFT, padding {engine.padding}"
+    
     def _calculate_bearing_frequencies(self, bearing_specs):
         """Calculate bearing fault frequencies from bearing specifications"""
         # Simplified calculation - in practice, use actual bearing geometry
@@ -1014,8 +4376,8 @@ class AIAnalyzer:
         
     def extract_features(self, signal_data, sampling_rate=1000, signal_type='vibration'):
         """Extract statistical and frequency domain features with robust error handling"""
-        # Ensure signal_data is a numpy array
-        signal_data = np.array(signal_data)
+        # Ensure signal_data is a numpy array (views are used as is)
+        signal_data = np.asarray(signal_data, dtype=np.float64)
         
         # Check for empty or invalid data
         if len(signal_data) == 0:
@@ -1025,72 +4387,129 @@ class AIAnalyzer:
                 return np.array([0, 0, 0, 0, 0, 0, 0])  # 7 vibration features
         
         if signal_type == 'temperature':
-            # Temperature-specific features
-            mean_temp = np.mean(signal_data)
-            std_temp = np.std(signal_data) if len(signal_data) > 1 else 0
-            max_temp = np.max(signal_data)
-            min_temp = np.min(signal_data)
-            
-            # Temperature gradient (handle single point case)
-            if len(signal_data) > 1:
-                temp_gradient = np.mean(np.diff(signal_data))
-            else:
-                temp_gradient = 0
-                
-            temp_range = max_temp - min_temp
-            
-            return np.array([mean_temp, std_temp, max_temp, min_temp, temp_gradient, temp_range])
-        
+            return self._temperature_features_block(signal_data)
         else:
-            # Vibration features (time domain)
-            rms = np.sqrt(np.mean(signal_data**2))
-            peak = np.max(np.abs(signal_data))
-            crest_factor = peak / rms if rms > 0 else 0
-            
-            # Statistical features (handle edge cases)
-            if len(signal_data) > 1:
-                signal_std = np.std(signal_data)
-                if signal_std > 0:
-                    normalized_signal = (signal_data - np.mean(signal_data)) / signal_std
-                    skewness = np.mean(normalized_signal**3)
-                    kurtosis = np.mean(normalized_signal**4)
-                else:
-                    skewness = 0
-                    kurtosis = 0
-            else:
-                skewness = 0
-                kurtosis = 0
+            return self._vibration_features_block(signal_data, sampling_rate)
+    
+    def _temperature_features_block(self, block):
+        """Temperature features along the last axis of a (... x samples) array in one vectorized pass
+        
+        Returns a (... x 6) array of mean, std, max, min, mean gradient and range.
+        """
+        block = np.asarray(block, dtype=np.float64)
+        n_samples = block.shape[-1]
+        features = np.zeros(block.shape[:-1] + (6,))
+        if n_samples == 0:
+            return features
+        
+        features[..., 0] = np.mean(block, axis=-1)
+        features[..., 2] = np.max(block, axis=-1)
+        features[..., 3] = np.min(block, axis=-1)
+        features[..., 5] = features[..., 2] - features[..., 3]
+        if n_samples > 1:
+            features[..., 1] = np.std(block, axis=-1)
+            features[..., 4] = np.mean(np.diff(block, axis=-1), axis=-1)
+        return features
+    
+    def _vibration_features_block(self, block, sampling_rate=1000):
+        """Vibration features along the last axis of a (... x samples) array in one vectorized pass
+        
+        A (channels x samples) block gives (channels x 7) and a (windows x channels x samples)
+        batch gives (windows x channels x 7): rms, peak, crest factor, skewness, kurtosis,
+        dominant frequency and spectral centroid. All rows share one batched real FFT.
+        """
+        block = np.asarray(block, dtype=np.float64)
+        n_samples = block.shape[-1]
+        features = np.zeros(block.shape[:-1] + (7,))
+        if n_samples == 0:
+            return features
+        
+        # Time domain
+        rms = np.sqrt(np.mean(block**2, axis=-1))
+        peak = np.max(np.abs(block), axis=-1)
+        features[..., 0] = rms
+        features[..., 1] = peak
+        features[..., 2] = np.divide(peak, rms, out=np.zeros_like(rms), where=rms > 0)
+        
+        if n_samples > 1:
+            # Statistical features (flat rows keep 0)
+            signal_std = np.std(block, axis=-1)
+            varying = signal_std > 0
+            if varying.any():
+                rows = block[varying]
+                normalized = (rows - np.mean(rows, axis=-1, keepdims=True)) / signal_std[varying][:, np.newaxis]
+                features[varying, 3] = np.mean(normalized**3, axis=-1)
+                features[varying, 4] = np.mean(normalized**4, axis=-1)
             
-            # Frequency domain features (only if we have enough data)
-            if len(signal_data) > 1:
-                try:
-                    fft_values = np.abs(fft(signal_data))
-                    freqs = fftfreq(len(signal_data), 1/sampling_rate)
-                    
-                    # Find dominant frequencies
-                    positive_freqs = freqs[:len(freqs)//2]
-                    positive_fft = fft_values[:len(fft_values)//2]
-                    
-                    if len(positive_fft) > 0 and np.sum(positive_fft) > 0:
-                        dominant_freq = positive_freqs[np.argmax(positive_fft)]
-                        spectral_centroid = np.sum(positive_freqs * positive_fft) / np.sum(positive_fft)
-                    else:
-                        dominant_freq = 0
-                        spectral_centroid = 0
-                except:
-                    dominant_freq = 0
-                    spectral_centroid = 0
+            # Frequency domain: one real FFT along the sample axis for every row; signals and
+            # channel blocks of the current cycle (a single window) share spectra through the cache
+            try:
+                if block.ndim <= 2 or len(block) == 1:
+                    positive_freqs, positive_fft = self.spectrum_cache.spectrum(
+                        block[0] if block.ndim == 3 else block, sampling_rate
+                    )
+                    positive_fft = positive_fft.reshape(block.shape[:-1] + positive_fft.shape[-1:])
+                else:
+                    positive_freqs, positive_fft = self.fft_engine.magnitude_spectrum(block, sampling_rate)
+                totals = np.sum(positive_fft, axis=-1)
+                has_energy = totals > 0
+                if positive_fft.shape[-1] > 0 and has_energy.any():
+                    spectra = positive_fft[has_energy]
+                    features[has_energy, 5] = positive_freqs[np.argmax(spectra, axis=-1)]
+                    features[has_energy, 6] = np.sum(positive_freqs * spectra, axis=-1) / totals[has_energy]
+            except:
+                pass
+        
+        return features
+    
+    def extract_features_batch(self, windows, channels, sampling_rate=1000):
+        """Feature matrix of a (windows x channels x samples) array in one vectorized pass
+        
+        `channels` names the rows of every window. Row i of the result equals
+        extract_multi_axis_features of window i: 7 features per Fx/Fy/Fz channel and 6 for v0,
+        in channel order; other channels are skipped.
+        """
+        windows = np.asarray(windows, dtype=np.float64)
+        channels = list(channels)
+        vibration_rows = [row for row, name in enumerate(channels) if name in ['Fx', 'Fy', 'Fz']]
+        temperature_rows = [row for row, name in enumerate(channels) if name == 'v0']
+        
+        blocks = {}
+        if vibration_rows:
+            if vibration_rows == list(range(vibration_rows[0], vibration_rows[0] + len(vibration_rows))):
+                vibration_windows = windows[:, vibration_rows[0]:vibration_rows[-1] + 1]  # View: spectra stay cacheable
             else:
-                dominant_freq = 0
-                spectral_centroid = 0
-            
-            return np.array([rms, peak, crest_factor, skewness, kurtosis, 
-                            dominant_freq, spectral_centroid])
+                vibration_windows = windows[:, vibration_rows]
+            vibration = self._vibration_features_block(vibration_windows, sampling_rate)
+            blocks.update((row, vibration[:, i]) for i, row in enumerate(vibration_rows))
+        if temperature_rows:
+            temperature = self._temperature_features_block(windows[:, temperature_rows])
+            blocks.update((row, temperature[:, i]) for i, row in enumerate(temperature_rows))
+        
+        if not blocks:
+            return np.zeros((len(windows), 0))
+        return np.concatenate([blocks[row] for row in sorted(blocks)], axis=1)
+    
+    @staticmethod
+    def _stack_windows(signal_dicts):
+        """Stack signal dicts with the same axes and lengths into (windows x channels x samples), else None"""
+        names = list(signal_dicts[0])
+        if not names or any(list(signals) != names for signals in signal_dicts):
+            return None
+        try:
+            windows = np.array([[signals[name] for name in names] for signals in signal_dicts], dtype=np.float64)
+        except ValueError:
+            return None
+        return windows if windows.ndim == 3 else None
     
     def extract_multi_axis_features(self, signals_dict, sampling_rate=1000):
         """Extract features from multiple axes and combine them"""
         all_features = []
         
+        if hasattr(signals_dict, 'filled'):
+            # Aligned ChannelFrame: all axes in one pass over the shared block
+            return self.extract_features_batch(signals_dict.filled()[np.newaxis], signals_dict.names, sampling_rate)[0]
+        
         # Extract features for each selected axis
         for axis, signal in signals_dict.items():
             if axis in ['Fx', 'Fy', 'Fz']:
@@ -1111,12 +4530,17 @@ class AIAnalyzer:
         # Store raw training data
         self.raw_training_data = training_data_list.copy()
         
-        features_list = []
-        for training_signals in training_data_list:
-            features = self.extract_multi_axis_features(training_signals, sampling_rate)
-            features_list.append(features)
-        
-        features_array = np.array(features_list)
+        # Equally shaped samples are featurized as one batch, anything else one sample at a time
+        windows = self._stack_windows(training_data_list)
+        if windows is not None:
+            features_array = self.extract_features_batch(windows, training_data_list[0], sampling_rate)
+            features_list = list(features_array)
+        else:
+            features_list = []
+            for training_signals in training_data_list:
+                features = self.extract_multi_axis_features(training_signals, sampling_rate)
+                features_list.append(features)
+            features_array = np.array(features_list)
         
         # Store extracted features
         self.training_features = features_list.copy()
@@ -1217,6 +4641,9 @@ class AIAnalyzer:
         if not signals_dict or len(signals_dict) == 0:
             return {"health_score": 50, "anomaly": True, "confidence": 0, "features": [], "axis_analysis": {}, "validation": {}}
         
+        # New cycle: every stage below (and the spectrum plot) transforms each signal only once
+        self.spectrum_cache.clear(getattr(signals_dict, 'cache_position', None))
+        
         # Validate real-time data against training
         validation_result = self.validate_real_time_data(signals_dict, sampling_rate)
         
@@ -1388,6 +4815,10 @@ class AIAnalyzer:
         """Perform detailed analysis for each axis"""
         axis_analysis = {}
         
+        # Aligned ChannelFrames are analyzed as rows of one gap-filled block
+        if hasattr(signals_dict, 'filled'):
+            signals_dict = dict(zip(signals_dict.names, signals_dict.filled()))
+        
         for axis, signal in signals_dict.items():
             if axis in ['Fx', 'Fy', 'Fz']:
                 analysis = self.analyze_vibration_axis(signal, axis, sampling_rate)
@@ -1403,7 +4834,7 @@ class AIAnalyzer:
     def analyze_vibration_axis(self, signal, axis_name, sampling_rate=1000):
         """Detailed vibration analysis for specific axis with robust error handling"""
         # Ensure signal is a numpy array and handle edge cases
-        signal = np.array(signal)
+        signal = np.asarray(signal)
         
         # Check if signal has sufficient data
         if len(signal) == 0:
@@ -1432,10 +4863,7 @@ class AIAnalyzer:
         # Frequency domain analysis (only if we have enough data)
         if len(signal) > 1:
             try:
-                fft_values = np.abs(fft(signal))
-                freqs = fftfreq(len(signal), 1/sampling_rate)
-                positive_freqs = freqs[:len(freqs)//2]
-                positive_fft = fft_values[:len(fft_values)//2]
+                positive_freqs, positive_fft = self.spectrum_cache.spectrum(signal, sampling_rate)
                 
                 # Find dominant frequencies
                 if len(positive_fft) > 0:
@@ -1444,7 +4872,9 @@ class AIAnalyzer:
                     dominant_magnitude = positive_fft[dominant_freq_idx]
                     
                     # Detect specific fault frequencies
-                    fault_indicators = self.detect_fault_frequencies(positive_freqs, positive_fft, axis_name)
+                    fault_indicators = self.detect_fault_frequencies(
+                        positive_freqs, positive_fft, axis_name, bin_scale=self.fft_engine.bin_scale(len(signal))
+                    )
                 else:
                     dominant_freq = 0
                     dominant_magnitude = 0
@@ -1492,7 +4922,7 @@ class AIAnalyzer:
     def analyze_temperature(self, signal, sampling_rate=1000):
         """Detailed temperature analysis with robust error handling"""
         # Ensure signal is a numpy array and handle edge cases
-        signal = np.array(signal)
+        signal = np.asarray(signal)
         
         # Check if signal has sufficient data
         if len(signal) == 0:
@@ -1531,45 +4961,67 @@ class AIAnalyzer:
             "recommendations": temp_health["recommendations"]
         }
     
-    def detect_fault_frequencies(self, freqs, fft_values, axis_name):
-        """Detect specific fault-related frequencies using machine configuration"""
-        fault_indicators = {}
+    def fault_band_plan(self, freqs):
+        """Bin ranges of the bearing, 1x and 2x/3x fault bands on a sorted frequency grid
         
-        # Use configured fault frequencies
+        Each band [f - tol, f + tol] is a contiguous slice lo:hi of the grid (empty bands are
+        left out), found by binary search once per grid (number of bins and spacing) and
+        rotation/bearing configuration. configure_machine drops the cached plans.
+        """
         rotation_freq = self.machine_config['rotation_freq']
         bearing_freqs = self.machine_config['bearing_freqs']
+        n_bins = len(freqs)
+        key = (n_bins, float(freqs[1]) if n_bins > 1 else 0.0, float(freqs[-1]) if n_bins else 0.0,
+               float(rotation_freq), tuple(float(bf) for bf in bearing_freqs))
+        plan = self._band_plans.get(key)
+        if plan is not None:
+            return plan
+        
+        # Adaptive tolerances based on machine speed
+        bearing_tolerance = max(2, rotation_freq * 0.1)
+        imb_tolerance = rotation_freq * 0.05  # 5% tolerance
+        harm_tolerance = rotation_freq * 0.1
         
-        # Check for bearing faults
-        bearing_energy = 0
-        for bf in bearing_freqs:
-            # Use adaptive frequency bands based on machine speed
-            freq_tolerance = max(2, rotation_freq * 0.1)  # Adaptive tolerance
-            idx_range = np.where((freqs >= bf-freq_tolerance) & (freqs <= bf+freq_tolerance))[0]
-            if len(idx_range) > 0:
-                bearing_energy += np.sum(fft_values[idx_range])
+        def bands(centers, tolerance):
+            centers = np.asarray(centers, dtype=np.float64)
+            lows = np.searchsorted(freqs, centers - tolerance, side='left')
+            highs = np.searchsorted(freqs, centers + tolerance, side='right')
+            return [(int(lo), int(hi)) for lo, hi in zip(lows, highs) if hi > lo]
         
-        # Check for imbalance (1x rotation frequency)
-        imb_tolerance = rotation_freq * 0.05  # 5% tolerance
-        imb_idx = np.where((freqs >= rotation_freq-imb_tolerance) & (freqs <= rotation_freq+imb_tolerance))[0]
-        imbalance_energy = np.sum(fft_values[imb_idx]) if len(imb_idx) > 0 else 0
+        plan = {
+            'bearing': bands(bearing_freqs, bearing_tolerance),
+            'imbalance': bands([rotation_freq], imb_tolerance),
+            'misalignment': bands([2 * rotation_freq, 3 * rotation_freq], harm_tolerance)  # 2x, 3x harmonics
+        }
+        if len(self._band_plans) >= 32:
+            self._band_plans = {}
+        self._band_plans[key] = plan
+        return plan
+    
+    def detect_fault_frequencies(self, freqs, fft_values, axis_name, bin_scale=1.0):
+        """Detect specific fault-related frequencies using machine configuration
         
-        # Check for misalignment (2x, 3x harmonics)
-        harm2_freq = 2 * rotation_freq
-        harm3_freq = 3 * rotation_freq
-        harm_tolerance = rotation_freq * 0.1
+        bin_scale (RealFFTEngine.bin_scale) normalizes band energies of zero-padded spectra.
+        """
+        fault_indicators = {}
+        
+        # Use configured fault frequencies
+        rotation_freq = self.machine_config['rotation_freq']
+        bearing_freqs = self.machine_config['bearing_freqs']
+        
+        # Band energies are sums over precomputed contiguous bin slices; no per-band masks over the spectrum
+        plan = self.fault_band_plan(freqs)
         
-        harm2_idx = np.where((freqs >= harm2_freq-harm_tolerance) & (freqs <= harm2_freq+harm_tolerance))[0]
-        harm3_idx = np.where((freqs >= harm3_freq-harm_tolerance) & (freqs <= harm3_freq+harm_tolerance))[0]
+        def band_energy(bands):
+            return sum(np.sum(fft_values[lo:hi]) for lo, hi in bands)
         
-        misalign_energy = 0
-        if len(harm2_idx) > 0:
-            misalign_energy += np.sum(fft_values[harm2_idx])
-        if len(harm3_idx) > 0:
-            misalign_energy += np.sum(fft_values[harm3_idx])
+        bearing_energy = band_energy(plan['bearing'])
+        imbalance_energy = band_energy(plan['imbalance'])
+        misalign_energy = band_energy(plan['misalignment'])
         
         # Axis-specific thresholds (based on machine configuration)
         axis_multipliers = {'Fx': 1.0, 'Fy': 0.8, 'Fz': 0.6}
-        multiplier = axis_multipliers.get(axis_name, 1.0)
+        multiplier = axis_multipliers.get(axis_name, 1.0) * bin_scale
         
         fault_indicators = {
             "bearing_fault": bearing_energy * multiplier,
@@ -1793,12 +5245,161 @@ class AIAnalyzer:
 if 'data_generator' not in st.session_state:
     st.session_state.data_generator = VibrationDataGenerator()
     st.session_state.ai_analyzer = AIAnalyzer()
-    st.session_state.historical_data = []
+    st.session_state.analyzer_pipeline = None  # Ingest worker whose analyzer ai_analyzer is shared with
     st.session_state.is_monitoring = False
     st.session_state.mysql_connector = MySQLConnector() if MYSQL_AVAILABLE else None
     st.session_state.mysql_connected = False
     st.session_state.mysql_last_timestamp = None
-    st.session_state.mysql_data_buffer = pd.DataFrame()
+    st.session_state.mysql_data_buffer = SensorRingBuffer()
+    st.session_state.mysql_use_pool = True
+    st.session_state.mysql_driver_mode = 'auto'
+    st.session_state.mysql_tail_state = None
+    st.session_state.mysql_tail_info = None
+    st.session_state.mysql_aggregate_enabled = False
+    st.session_state.mysql_aggregate_points = 2000
+    st.session_state.mysql_trend_data = None
+    st.session_state.mysql_parquet_cache_enabled = PARQUET_AVAILABLE
+    st.session_state.mysql_background_ingest = True
+    st.session_state.mysql_index_report = None
+    st.session_state.mysql_fleet_data = None
+    st.session_state.storage_backend = 'mysql'
+    st.session_state.results_writeback_enabled = False
+    st.session_state.results_writer = HealthResultsWriter()
+    st.session_state.mysql_query_timeout = 60
+    st.session_state.mysql_partial_load = None
+    st.session_state.mysql_range_preset = None  # Quick Select spec, e.g. ("Last 24h",), until a date/time input is edited
+
+
+def load_date_range_streaming(connector, table_name, columns_mapping, start_datetime, end_datetime, limit,
+                              use_cache=False, range_spec=None):
+    """Stream a historical date range into a DataFrame while showing load progress in the sidebar
+    
+    Rows are previewed in the main area as chunks arrive. Cancelling the load or hitting the
+    query time limit keeps the rows loaded so far; a cancelled range is not reloaded on later
+    reruns until it changes or the user retries. The range is identified by `range_spec` (a
+    Quick Select preset) when given, so a preset whose resolved bounds move keeps its load.
+    """
+    if not hasattr(connector, 'iter_data_by_date_range'):
+        # Local files are read in one pass; chunked streaming and the Parquet cache are for MySQL.
+        # (Checked by capability: reruns re-execute this script, so stored connectors predate the class.)
+        return connector.get_data_by_date_range(table_name, columns_mapping, start_datetime, end_datetime, limit=limit)
+    
+    load_key = (table_name, tuple(sorted(columns_mapping.items())), range_spec or (start_datetime, end_datetime),
+                limit, bool(use_cache))
+    partial = st.session_state.mysql_partial_load
+    if partial is not None and partial['key'] != load_key:
+        partial = None
+    
+    def keep_partial():
+        st.sidebar.warning(f"⏹️ Load cancelled - using {partial['rows']:,} partially loaded rows")
+        return connector.columns_to_dataframe(partial['columns']) if partial['columns'] else None
+    
+    if partial is not None and partial['cancelled']:
+        if not st.sidebar.button("🔄 Retry Load", key="mysql_retry_load_btn"):
+            return keep_partial()
+    
+    # A click on Cancel interrupts the running load; the rerun it triggers sees the click here
+    cancel_slot = st.sidebar.empty()
+    if cancel_slot.button("⏹️ Cancel Load", key="mysql_cancel_load_btn",
+                          help="Stop the running query and keep the rows loaded so far") and partial is not None:
+        partial['cancelled'] = True
+        cancel_slot.empty()
+        return keep_partial()
+    
+    partial = {'key': load_key, 'columns': None, 'rows': 0, 'cancelled': False}
+    st.session_state.mysql_partial_load = partial
+    
+    progress_bar = st.sidebar.progress(0.0, text="📥 Streaming historical data...")
+    preview = st.empty()
+    last_preview = 0.0
+    result = None
+    stream = None
+    
+    def show_progress(progress):
+        nonlocal last_preview
+        partial['columns'] = progress['columns']
+        partial['rows'] = progress['rows_loaded']
+        progress_bar.progress(
+            min(1.0, progress['progress'] or 0.0),
+            text=f"📥 Loaded {progress['rows_loaded']:,} rows ({progress['rows_per_second']:,.0f} rows/s)"
+        )
+        
+        # Chunks arrive in time order, so the preview grows from the start of the range
+        if time.perf_counter() - last_preview >= 0.5:
+            last_preview = time.perf_counter()
+            step = max(1, progress['rows_loaded'] // 2000)
+            preview_df = connector.columns_to_dataframe(
+                {alias: array[::step] for alias, array in progress['columns'].items()}
+            )
+            with preview.container():
+                st.caption(f"⏳ Partial data: {progress['rows_loaded']:,} rows up to {preview_df['timestamp'].iloc[-1]}")
+                st.line_chart(preview_df.set_index('timestamp'), height=220)
+    
+    try:
+        if use_cache and PARQUET_AVAILABLE:
+            df, cache_info = get_historical_cache().load_range(
+                connector, table_name, columns_mapping, start_datetime, end_datetime,
+                limit=limit, progress_callback=show_progress
+            )
+            if cache_info:
+                st.sidebar.caption(
+                    f"💾 {cache_info['cached_rows']:,} rows from local cache, "
+                    f"{cache_info['fetched_rows']:,} from MySQL ({cache_info['gaps_fetched']} gaps fetched)"
+                )
+                if cache_info['interrupted']:
+                    st.sidebar.warning(f"⏱️ {cache_info['interrupted']} - using {len(df):,} partially loaded rows")
+            return df
+        
+        stream = connector.iter_data_by_date_range(
+            table_name, columns_mapping, start_datetime, end_datetime, limit=limit
+        )
+        for progress in stream:
+            if progress['done']:
+                result = progress
+            else:
+                show_progress(progress)
+    except Error as e:
+        st.sidebar.error(f"Error streaming data by date range: {str(e)}")
+        return None
+    except ValueError as e:
+        st.sidebar.error(f"Invalid table configuration: {str(e)}")
+        return None
+    except OSError as e:
+        st.sidebar.error(f"Local cache error: {str(e)}")
+        return None
+    finally:
+        if stream is not None:
+            # Kills the server-side query when a rerun interrupted the load
+            stream.close()
+        progress_bar.empty()
+        preview.empty()
+        cancel_slot.empty()
+    
+    if result is None:
+        return None
+    partial['columns'] = result['columns']
+    partial['rows'] = result['rows_loaded']
+    if result['interrupted']:
+        st.sidebar.warning(f"⏱️ {result['interrupted']} - using {result['rows_loaded']:,} partially loaded rows")
+    return connector.columns_to_dataframe(result['columns'])
+
+
+def update_analyzer(change, pipeline=None):
+    """Apply a configuration or training change to a copy of the session's analyzer
+    
+    The analyzer may be shared with a pipeline thread, so it is never modified in place: the
+    changed copy replaces it in this session and, when given, in the machine's pipeline. A live
+    pipeline's analyzer is copied under its analysis lock so no analysis is mid-way through it.
+    """
+    if pipeline is not None and pipeline.is_alive():
+        analyzer = pipeline.copy_analyzer()
+    else:
+        analyzer = copy.deepcopy(st.session_state.ai_analyzer)
+    result = change(analyzer)
+    st.session_state.ai_analyzer = analyzer
+    if pipeline is not None and pipeline.is_alive():
+        pipeline.set_analyzer(analyzer)
+    return result
 
 
 def main():
@@ -1809,6 +5410,7 @@ def main():
     current_signals = {}
     time_vector = None
     sampling_rate = 1000
+    shared_pipeline = None  # Background ingest worker whose analyzer and results this session shares
     
     # Sidebar controls
     st.sidebar.header("🔧 System Controls")
@@ -1831,19 +5433,78 @@ def main():
     mysql_table = ""
     mysql_refresh_rate = 30
     mysql_data_limit = 1000
+    mysql_tail_batch_size = 500
     mysql_host = "localhost"
     mysql_port = 3306
     mysql_username = "root"
     mysql_password = ""
     mysql_database = ""
+    mysql_backend_is_server = True
     
     if data_source == "MySQL Real-time":
-        st.sidebar.subheader("🗄️ MySQL Server Configuration")
-        # Fixed MySQL Configuration Section with proper database selection
-    
-        if not MYSQL_AVAILABLE:
+        # Storage backend: a MySQL server, or a local SQLite/DuckDB file read through the same API
+        backend_options = [kind for kind in STORAGE_BACKENDS if kind != 'duckdb' or DUCKDB_AVAILABLE]
+        storage_backend = st.sidebar.selectbox(
+            "Storage Backend",
+            backend_options,
+            index=backend_options.index(st.session_state.storage_backend),
+            format_func=STORAGE_BACKENDS.get,
+            help="Read sensor tables from a MySQL server or from a local database file for offline analysis"
+            + ("" if DUCKDB_AVAILABLE else " (install duckdb for DuckDB files)"),
+            key="storage_backend_select"
+        )
+        if storage_backend != st.session_state.storage_backend:
+            if st.session_state.mysql_connector is not None:
+                st.session_state.mysql_connector.disconnect()
+            st.session_state.mysql_connector = create_storage_backend(storage_backend)
+            st.session_state.storage_backend = storage_backend
+            st.session_state.mysql_connected = False
+            st.session_state.mysql_data_buffer.clear()
+            st.session_state.mysql_last_timestamp = None
+            st.session_state.mysql_tail_state = None
+            st.session_state.mysql_trend_data = None
+            st.session_state.mysql_fleet_data = None
+            st.session_state.mysql_index_report = None
+            for state_key in ['mysql_selected_database', 'mysql_available_dates']:
+                if state_key in st.session_state:
+                    del st.session_state[state_key]
+        mysql_backend_is_server = storage_backend == 'mysql'
+        
+        if not mysql_backend_is_server:
+            st.sidebar.subheader(f"🗃️ {STORAGE_BACKENDS[storage_backend]}")
+            local_db_path = st.sidebar.text_input(
+                "Database File Path",
+                help="Opened read-only" + (" - timestamps are expected as ISO-8601 text" if storage_backend == 'sqlite' else ""),
+                key="local_db_path_input"
+            )
+            
+            if st.session_state.mysql_connected:
+                st.sidebar.markdown(f'<div class="mysql-connected">🟢 Opened {os.path.basename(st.session_state.mysql_connector.connection_params["path"])}</div>',
+                                    unsafe_allow_html=True)
+                if st.sidebar.button("🔴 Close File", key="local_db_close_btn"):
+                    success, message = st.session_state.mysql_connector.disconnect()
+                    st.session_state.mysql_connected = False
+                    st.session_state.mysql_data_buffer.clear()
+                    st.session_state.mysql_last_timestamp = None
+                    st.session_state.mysql_tail_state = None
+                    if 'mysql_selected_database' in st.session_state:
+                        del st.session_state.mysql_selected_database
+                    st.sidebar.success(message)
+                    st.rerun()
+            elif st.sidebar.button("📂 Open Database File", key="local_db_open_btn"):
+                success, message = st.session_state.mysql_connector.connect(local_db_path)
+                if success:
+                    st.session_state.mysql_connected = True
+                    st.session_state.mysql_selected_database = st.session_state.mysql_connector.get_databases()[0]
+                    st.sidebar.success(message)
+                    st.rerun()
+                else:
+                    st.sidebar.error(message)
+        elif not MYSQL_AVAILABLE:
             st.sidebar.error("MySQL connector not available. Install with: pip install mysql-connector-python")
         else:
+            st.sidebar.subheader("🗄️ MySQL Server Configuration")
+            
             # Connection parameters with unique keys
             mysql_host = st.sidebar.text_input(
                 "Server IP Address", 
@@ -1872,13 +5533,18 @@ def main():
             # Connection status
             if st.session_state.mysql_connected:
                 st.sidebar.markdown('<div class="mysql-connected">🟢 Connected to MySQL</div>', unsafe_allow_html=True)
+                pool_stats = st.session_state.mysql_connector.get_pool_stats()
+                if pool_stats:
+                    st.sidebar.caption(f"🔁 Shared pool: {pool_stats['in_use']} in use, {pool_stats['idle']} idle, {pool_stats['created']} opened")
                 if st.sidebar.button("🔴 Disconnect", key="mysql_disconnect_btn"):
                     with st.spinner("Disconnecting from MySQL..."):
+                        st.session_state.results_writer.flush(st.session_state.mysql_connector)
                         success, message = st.session_state.mysql_connector.disconnect()
                     if success:
                         st.session_state.mysql_connected = False
-                        st.session_state.mysql_data_buffer = pd.DataFrame()
+                        st.session_state.mysql_data_buffer.clear()
                         st.session_state.mysql_last_timestamp = None
+                        st.session_state.mysql_tail_state = None
                         # Clear selected database info
                         if 'mysql_selected_database' in st.session_state:
                             del st.session_state.mysql_selected_database
@@ -1911,12 +5577,31 @@ def main():
                     st.write("• Verify user permissions")
                     st.write("• Leave database field empty for initial connection")
                 
+                st.session_state.mysql_use_pool = st.sidebar.checkbox(
+                    "Use Shared Connection Pool",
+                    value=st.session_state.mysql_use_pool,
+                    help="Borrow connections from a pool shared by all dashboard sessions instead of opening a dedicated connection",
+                    key="mysql_use_pool_checkbox"
+                )
+                st.session_state.mysql_driver_mode = st.sidebar.selectbox(
+                    "MySQL Driver",
+                    list(MYSQL_DRIVER_MODES),
+                    index=list(MYSQL_DRIVER_MODES).index(st.session_state.mysql_driver_mode),
+                    format_func=MYSQL_DRIVER_MODES.get,
+                    help="The C extension decodes rows much faster; pure Python is the compatibility fallback",
+                    key="mysql_driver_select"
+                )
+                if st.session_state.mysql_driver_mode != 'pure' and not MYSQL_CEXT_AVAILABLE:
+                    st.sidebar.caption("ℹ️ C extension not installed - using the pure Python driver")
+                
                 if st.sidebar.button("🔗 Connect to MySQL Server", key="mysql_connect_btn"):
                     if mysql_host and mysql_username:
                         with st.spinner(f"Connecting to MySQL server {mysql_host}:{mysql_port}..."):
                             # Connect without specifying database first
                             success, message = st.session_state.mysql_connector.connect(
-                                mysql_host, mysql_port, "", mysql_username, mysql_password
+                                mysql_host, mysql_port, "", mysql_username, mysql_password,
+                                use_pool=st.session_state.mysql_use_pool,
+                                driver_mode=st.session_state.mysql_driver_mode
                             )
                             
                         if success:
@@ -1930,11 +5615,16 @@ def main():
                             st.sidebar.error(message)
                     else:
                         st.sidebar.error("Please provide host and username")
-            
-            # Database and table selection (only if connected to server)
+        
+        if MYSQL_AVAILABLE or not mysql_backend_is_server:
+            # Database and table selection (only if connected to server or file)
             if st.session_state.mysql_connected:
                 st.sidebar.subheader("📊 Database Configuration")
                 
+                if st.sidebar.button("🔄 Refresh Schema", key="mysql_refresh_schema_btn",
+                                     help="Reload database, table and column lists from the server"):
+                    st.session_state.mysql_connector.invalidate_schema_cache()
+                
                 try:
                     # Get available databases
                     databases = st.session_state.mysql_connector.get_databases()
@@ -1961,9 +5651,12 @@ def main():
                             if st.sidebar.button(f"🔗 Connect to Database: {selected_database}", key="mysql_db_connect_btn"):
                                 with st.spinner(f"Connecting to database '{selected_database}'..."):
                                     success, message = st.session_state.mysql_connector.connect(
-                                        mysql_host, mysql_port, selected_database, mysql_username, mysql_password
+                                        mysql_host, mysql_port, selected_database, mysql_username, mysql_password,
+                                        use_pool=st.session_state.mysql_use_pool,
+                                        driver_mode=st.session_state.mysql_driver_mode
                                     )
                                 if success:
+                                    st.session_state.mysql_connector.invalidate_schema_cache(selected_database)
                                     st.session_state.mysql_selected_database = selected_database
                                     mysql_database = selected_database
                                     st.sidebar.success(f"✅ Connected to database: {selected_database}")
@@ -2049,6 +5742,81 @@ def main():
                                             else:
                                                 st.sidebar.warning("⚠️ No sensors mapped yet")
                                             
+                                            # Index and query plan advisor for the mapped timestamp column
+                                            if mysql_backend_is_server and mysql_columns_mapping.get('timestamp'):
+                                                with st.sidebar.expander("🧭 Index Advisor"):
+                                                    if st.button("🔍 Analyze Query Plans", key="mysql_index_advisor_btn"):
+                                                        with st.spinner("Running EXPLAIN..."):
+                                                            st.session_state.mysql_index_report = st.session_state.mysql_connector.advise_indexes(
+                                                                mysql_table, mysql_columns_mapping, st.session_state.mysql_last_timestamp
+                                                            )
+                                                    
+                                                    index_report = st.session_state.mysql_index_report
+                                                    if (index_report and index_report['table'] == mysql_table
+                                                            and index_report['timestamp_column'] == mysql_columns_mapping['timestamp']):
+                                                        if index_report['timestamp_indexes']:
+                                                            st.success(f"✅ `{index_report['timestamp_column']}` is indexed ({', '.join(index_report['timestamp_indexes'])})")
+                                                        else:
+                                                            st.warning(f"⚠️ `{index_report['timestamp_column']}` has no index - time filters and ordering scan the table")
+                                                        
+                                                        for plan in index_report['plans']:
+                                                            plan_icon = "🔴" if plan['full_scan'] else ("🟡" if plan['filesort'] else "🟢")
+                                                            rows_text = f"~{int(plan['rows']):,} rows" if plan['rows'] is not None else "rows n/a"
+                                                            filesort_text = " + filesort" if plan['filesort'] else ""
+                                                            st.write(f"{plan_icon} **{plan['name']}**: {plan['access'] or '?'} via {plan['key'] or 'no index'}, {rows_text}{filesort_text}")
+                                                        
+                                                        if index_report['recommendation']:
+                                                            st.write("**Recommended index:**")
+                                                            st.code(index_report['recommendation'], language="sql")
+                                                            if st.button("🛠️ Create Index", key="mysql_create_index_btn"):
+                                                                with st.spinner("Creating index..."):
+                                                                    success, message = st.session_state.mysql_connector.create_recommended_index(
+                                                                        mysql_table, mysql_columns_mapping
+                                                                    )
+                                                                if success:
+                                                                    st.success(f"✅ {message}")
+                                                                    st.session_state.mysql_index_report = None
+                                                                else:
+                                                                    st.error(f"❌ {message}")
+                                            
+                                            # Fleet overview: latest window for many machines in one query
+                                            if mysql_backend_is_server:
+                                                with st.sidebar.expander("🏭 Fleet Overview"):
+                                                    fleet_mode = st.radio(
+                                                        "Machines are", ["Rows in this table", "Separate tables"],
+                                                        help="Filter one table by a machine ID column, or read the same columns from one table per machine",
+                                                        key="mysql_fleet_mode_radio"
+                                                    )
+                                                    if fleet_mode == "Rows in this table":
+                                                        fleet_machine_col = st.selectbox(
+                                                            "Machine ID Column", columns, key="mysql_fleet_machine_col_select"
+                                                        )
+                                                        fleet_ids_text = st.text_area(
+                                                            "Machine IDs", placeholder="Motor-001, Motor-002, ...",
+                                                            help="Comma or newline separated", key="mysql_fleet_ids_input"
+                                                        )
+                                                        fleet_machines = [machine.strip() for machine in fleet_ids_text.replace("\n", ",").split(",") if machine.strip()]
+                                                    else:
+                                                        fleet_machine_col = None
+                                                        fleet_machines = st.multiselect(
+                                                            "Machine Tables", tables, key="mysql_fleet_tables_select"
+                                                        )
+                                                    fleet_window = st.number_input(
+                                                        "Rows per Machine", 10, 5000, 200, key="mysql_fleet_window_input"
+                                                    )
+                                                
+                                                    if st.button("🔄 Refresh Fleet", key="mysql_fleet_refresh_btn", disabled=not fleet_machines):
+                                                        with st.spinner(f"Fetching {len(fleet_machines)} machines..."):
+                                                            fetch_start = time.perf_counter()
+                                                            fleet = st.session_state.mysql_connector.get_fleet_latest_data(
+                                                                mysql_columns_mapping, fleet_machines, fleet_window,
+                                                                table_name=mysql_table, machine_column=fleet_machine_col
+                                                            )
+                                                            fetch_ms = (time.perf_counter() - fetch_start) * 1000
+                                                        if fleet is not None:
+                                                            st.session_state.mysql_fleet_data = {'machines': fleet, 'elapsed_ms': fetch_ms}
+                                                            st.success(f"✅ {len(fleet)} machines in one query ({fetch_ms:.0f} ms)")
+                                            
                                             # Date Range Filtering Section
                                             st.sidebar.subheader("📅 Date Range Filter")
                                             
@@ -2070,45 +5838,33 @@ def main():
                                             if use_date_range:
                                                 if mysql_columns_mapping.get('timestamp'):
                                                     # Analyze available dates button
-                                                    if st.sidebar.button("📊 Analyze Available Dates", key="analyze_dates_btn") or st.session_state.mysql_available_dates is None:
+                                                    timestamp_col = mysql_columns_mapping['timestamp']
+                                                    dates_source = (mysql_table, timestamp_col)
+                                                    if (st.sidebar.button("📊 Analyze Available Dates", key="analyze_dates_btn")
+                                                            or st.session_state.mysql_available_dates is None
+                                                            or st.session_state.mysql_available_dates.get('source') != dates_source):
                                                         with st.spinner("Analyzing timestamp data..."):
                                                             try:
-                                                                timestamp_col = mysql_columns_mapping['timestamp']
+                                                                # Served from the shared statistics cache, which only aggregates new rows
+                                                                date_stats = st.session_state.mysql_connector.get_date_range_statistics(
+                                                                    mysql_table, timestamp_col
+                                                                )
                                                                 
-                                                                # Get min and max timestamps
-                                                                query = f"SELECT MIN({timestamp_col}) as min_date, MAX({timestamp_col}) as max_date, COUNT(*) as total_records FROM {mysql_table}"
-                                                                st.session_state.mysql_connector.cursor.execute(query)
-                                                                result = st.session_state.mysql_connector.cursor.fetchone()
-                                                                
-                                                                if result and result[0] and result[1]:
-                                                                    min_date = pd.to_datetime(result[0])
-                                                                    max_date = pd.to_datetime(result[1])
-                                                                    total_records = result[2]
+                                                                if date_stats:
+                                                                    min_date = pd.to_datetime(date_stats['min_date'])
+                                                                    max_date = pd.to_datetime(date_stats['max_date'])
+                                                                    total_records = date_stats['total_records']
                                                                     
                                                                     st.session_state.mysql_available_dates = {
                                                                         'min_date': min_date,
                                                                         'max_date': max_date,
-                                                                        'total_records': total_records
+                                                                        'total_records': total_records,
+                                                                        'source': dates_source
                                                                     }
                                                                     
-                                                                    # Get daily statistics
-                                                                    daily_query = f"""
-                                                                    SELECT 
-                                                                        DATE({timestamp_col}) as date,
-                                                                        COUNT(*) as records_per_day,
-                                                                        MIN({timestamp_col}) as first_time,
-                                                                        MAX({timestamp_col}) as last_time
-                                                                    FROM {mysql_table}
-                                                                    GROUP BY DATE({timestamp_col})
-                                                                    ORDER BY date DESC
-                                                                    LIMIT 30
-                                                                    """
-                                                                    st.session_state.mysql_connector.cursor.execute(daily_query)
-                                                                    daily_stats = st.session_state.mysql_connector.cursor.fetchall()
-                                                                    
                                                                     st.session_state.mysql_date_stats = {
-                                                                        'daily_records': daily_stats,
-                                                                        'days_available': len(daily_stats)
+                                                                        'daily_records': date_stats['daily_distribution'],
+                                                                        'days_available': date_stats['unique_days']
                                                                     }
                                                                     
                                                                     st.sidebar.success(f"✅ Found data from {min_date.strftime('%Y-%m-%d')} to {max_date.strftime('%Y-%m-%d')}")
@@ -2147,6 +5903,7 @@ def main():
                                                         
                                                         with col1:
                                                             if st.button("📅 Last 24h", key="quick_24h"):
+                                                                st.session_state.mysql_range_preset = ("Last 24h",)
                                                                 end_date = dates_info['max_date']
                                                                 start_date = end_date - timedelta(days=1)
                                                                 st.session_state.mysql_start_date = start_date.date()
@@ -2157,6 +5914,7 @@ def main():
                                                         
                                                         with col2:
                                                             if st.button("📅 Last 7d", key="quick_7d"):
+                                                                st.session_state.mysql_range_preset = ("Last 7d",)
                                                                 end_date = dates_info['max_date']
                                                                 start_date = end_date - timedelta(days=7)
                                                                 st.session_state.mysql_start_date = start_date.date()
@@ -2169,6 +5927,7 @@ def main():
                                                         with col3:
                                                             if st.button("📅 Today", key="quick_today"):
                                                                 today = datetime.now().date()
+                                                                st.session_state.mysql_range_preset = ("Today", today)
                                                                 st.session_state.mysql_start_date = today
                                                                 st.session_state.mysql_start_time = datetime.min.time()
                                                                 st.session_state.mysql_end_date = today
@@ -2178,6 +5937,7 @@ def main():
                                                         with col4:
                                                             if st.button("📅 Yesterday", key="quick_yesterday"):
                                                                 yesterday = datetime.now().date() - timedelta(days=1)
+                                                                st.session_state.mysql_range_preset = ("Yesterday", yesterday)
                                                                 st.session_state.mysql_start_date = yesterday
                                                                 st.session_state.mysql_start_time = datetime.min.time()
                                                                 st.session_state.mysql_end_date = yesterday
@@ -2197,19 +5957,24 @@ def main():
                                                             st.session_state.mysql_end_date = end_default.date()
                                                             st.session_state.mysql_end_time = end_default.time()
                                                         
-                                                        # Date inputs
+                                                        def forget_range_preset():
+                                                            st.session_state.mysql_range_preset = None
+                                                        
+                                                        # Date inputs (editing any of them turns a Quick Select range into a custom one)
                                                         mysql_start_date = st.sidebar.date_input(
                                                             "Start Date",
                                                             value=st.session_state.mysql_start_date,
                                                             min_value=dates_info['min_date'].date(),
                                                             max_value=dates_info['max_date'].date(),
-                                                            key="mysql_start_date_input"
+                                                            key="mysql_start_date_input",
+                                                            on_change=forget_range_preset
                                                         )
                                                         
                                                         mysql_start_time = st.sidebar.time_input(
                                                             "Start Time",
                                                             value=st.session_state.mysql_start_time,
-                                                            key="mysql_start_time_input"
+                                                            key="mysql_start_time_input",
+                                                            on_change=forget_range_preset
                                                         )
                                                         
                                                         mysql_end_date = st.sidebar.date_input(
@@ -2217,13 +5982,15 @@ def main():
                                                             value=st.session_state.mysql_end_date,
                                                             min_value=dates_info['min_date'].date(),
                                                             max_value=dates_info['max_date'].date(),
-                                                            key="mysql_end_date_input"
+                                                            key="mysql_end_date_input",
+                                                            on_change=forget_range_preset
                                                         )
                                                         
                                                         mysql_end_time = st.sidebar.time_input(
                                                             "End Time",
                                                             value=st.session_state.mysql_end_time,
-                                                            key="mysql_end_time_input"
+                                                            key="mysql_end_time_input",
+                                                            on_change=forget_range_preset
                                                         )
                                                         
                                                         # Update session state
@@ -2257,42 +6024,98 @@ def main():
                                                             
                                                             st.sidebar.info(f"⏱️ Duration: {duration_str}")
                                                             
-                                                            # Estimate records in selected range
-                                                            if st.sidebar.button("🔍 Estimate Records in Range", key="estimate_records_btn"):
-                                                                with st.spinner("Estimating records..."):
+                                                            # Estimate records in selected range (exact count only on request)
+                                                            estimate_clicked = st.sidebar.button("🔍 Estimate Records in Range", key="estimate_records_btn")
+                                                            exact_count_clicked = st.sidebar.button("🔢 Exact Count", key="exact_count_btn",
+                                                                                                    help="Run COUNT(*) over the range - can be slow on large tables")
+                                                            if estimate_clicked or exact_count_clicked:
+                                                                with st.spinner("Counting records..." if exact_count_clicked else "Estimating records..."):
                                                                     try:
                                                                         timestamp_col = mysql_columns_mapping['timestamp']
-                                                                        count_query = f"""
-                                                                        SELECT COUNT(*) 
-                                                                        FROM {mysql_table} 
-                                                                        WHERE {timestamp_col} BETWEEN %s AND %s
-                                                                        """
-                                                                        st.session_state.mysql_connector.cursor.execute(count_query, (mysql_start_datetime, mysql_end_datetime))
-                                                                        estimated_records = st.session_state.mysql_connector.cursor.fetchone()[0]
-                                                                        
-                                                                        st.sidebar.success(f"📊 Estimated records: {estimated_records:,}")
+                                                                        if exact_count_clicked:
+                                                                            estimated_records = st.session_state.mysql_connector.count_records_in_range(
+                                                                                mysql_table, timestamp_col, mysql_start_datetime, mysql_end_datetime
+                                                                            )
+                                                                            if estimated_records is not None:
+                                                                                st.sidebar.success(f"📊 Exact records: {estimated_records:,}")
+                                                                        else:
+                                                                            estimate = st.session_state.mysql_connector.estimate_records_in_range(
+                                                                                mysql_table, timestamp_col, mysql_start_datetime, mysql_end_datetime,
+                                                                                data_bounds=(dates_info['min_date'], dates_info['max_date'])
+                                                                            )
+                                                                            estimated_records = estimate['estimate'] if estimate else None
+                                                                            if estimate:
+                                                                                st.sidebar.success(f"📊 Estimated records: ~{estimate['estimate']:,} (±{estimate['error_bound']:,})")
+                                                                                st.sidebar.caption(f"{estimate['method']} in {estimate['elapsed_ms']:.0f} ms - {estimate['detail']}")
                                                                         
                                                                         # Performance warnings
-                                                                        if estimated_records > 50000:
-                                                                            st.sidebar.warning("⚠️ Large dataset detected!")
-                                                                            st.sidebar.write("**Recommendations:**")
-                                                                            st.sidebar.write("• Consider shorter time range")
-                                                                            st.sidebar.write("• Increase data limit if needed")
-                                                                            st.sidebar.write("• Monitor loading time")
-                                                                        elif estimated_records > 10000:
-                                                                            st.sidebar.info("📈 Medium dataset - should load quickly")
-                                                                        elif estimated_records == 0:
-                                                                            st.sidebar.warning("⚠️ No data found in selected range")
-                                                                            st.sidebar.write("**Try:**")
-                                                                            st.sidebar.write("• Expanding the date range")
-                                                                            st.sidebar.write("• Checking timestamp format")
-                                                                            st.sidebar.write("• Verifying data exists")
-                                                                        else:
-                                                                            st.sidebar.success("✅ Small dataset - will load quickly")
+                                                                        if estimated_records is not None:
+                                                                            if estimated_records > 50000:
+                                                                                st.sidebar.warning("⚠️ Large dataset detected!")
+                                                                                st.sidebar.write("**Recommendations:**")
+                                                                                st.sidebar.write("• Consider shorter time range")
+                                                                                st.sidebar.write("• Increase data limit if needed")
+                                                                                st.sidebar.write("• Monitor loading time")
+                                                                            elif estimated_records > 10000:
+                                                                                st.sidebar.info("📈 Medium dataset - should load quickly")
+                                                                            elif estimated_records == 0:
+                                                                                st.sidebar.warning("⚠️ No data found in selected range")
+                                                                                st.sidebar.write("**Try:**")
+                                                                                st.sidebar.write("• Expanding the date range")
+                                                                                st.sidebar.write("• Checking timestamp format")
+                                                                                st.sidebar.write("• Verifying data exists")
+                                                                            else:
+                                                                                st.sidebar.success("✅ Small dataset - will load quickly")
                                                                             
                                                                     except Exception as e:
                                                                         st.sidebar.error(f"❌ Error estimating records: {str(e)}")
-                                                            
+
+                                                            # Server-side aggregated trend for long ranges
+                                                            st.session_state.mysql_aggregate_enabled = st.sidebar.checkbox(
+                                                                "📉 Aggregated Trend (min/max/mean/RMS)",
+                                                                value=st.session_state.mysql_aggregate_enabled,
+                                                                help="Bucket the whole range in SQL so trends cover days or weeks without fetching raw rows",
+                                                                key="mysql_aggregate_checkbox"
+                                                            )
+                                                            if st.session_state.mysql_aggregate_enabled:
+                                                                st.session_state.mysql_aggregate_points = st.sidebar.number_input(
+                                                                    "Trend Points",
+                                                                    100, 20000, st.session_state.mysql_aggregate_points,
+                                                                    help="Approximate number of buckets returned for the selected range",
+                                                                    key="mysql_aggregate_points_input"
+                                                                )
+                                                                bucket_seconds = MySQLConnector.choose_bucket_seconds(
+                                                                    mysql_start_datetime, mysql_end_datetime, st.session_state.mysql_aggregate_points
+                                                                )
+                                                                st.sidebar.caption(f"Bucket width: {timedelta(seconds=bucket_seconds)}")
+
+                                                            # Local Parquet cache for repeated historical ranges
+                                                            st.session_state.mysql_parquet_cache_enabled = st.sidebar.checkbox(
+                                                                "💾 Local Parquet Cache",
+                                                                value=st.session_state.mysql_parquet_cache_enabled and PARQUET_AVAILABLE,
+                                                                disabled=not PARQUET_AVAILABLE or not mysql_backend_is_server,
+                                                                help="Keep loaded ranges on disk and only fetch missing intervals from MySQL" if PARQUET_AVAILABLE
+                                                                else "Install pyarrow to enable: pip install pyarrow",
+                                                                key="mysql_parquet_cache_checkbox"
+                                                            )
+                                                            if st.session_state.mysql_parquet_cache_enabled and mysql_backend_is_server:
+                                                                historical_cache = get_historical_cache()
+                                                                cache_limit_mb = st.sidebar.number_input(
+                                                                    "Cache Size Limit (MB)",
+                                                                    64, 102400, int(historical_cache.max_bytes // 1024**2),
+                                                                    help="Least recently used day partitions are evicted beyond this size",
+                                                                    key="mysql_cache_limit_input"
+                                                                )
+                                                                historical_cache.max_bytes = int(cache_limit_mb) * 1024**2
+                                                                cache_stats = historical_cache.stats()
+                                                                st.sidebar.caption(
+                                                                    f"💾 {cache_stats['rows']:,} rows in {cache_stats['fragments']} partitions "
+                                                                    f"({cache_stats['bytes'] / 1024**2:.1f} MB)"
+                                                                )
+                                                                if st.sidebar.button("🗑️ Clear Local Cache", key="mysql_clear_cache_btn"):
+                                                                    historical_cache.clear()
+                                                                    st.sidebar.success("✅ Local cache cleared")
+
                                                             # Store the datetime values for use in data loading
                                                             st.session_state.mysql_start_datetime = mysql_start_datetime
                                                             st.session_state.mysql_end_datetime = mysql_end_datetime
@@ -2323,12 +6146,68 @@ def main():
                                                 help="How often to check for new data",
                                                 key="mysql_refresh_slider"
                                             )
+                                            st.session_state.mysql_background_ingest = st.sidebar.checkbox(
+                                                "🧵 Background Ingest",
+                                                value=st.session_state.mysql_background_ingest,
+                                                disabled=not mysql_backend_is_server,
+                                                help="Poll MySQL in a shared background thread while monitoring; reruns only read its buffer",
+                                                key="mysql_background_ingest_checkbox"
+                                            )
+                                            mysql_tail_batch_size = st.sidebar.number_input(
+                                                "Tail Batch Size",
+                                                50, 20000, 500,
+                                                help="Rows per keyset batch when draining new real-time data (up to 20 batches per poll)",
+                                                key="mysql_tail_batch_input"
+                                            )
+                                            # Only streamed date-range loads get the high cap; the real-time buffer is preallocated at this size
+                                            mysql_streams_range = bool(st.session_state.mysql_date_range_enabled
+                                                                       and getattr(st.session_state, 'mysql_start_datetime', None)
+                                                                       and getattr(st.session_state, 'mysql_end_datetime', None))
+                                            mysql_limit_max = 5000000 if mysql_streams_range else 100000
+                                            if st.session_state.get('mysql_limit_input', 0) > mysql_limit_max:
+                                                st.session_state.mysql_limit_input = mysql_limit_max
                                             mysql_data_limit = st.sidebar.number_input(
                                                 "Data Points to Fetch", 
-                                                100, 10000, 1000,
-                                                help="Maximum number of records to fetch",
+                                                100, mysql_limit_max, 1000,
+                                                help="Maximum number of records to fetch (historical ranges are streamed in chunks)" if mysql_streams_range
+                                                else "Maximum number of records kept in the real-time buffer",
                                                 key="mysql_limit_input"
                                             )
+                                            if mysql_backend_is_server:
+                                                st.session_state.mysql_query_timeout = st.sidebar.number_input(
+                                                    "Query Timeout (seconds)",
+                                                    0, 3600, st.session_state.mysql_query_timeout,
+                                                    help="The server aborts historical, aggregate and count queries running longer than this (0 = no limit); rows already streamed are kept",
+                                                    key="mysql_query_timeout_input"
+                                                )
+                                                st.session_state.mysql_connector.query_timeout = st.session_state.mysql_query_timeout or None
+                                            
+                                            # Batched write-back of analysis results for long-term trending
+                                            st.session_state.results_writeback_enabled = st.sidebar.checkbox(
+                                                "💾 Save Health Results",
+                                                value=st.session_state.results_writeback_enabled,
+                                                disabled=not mysql_backend_is_server,
+                                                help="While monitoring, write each cycle's health scores and features to a MySQL results table in batches",
+                                                key="results_writeback_checkbox"
+                                            )
+                                            if st.session_state.results_writeback_enabled and mysql_backend_is_server:
+                                                results_writer = st.session_state.results_writer
+                                                results_writer.table_name = st.sidebar.text_input(
+                                                    "Results Table", value=results_writer.table_name, key="results_table_input"
+                                                ).strip() or "health_results"
+                                                results_writer.batch_size = st.sidebar.number_input(
+                                                    "Results per Batch", 1, 1000, results_writer.batch_size,
+                                                    key="results_batch_input"
+                                                )
+                                                results_writer.flush_interval = st.sidebar.number_input(
+                                                    "Flush Interval (seconds)", 5, 3600, results_writer.flush_interval,
+                                                    help="Pending results are written at least this often",
+                                                    key="results_flush_interval_input"
+                                                )
+                                                writer_stats = results_writer.stats()
+                                                st.sidebar.caption(f"💾 {writer_stats['written']:,} results written, {writer_stats['pending']} pending")
+                                                if writer_stats['last_error']:
+                                                    st.sidebar.warning(f"⚠️ {writer_stats['last_error']}")
                                             
                                             # Test data fetch
                                             if st.sidebar.button("🧪 Test Data Fetch", key="mysql_test_btn"):
@@ -2607,9 +6486,9 @@ def main():
                     # Extract the selected row range
                     filtered_data = csv_data.iloc[start_row:end_row+1].copy()
                     
-                    # Extract signals for selected axes
+                    # Extract signals for selected axes (unparseable cells stay aligned as NaN)
                     current_signals = {}
-                    signals_extracted = 0
+                    signal_columns = {}
                     
                     for axis_display in selected_axes:
                         axis_key = axis_display.split(" ")[0]
@@ -2618,15 +6497,15 @@ def main():
                         if column_name and column_name in filtered_data.columns:
                             try:
                                 # Convert to numeric, handling any errors
-                                signal_data = pd.to_numeric(filtered_data[column_name], errors='coerce').dropna().values
+                                signal_data = pd.to_numeric(filtered_data[column_name], errors='coerce').to_numpy(dtype=np.float64)
                                 
-                                if len(signal_data) > 0:
-                                    current_signals[axis_key] = signal_data
-                                    signals_extracted += 1
+                                if not np.isnan(signal_data).all():
+                                    signal_columns[axis_key] = signal_data
                                 else:
                                     st.sidebar.warning(f"⚠️ No valid numeric data for {axis_key}")
                             except Exception as e:
                                 st.sidebar.error(f"❌ Error processing {axis_key}: {str(e)}")
+                    signals_extracted = len(signal_columns)
                     
                     if signals_extracted == 0:
                         st.sidebar.error("❌ No valid signal data extracted from CSV")
@@ -2635,15 +6514,18 @@ def main():
                         time_vector = st.session_state.data_generator.time_vector
                         sampling_rate = 1000
                     else:
+                        current_signals = ChannelFrame.from_columns(signal_columns)
+                        
                         # Handle time vector for CSV data
                         if csv_columns_mapping.get('timestamp') and csv_columns_mapping['timestamp'] in filtered_data.columns:
                             try:
                                 # Try to parse timestamps
-                                timestamps = pd.to_datetime(filtered_data[csv_columns_mapping['timestamp']], errors='coerce').dropna()
+                                timestamps = pd.to_datetime(filtered_data[csv_columns_mapping['timestamp']], errors='coerce')
                                 
-                                if len(timestamps) > 1:
-                                    # Convert to relative time in seconds
-                                    time_vector = (timestamps - timestamps.iloc[0]).dt.total_seconds().values
+                                if timestamps.notna().sum() > 1:
+                                    # Convert to relative time in seconds on the rows of the frame (unparseable ones interpolated)
+                                    seconds = (timestamps - timestamps.dropna().iloc[0]).dt.total_seconds()
+                                    time_vector = seconds.interpolate(limit_direction='both').to_numpy()
                                     
                                     # Estimate actual sampling rate from timestamps
                                     time_intervals = np.diff(time_vector)
@@ -2662,19 +6544,19 @@ def main():
                                             st.sidebar.warning(f"⚠️ Using manual sampling rate: {csv_sampling_rate} Hz")
                                     else:
                                         sampling_rate = csv_sampling_rate
-                                        time_vector = np.arange(len(list(current_signals.values())[0])) / sampling_rate
+                                        time_vector = np.arange(current_signals.n_samples) / sampling_rate
                                 else:
                                     sampling_rate = csv_sampling_rate
-                                    time_vector = np.arange(len(list(current_signals.values())[0])) / sampling_rate
+                                    time_vector = np.arange(current_signals.n_samples) / sampling_rate
                             except Exception as e:
                                 st.sidebar.warning(f"⚠️ Error parsing timestamps: {str(e)}")
                                 sampling_rate = csv_sampling_rate
-                                time_vector = np.arange(len(list(current_signals.values())[0])) / sampling_rate
+                                time_vector = np.arange(current_signals.n_samples) / sampling_rate
                         else:
                             # No timestamp column, generate time vector
                             sampling_rate = csv_sampling_rate
-                            max_length = max(len(signal) for signal in current_signals.values()) if current_signals else 1000
-                            time_vector = np.arange(max_length) / sampling_rate
+                            time_vector = np.arange(current_signals.n_samples) / sampling_rate
+                        current_signals.time_vector = time_vector
                         
                         # Success message with comprehensive info
                         data_duration = len(time_vector) / sampling_rate if len(time_vector) > 0 else 0
@@ -2723,23 +6605,33 @@ def main():
                 start_datetime = getattr(st.session_state, 'mysql_start_datetime', None)
                 end_datetime = getattr(st.session_state, 'mysql_end_datetime', None)
                 
+                # The buffer keeps the newest "Data Points to Fetch" rows; historical ranges are sized to the rows loaded
+                if not (use_date_range and start_datetime and end_datetime):
+                    st.session_state.mysql_data_buffer.resize(mysql_data_limit)
+                
                 # Determine data loading method
                 if use_date_range and start_datetime and end_datetime:
                     # Historical data mode with specific date range
                     st.sidebar.info(f"📊 Loading historical data from {start_datetime.strftime('%Y-%m-%d %H:%M')} to {end_datetime.strftime('%Y-%m-%d %H:%M')}")
                     
-                    mysql_data = st.session_state.mysql_connector.get_data_by_date_range(
-                        mysql_table, mysql_columns_mapping, start_datetime, end_datetime, 
-                        limit=mysql_data_limit
+                    mysql_data = load_date_range_streaming(
+                        st.session_state.mysql_connector, mysql_table, mysql_columns_mapping,
+                        start_datetime, end_datetime, limit=mysql_data_limit,
+                        use_cache=st.session_state.mysql_parquet_cache_enabled,
+                        range_spec=getattr(st.session_state, 'mysql_range_preset', None)
                     )
                     
                     if mysql_data is not None and not mysql_data.empty:
-                        st.session_state.mysql_data_buffer = mysql_data
+                        st.session_state.mysql_data_buffer.resize(len(mysql_data))
+                        st.session_state.mysql_data_buffer.load(mysql_data)
                         st.sidebar.success(f"📊 Loaded {len(mysql_data)} historical records")
+                        if len(mysql_data) >= mysql_data_limit and not st.session_state.mysql_aggregate_enabled:
+                            st.sidebar.warning(f"⚠️ Raw data truncated at {mysql_data_limit:,} records - enable Aggregated Trend to view the full range")
                         
                         # Update last timestamp for potential real-time continuation
                         if 'timestamp' in mysql_data.columns:
                             st.session_state.mysql_last_timestamp = mysql_data['timestamp'].iloc[-1]
+                            st.session_state.mysql_tail_state = None
                     else:
                         st.sidebar.warning(f"📊 No data found in selected date range")
                         # Fallback to latest data
@@ -2747,28 +6639,70 @@ def main():
                             mysql_table, mysql_columns_mapping, limit=100
                         )
                         if mysql_data is not None and not mysql_data.empty:
-                            st.session_state.mysql_data_buffer = mysql_data
+                            st.session_state.mysql_data_buffer.load(mysql_data)
                             st.sidebar.info(f"📡 Loaded {len(mysql_data)} latest records as fallback")
                             
+                elif (st.session_state.is_monitoring and st.session_state.mysql_last_timestamp and not use_date_range
+                      and st.session_state.mysql_background_ingest and mysql_backend_is_server):
+                    # Background ingest mode: copy only new rows from the shared buffer, never wait on MySQL
+                    worker = get_ingest_worker_registry().get_worker(
+                        st.session_state.mysql_connector, mysql_table, mysql_columns_mapping,
+                        st.session_state.mysql_data_buffer, st.session_state.mysql_last_timestamp,
+                        buffer_rows=mysql_data_limit, poll_interval=mysql_refresh_rate, batch_size=mysql_tail_batch_size
+                    )
+                    snapshot = worker.snapshot()
+                    st.session_state.mysql_tail_info = snapshot['info']
+                    st.session_state.mysql_tail_state = None  # Foreground tailing restarts from the snapshot
+                    
+                    if snapshot['error']:
+                        st.sidebar.warning(f"🧵 Background ingest: {snapshot['error']}")
+                    
+                    if snapshot['rows']:
+                        worker.sync_buffer(st.session_state.mysql_data_buffer)
+                        st.session_state.mysql_last_timestamp = snapshot['last_timestamp']
+                    
+                    # Viewers of this machine share one analyzer and the worker's published results
+                    st.session_state.ai_analyzer = worker.attach_analyzer(st.session_state.ai_analyzer)
+                    st.session_state.analyzer_pipeline = worker
+                    shared_pipeline = worker
+                    
+                    if snapshot['last_poll'] is not None:
+                        poll_age = (datetime.now() - snapshot['last_poll']).total_seconds()
+                        st.sidebar.info(f"🧵 Background ingest: {snapshot['rows']:,} rows buffered | last poll {poll_age:.1f}s ago")
+                    else:
+                        st.sidebar.info("🧵 Background ingest starting...")
+                    
                 elif st.session_state.is_monitoring and st.session_state.mysql_last_timestamp and not use_date_range:
                     # Real-time monitoring mode (only when date range is disabled)
                     st.sidebar.info("📡 Checking for new real-time data...")
                     
-                    new_data = st.session_state.mysql_connector.get_real_time_data(
-                        mysql_table, mysql_columns_mapping, st.session_state.mysql_last_timestamp
+                    # Keyset position is rebuilt whenever the table or mapping changes
+                    tail_state = st.session_state.mysql_tail_state
+                    current_mapping = tuple(sorted((k, v) for k, v in mysql_columns_mapping.items() if v))
+                    if tail_state is None or tail_state['table'] != mysql_table or tail_state['mapping'] != current_mapping:
+                        tail_state = st.session_state.mysql_connector.init_tail_state(
+                            mysql_table, mysql_columns_mapping, st.session_state.mysql_last_timestamp
+                        )
+                    
+                    new_data, tail_state, tail_info = st.session_state.mysql_connector.tail_real_time_data(
+                        mysql_table, mysql_columns_mapping, tail_state, batch_size=mysql_tail_batch_size
                     )
+                    st.session_state.mysql_tail_state = tail_state
+                    st.session_state.mysql_tail_info = tail_info
+                    
+                    if not tail_info['caught_up']:
+                        st.sidebar.warning(f"⏳ Tail is behind - drained {tail_info['rows']:,} rows in {tail_info['batches']} batches, more pending")
                     
                     if new_data is not None and not new_data.empty:
-                        # Append new data to buffer, keeping within limit
-                        st.session_state.mysql_data_buffer = pd.concat([
-                            st.session_state.mysql_data_buffer, new_data
-                        ]).tail(mysql_data_limit).reset_index(drop=True)
+                        # Append new data to the ring buffer (overwrites the oldest rows beyond the limit)
+                        st.session_state.mysql_data_buffer.append(new_data)
                         
                         # Update last timestamp
                         if 'timestamp' in new_data.columns:
                             st.session_state.mysql_last_timestamp = new_data['timestamp'].iloc[-1]
                         
-                        st.sidebar.success(f"📡 Received {len(new_data)} new real-time records")
+                        lag_text = f" | lag {tail_info['lag_seconds']:.1f}s" if tail_info['lag_seconds'] is not None else ""
+                        st.sidebar.success(f"📡 Received {len(new_data)} new real-time records in {tail_info['batches']} batch(es){lag_text}")
                     else:
                         st.sidebar.info("📡 No new data available since last update")
                 else:
@@ -2777,9 +6711,11 @@ def main():
                     
                     if use_date_range and start_datetime and end_datetime:
                         # Use date range for initial load
-                        mysql_data = st.session_state.mysql_connector.get_data_by_date_range(
-                            mysql_table, mysql_columns_mapping, start_datetime, end_datetime, 
-                            limit=mysql_data_limit
+                        mysql_data = load_date_range_streaming(
+                            st.session_state.mysql_connector, mysql_table, mysql_columns_mapping,
+                            start_datetime, end_datetime, limit=mysql_data_limit,
+                            use_cache=st.session_state.mysql_parquet_cache_enabled,
+                            range_spec=getattr(st.session_state, 'mysql_range_preset', None)
                         )
                         load_type = "date range"
                     else:
@@ -2790,9 +6726,10 @@ def main():
                         load_type = "latest"
                     
                     if mysql_data is not None and not mysql_data.empty:
-                        st.session_state.mysql_data_buffer = mysql_data
+                        st.session_state.mysql_data_buffer.load(mysql_data)
                         if 'timestamp' in mysql_data.columns:
                             st.session_state.mysql_last_timestamp = mysql_data['timestamp'].iloc[-1]
+                            st.session_state.mysql_tail_state = None
                         
                         st.sidebar.success(f"📊 Loaded {len(mysql_data)} records ({load_type})")
                         
@@ -2803,23 +6740,42 @@ def main():
                             st.sidebar.info(f"🕒 Data range: {data_start} to {data_end}")
                     else:
                         st.sidebar.warning("📡 No data retrieved from MySQL")
-                
+
+                # Aggregated trend covering the full date range (refetched only when the range changes)
+                if use_date_range and start_datetime and end_datetime and st.session_state.mysql_aggregate_enabled:
+                    trend_key = (
+                        mysql_table, tuple(sorted(mysql_columns_mapping.items())),
+                        start_datetime, end_datetime, st.session_state.mysql_aggregate_points
+                    )
+                    trend_data = st.session_state.mysql_trend_data
+                    if trend_data is None or trend_data['key'] != trend_key:
+                        trend_df, bucket_seconds = st.session_state.mysql_connector.get_aggregated_data_by_date_range(
+                            mysql_table, mysql_columns_mapping, start_datetime, end_datetime,
+                            target_points=st.session_state.mysql_aggregate_points
+                        )
+                        st.session_state.mysql_trend_data = {
+                            'key': trend_key,
+                            'data': trend_df,
+                            'bucket_seconds': bucket_seconds
+                        } if trend_df is not None else None
+                else:
+                    st.session_state.mysql_trend_data = None
+
                 # Convert buffered data to signals for analysis
-                if not st.session_state.mysql_data_buffer.empty:
-                    mysql_df = st.session_state.mysql_data_buffer
+                if len(st.session_state.mysql_data_buffer):
+                    # Read-only views of the ring buffer window - nothing is copied for the analyzer
+                    mysql_window = st.session_state.mysql_data_buffer.window()
                     
-                    # Extract signals for selected axes
-                    signals_extracted = 0
+                    # Select axes with data; NULL readings stay aligned as NaN in the channel frame
+                    signal_names = []
                     for axis_display in selected_axes:
                         axis_key = axis_display.split(" ")[0]
-                        if axis_key in mysql_df.columns:
-                            # Handle potential null values
-                            signal_data = mysql_df[axis_key].dropna().values
-                            if len(signal_data) > 0:
-                                current_signals[axis_key] = signal_data
-                                signals_extracted += 1
-                            else:
+                        if axis_key in mysql_window:
+                            if np.isnan(mysql_window[axis_key]).all():
                                 st.sidebar.warning(f"⚠️ No valid data for {axis_key}")
+                            else:
+                                signal_names.append(axis_key)
+                    signals_extracted = len(signal_names)
                     
                     if signals_extracted == 0:
                         st.sidebar.error("❌ No valid signal data extracted from MySQL")
@@ -2828,12 +6784,14 @@ def main():
                         time_vector = st.session_state.data_generator.time_vector
                         sampling_rate = 1000
                     else:
+                        current_signals = st.session_state.mysql_data_buffer.channel_frame(signal_names)
+                        
                         # Handle time vector
-                        if 'timestamp' in mysql_df.columns:
-                            # Convert timestamp to relative time in seconds
-                            timestamps = pd.to_datetime(mysql_df['timestamp']).dropna()
+                        if 'timestamp' in mysql_window:
+                            # Convert epoch nanoseconds to relative time in seconds
+                            timestamps = mysql_window['timestamp']
                             if len(timestamps) > 1:
-                                time_vector = (timestamps - timestamps.iloc[0]).dt.total_seconds().values
+                                time_vector = (timestamps - timestamps[0]) / 1e9
                                 
                                 # Estimate sampling rate from time intervals
                                 time_intervals = np.diff(time_vector)
@@ -2854,11 +6812,11 @@ def main():
                                     sampling_rate = 1000
                             else:
                                 sampling_rate = 1000
-                                time_vector = np.arange(len(list(current_signals.values())[0])) / sampling_rate
+                                time_vector = np.arange(current_signals.n_samples) / sampling_rate
                         else:
                             # Auto-generate time vector based on data length
-                            max_length = max(len(signal) for signal in current_signals.values()) if current_signals else 1000
-                            time_vector = np.arange(max_length) / sampling_rate
+                            time_vector = np.arange(current_signals.n_samples) / sampling_rate
+                        current_signals.time_vector = time_vector
                         
                         # Display comprehensive data information
                         data_info_parts = [
@@ -2875,20 +6833,21 @@ def main():
                         
                         # Show data quality metrics
                         with st.sidebar.expander("📈 Data Quality Metrics"):
-                            st.write(f"**Total Records:** {len(mysql_df):,}")
+                            total_records = len(mysql_window['timestamp'])
+                            st.write(f"**Total Records:** {total_records:,}")
                             st.write(f"**Active Sensors:** {signals_extracted}/{len(selected_axes)}")
                             
-                            if 'timestamp' in mysql_df.columns and len(mysql_df) > 1:
-                                timestamps = pd.to_datetime(mysql_df['timestamp'])
-                                time_span = timestamps.iloc[-1] - timestamps.iloc[0]
+                            if total_records > 1:
+                                timestamps = mysql_window['timestamp']
+                                time_span = pd.Timedelta(int(timestamps[-1] - timestamps[0]))
                                 st.write(f"**Time Span:** {time_span}")
                                 
                                 # Calculate data rate
-                                data_rate = len(mysql_df) / time_span.total_seconds() if time_span.total_seconds() > 0 else 0
+                                data_rate = total_records / time_span.total_seconds() if time_span.total_seconds() > 0 else 0
                                 st.write(f"**Data Rate:** {data_rate:.2f} records/sec")
                                 
                                 # Check for time gaps
-                                time_diffs = timestamps.diff().dt.total_seconds().dropna()
+                                time_diffs = np.diff(timestamps) / 1e9
                                 if len(time_diffs) > 1:
                                     avg_interval = time_diffs.mean()
                                     max_gap = time_diffs.max()
@@ -2902,8 +6861,8 @@ def main():
                                         st.success("✅ Consistent time intervals")
                             
                             # Check for missing data
-                            missing_data = mysql_df.isnull().sum().sum()
-                            total_values = len(mysql_df) * len(mysql_df.columns)
+                            missing_data = sum(int(np.isnan(values).sum()) for name, values in mysql_window.items() if name != 'timestamp')
+                            total_values = total_records * len(mysql_window)
                             missing_pct = (missing_data / total_values) * 100 if total_values > 0 else 0
                             
                             if missing_pct > 5:
@@ -2954,6 +6913,12 @@ def main():
         time_vector = st.session_state.data_generator.time_vector
         sampling_rate = 1000
     
+    # Leaving background ingest: detach from the worker's analyzer so this session's changes and
+    # analyses no longer touch the one other viewers share
+    if shared_pipeline is None and st.session_state.analyzer_pipeline is not None:
+        st.session_state.ai_analyzer = st.session_state.analyzer_pipeline.copy_analyzer()
+        st.session_state.analyzer_pipeline = None
+    
     # Ensure we have at least one signal
     if not current_signals:
         current_signals = {'Fx': st.session_state.data_generator.generate_healthy_signal('x')}
@@ -2980,11 +6945,47 @@ def main():
             key="motor_rpm_input"
         )
         
-        if st.button("⚙️ Configure Machine", key="configure_machine_btn"):
-            config_result = st.session_state.ai_analyzer.configure_machine(
-                motor_rpm=motor_rpm,
-                machine_type=machine_type
+        fft_fast_padding = st.checkbox(
+            "Zero-pad FFTs to a fast length",
+            value=True,
+            key="fft_padding_checkbox",
+            help="Pads each spectrum to a 2/3/5-smooth length so arbitrary buffer sizes transform quickly; band energies are rescaled to stay comparable"
+        )
+        
+        spectrum_method = st.selectbox(
+            "Spectrum Method",
+            ["Full FFT", "Welch Average"],
+            key="spectrum_method_select",
+            help="Welch averages the spectra of overlapping windowed segments: less noisy on long buffers, and cost and resolution follow the segment length"
+        )
+        
+        if spectrum_method == "Welch Average":
+            welch_segment_length = st.selectbox(
+                "Segment Length (samples)",
+                [256, 512, 1024, 2048, 4096, 8192],
+                index=2,
+                key="welch_segment_length_select"
+            )
+            welch_overlap = st.slider(
+                "Segment Overlap",
+                0.0, 0.9, 0.5, 0.05,
+                key="welch_overlap_slider"
             )
+        else:
+            welch_segment_length = None
+            welch_overlap = None
+        
+        if st.button("⚙️ Configure Machine", key="configure_machine_btn"):
+            def configure(analyzer):
+                spectrum_result = analyzer.configure_spectrum(
+                    padding='fast' if fft_fast_padding else 'none',
+                    mode='welch' if spectrum_method == "Welch Average" else 'fft',
+                    segment_length=welch_segment_length,
+                    overlap=welch_overlap
+                )
+                return f"{analyzer.configure_machine(motor_rpm=motor_rpm, machine_type=machine_type)} | {spectrum_result}"
+            
+            config_result = update_analyzer(configure, shared_pipeline)
             st.success(config_result)
     
     # Enhanced weighting configuration
@@ -3081,7 +7082,7 @@ def main():
         
         # Update weights in analyzer
         if st.button("🔄 Update Weights", key="update_weights_btn"):
-            st.session_state.ai_analyzer.update_weights({
+            weights = {
                 'anomaly_detection': anomaly_weight,
                 'axis_analysis': axis_weight,
                 'vibration_weight': vibration_weight,
@@ -3096,7 +7097,8 @@ def main():
                 'temp_normal_multiplier': temp_normal_multiplier,
                 'temp_warning_multiplier': temp_warning_multiplier,
                 'temp_critical_multiplier': temp_critical_multiplier
-            })
+            }
+            update_analyzer(lambda analyzer: analyzer.update_weights(weights), shared_pipeline)
             st.success("✅ Weights updated successfully!")
     
     # Training options
@@ -3135,7 +7137,9 @@ def main():
                     training_data_list.append(training_signals)
             
             if training_data_list:
-                success, message = st.session_state.ai_analyzer.train_model(training_data_list, sampling_rate)
+                success, message = update_analyzer(
+                    lambda analyzer: analyzer.train_model(training_data_list, sampling_rate), shared_pipeline
+                )
                 if success:
                     st.sidebar.success(f"✅ {message}")
                 else:
@@ -3151,12 +7155,21 @@ def main():
         
     if st.sidebar.button("🔴 Stop Monitoring", key="stop_monitoring_btn"):
         st.session_state.is_monitoring = False
+        # Persist the health history now instead of at the next flush interval
+        get_health_history().flush()
     
     # Main dashboard
     col1, col2, col3, col4 = st.columns(4)
     
-    # AI Analysis with enhanced results
-    analysis_result = st.session_state.ai_analyzer.analyze_signals(current_signals, sampling_rate)
+    # AI Analysis with enhanced results (published once per machine when the session shares a pipeline)
+    synced_source = st.session_state.mysql_data_buffer.source
+    if (shared_pipeline is not None and synced_source is not None and synced_source[0] is shared_pipeline
+            and isinstance(current_signals, ChannelFrame)):
+        analysis_result = shared_pipeline.analysis_for(current_signals, sampling_rate, synced_source[1])
+    elif shared_pipeline is not None:
+        analysis_result = shared_pipeline.analyze(st.session_state.ai_analyzer, current_signals, sampling_rate)
+    else:
+        analysis_result = st.session_state.ai_analyzer.analyze_signals(current_signals, sampling_rate)
     health_score = analysis_result["health_score"]
     is_anomaly = analysis_result["anomaly"]
     confidence = analysis_result["confidence"]
@@ -3238,7 +7251,10 @@ def main():
         fig_time = go.Figure()
         colors = {'Fx': 'blue', 'Fy': 'green', 'Fz': 'red', 'v0': 'orange'}
         
-        for axis_key, signal_data in current_signals.items():
+        # Aligned frames plot every channel on the shared time base, with gaps at missing readings
+        plot_signals = ({axis_key: current_signals.channel(axis_key) for axis_key in current_signals}
+                        if isinstance(current_signals, ChannelFrame) else current_signals)
+        for axis_key, signal_data in plot_signals.items():
             if axis_key == 'v0':
                 fig_time.add_trace(go.Scatter(
                     x=time_vector[:len(signal_data)] if time_vector is not None else np.arange(len(signal_data)),
@@ -3289,12 +7305,17 @@ def main():
         if vibration_signals:
             fig_freq = go.Figure()
             
+            # Reuses the spectra computed by this cycle's analysis; a shared analyzer's cache belongs
+            # to the pipeline, so the session transforms its own signals with a private copy
+            if shared_pipeline is not None:
+                spectrum_cache = copy.deepcopy(st.session_state.ai_analyzer.spectrum_cache)
+            else:
+                spectrum_cache = st.session_state.ai_analyzer.spectrum_cache
+            
             for axis_key, signal_data in vibration_signals.items():
-                fft_values = np.abs(fft(signal_data))
-                freqs = fftfreq(len(signal_data), 1/sampling_rate)
-                
-                positive_freqs = freqs[:len(freqs)//2]
-                positive_fft = fft_values[:len(fft_values)//2]
+                positive_freqs, positive_fft = spectrum_cache.spectrum(
+                    signal_data, sampling_rate, position=getattr(current_signals, 'cache_position', None)
+                )
                 
                 fig_freq.add_trace(go.Scatter(
                     x=positive_freqs,
@@ -3304,8 +7325,11 @@ def main():
                     line=dict(color=colors.get(axis_key, 'purple'), width=1.5)
                 ))
             
+            spectrum_engine = spectrum_cache.engine
             fig_freq.update_layout(
-                title="Frequency Domain Analysis",
+                title="Frequency Domain Analysis" + (
+                    f" (Welch, {spectrum_engine.segment_length}-sample segments)" if spectrum_engine.mode == 'welch' else ""
+                ),
                 xaxis_title="Frequency (Hz)",
                 yaxis_title="Magnitude",
                 height=350,
@@ -3329,7 +7353,7 @@ def main():
             st.metric("Monitoring", monitoring_status)
         
         with col3:
-            buffer_size = len(st.session_state.mysql_data_buffer) if not st.session_state.mysql_data_buffer.empty else 0
+            buffer_size = len(st.session_state.mysql_data_buffer)
             st.metric("Buffer Size", f"{buffer_size} pts")
         
         with col4:
@@ -3340,12 +7364,82 @@ def main():
                 except:
                     pass
             st.metric("Last Update", str(last_update))
+            tail_info = st.session_state.mysql_tail_info
+            if tail_info and tail_info.get('lag_seconds') is not None:
+                st.caption(f"Tail lag: {tail_info['lag_seconds']:.1f}s | {tail_info['elapsed_ms']:.0f} ms/poll")
         
         # Display recent data sample if available
-        if not st.session_state.mysql_data_buffer.empty and st.session_state.mysql_connected:
+        if len(st.session_state.mysql_data_buffer) and st.session_state.mysql_connected:
             st.write("**Recent MySQL Data Sample:**")
-            sample_data = st.session_state.mysql_data_buffer.tail(5)
+            sample_data = st.session_state.mysql_data_buffer.to_frame(5)
             st.dataframe(sample_data, use_container_width=True)
+
+        # Aggregated trend over the full selected date range
+        trend_data = st.session_state.mysql_trend_data
+        if trend_data and trend_data['data'] is not None and not trend_data['data'].empty:
+            trend_df = trend_data['data']
+            st.write(f"**📉 Aggregated Trend** ({len(trend_df):,} buckets of {timedelta(seconds=trend_data['bucket_seconds'])}, "
+                     f"{int(trend_df['samples'].sum()):,} raw records)")
+
+            trend_metric = st.radio(
+                "Trend Metric", ["RMS", "Mean"], horizontal=True, key="mysql_trend_metric_radio"
+            )
+            metric_suffix = "_rms" if trend_metric == "RMS" else "_mean"
+            trend_colors = {'Fx': 'blue', 'Fy': 'green', 'Fz': 'red', 'v0': 'orange'}
+
+            fig_trend = go.Figure()
+            for axis_key in ['Fx', 'Fy', 'Fz', 'v0']:
+                if f"{axis_key}_min" not in trend_df.columns:
+                    continue
+                color = trend_colors[axis_key]
+                yaxis = 'y2' if axis_key == 'v0' else 'y'
+                # Min/max envelope
+                fig_trend.add_trace(go.Scatter(
+                    x=trend_df['timestamp'], y=trend_df[f"{axis_key}_max"],
+                    mode='lines', line=dict(width=0, color=color),
+                    showlegend=False, hoverinfo='skip', yaxis=yaxis
+                ))
+                fig_trend.add_trace(go.Scatter(
+                    x=trend_df['timestamp'], y=trend_df[f"{axis_key}_min"],
+                    mode='lines', line=dict(width=0, color=color),
+                    fill='tonexty', opacity=0.2, name=f'{axis_key} min/max', yaxis=yaxis
+                ))
+                fig_trend.add_trace(go.Scatter(
+                    x=trend_df['timestamp'], y=trend_df[f"{axis_key}{metric_suffix}"],
+                    mode='lines', line=dict(color=color, width=1.5),
+                    name=f'{axis_key} {trend_metric}', yaxis=yaxis
+                ))
+
+            fig_trend.update_layout(
+                xaxis_title="Time",
+                yaxis=dict(title="Vibration Amplitude (g)", side="left"),
+                yaxis2=dict(title="Temperature (°C)", side="right", overlaying="y"),
+                height=350,
+                legend=dict(x=0.02, y=0.98)
+            )
+            st.plotly_chart(fig_trend, use_container_width=True)
+
+        # Fleet overview from the last batch fetch
+        fleet_data = st.session_state.mysql_fleet_data
+        if fleet_data:
+            st.write(f"**🏭 Fleet Overview** ({len(fleet_data['machines'])} machines, fetched in {fleet_data['elapsed_ms']:.0f} ms)")
+            fleet_rows = []
+            for machine, machine_df in fleet_data['machines'].items():
+                fleet_row = {
+                    'Machine': machine,
+                    'Rows': len(machine_df),
+                    'Last Update': machine_df['timestamp'].iloc[-1] if 'timestamp' in machine_df.columns and not machine_df.empty else None
+                }
+                for axis_key in ['Fx', 'Fy', 'Fz', 'v0']:
+                    if axis_key not in machine_df.columns:
+                        continue
+                    values = pd.to_numeric(machine_df[axis_key], errors='coerce').dropna().to_numpy(dtype=float)
+                    if axis_key == 'v0':
+                        fleet_row['Temp Mean'] = float(values.mean()) if len(values) else None
+                    else:
+                        fleet_row[f'{axis_key} RMS'] = float(np.sqrt(np.mean(values ** 2))) if len(values) else None
+                fleet_rows.append(fleet_row)
+            st.dataframe(pd.DataFrame(fleet_rows), use_container_width=True)
     
     # Temperature analysis (if v0 is selected)
     if 'v0' in current_signals:
@@ -3641,28 +7735,70 @@ def main():
     st.subheader("📈 Historical Health Trends")
     
     current_time = datetime.now()
-    st.session_state.historical_data.append({
-        "timestamp": current_time,
-        "health_score": health_score,
-        "status": status,
-        "machine_id": machine_id,
-        "data_source": data_source
-    })
-    
-    # Keep only last 50 points
-    if len(st.session_state.historical_data) > 50:
-        st.session_state.historical_data = st.session_state.historical_data[-50:]
-    
-    if len(st.session_state.historical_data) > 1:
-        hist_df = pd.DataFrame(st.session_state.historical_data)
-        
-        fig_hist = px.line(
-            hist_df, 
-            x="timestamp", 
-            y="health_score",
-            title="Health Score Trend",
-            color_discrete_sequence=["blue"]
-        )
+    health_history = get_health_history()
+    if st.session_state.is_monitoring:
+        # One point per new window: reruns and other sessions showing the same data are skipped
+        health_history.record(machine_id, data_source, current_time, health_score, status,
+                              window=HealthHistoryStore.window_digest(current_signals))
+    
+    # Persist monitoring cycles to the results table (batched by HealthResultsWriter), once per window
+    # per machine however many reruns and sessions analyze it
+    results_writer = st.session_state.results_writer
+    results_server = st.session_state.mysql_connected and mysql_backend_is_server
+    if (st.session_state.is_monitoring and st.session_state.results_writeback_enabled
+            and data_source == "MySQL Real-time" and results_server):
+        results_series = (st.session_state.mysql_connector.get_cache_identity(), results_writer.table_name,
+                          machine_id, data_source)
+        if get_results_window_gate().claim(results_series, HealthHistoryStore.window_digest(current_signals)):
+            results_writer.add(
+                st.session_state.mysql_connector,
+                HealthResultsWriter.build_row(machine_id, data_source, analysis_result, status, recorded_at=current_time)
+            )
+    elif results_server and results_writer.stats()['pending']:
+        # Monitoring stopped: write out results still waiting for a full batch
+        results_writer.flush(st.session_state.mysql_connector)
+    
+    history_zoom_options = {
+        "Last 15 minutes": timedelta(minutes=15),
+        "Last hour": timedelta(hours=1),
+        "Last 24 hours": timedelta(days=1),
+        "Last 7 days": timedelta(days=7),
+        "Last 30 days": timedelta(days=30),
+        "Last year": timedelta(days=365),
+        "Last 5 years": timedelta(days=5 * 365)
+    }
+    history_zoom = st.selectbox(
+        "Time Window", list(history_zoom_options), index=1, key="health_history_zoom_select",
+        help="Raw scores are kept for 24 hours, 1-minute averages for 30 days and hourly averages for 10 years"
+    )
+    hist_df, history_tier = health_history.query(
+        machine_id, data_source, current_time - history_zoom_options[history_zoom], current_time
+    )
+    
+    if len(hist_df) > 1:
+        critical_points = int((hist_df['status'] == "CRITICAL").sum())
+        st.caption(f"{machine_id} ({data_source}): {len(hist_df)} points at {history_tier} resolution"
+                   + (f" | {critical_points} with CRITICAL status" if critical_points else ""))
+        
+        fig_hist = go.Figure()
+        if history_tier != "Raw":
+            # Min/max envelope of each aggregated bucket
+            fig_hist.add_trace(go.Scatter(
+                x=hist_df['timestamp'], y=hist_df['max'],
+                mode='lines', line=dict(width=0, color='blue'),
+                showlegend=False, hoverinfo='skip'
+            ))
+            fig_hist.add_trace(go.Scatter(
+                x=hist_df['timestamp'], y=hist_df['min'],
+                mode='lines', line=dict(width=0, color='blue'),
+                fill='tonexty', opacity=0.2, name='min/max'
+            ))
+        fig_hist.add_trace(go.Scatter(
+            x=hist_df['timestamp'], y=hist_df['health_score'],
+            mode='lines', line=dict(color='blue'), name='Health Score',
+            customdata=hist_df['status'], hovertemplate="%{x}<br>%{y:.1f}% (%{customdata})<extra></extra>"
+        ))
+        fig_hist.update_layout(title="Health Score Trend", xaxis_title="Time", yaxis_title="Health Score")
         fig_hist.add_hline(y=80, line_dash="dash", line_color="green", annotation_text="Healthy Threshold")
         fig_hist.add_hline(y=60, line_dash="dash", line_color="orange", annotation_text="Warning Threshold")
         fig_hist.update_layout(height=300)
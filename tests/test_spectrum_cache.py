@@ -0,0 +1,51 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor_health8 import RealFFTEngine, SensorRingBuffer, SpectrumCache  # noqa: E402
+
+
+def make_buffer(values, capacity):
+    buffer = SensorRingBuffer(capacity)
+    buffer.load(pd.DataFrame({
+        'timestamp': pd.date_range('2026-01-01', periods=len(values), freq='ms'),
+        'Fx': values,
+    }))
+    return buffer
+
+
+def test_full_recopy_invalidates_cached_spectrum():
+    capacity = 64
+    rng = np.random.default_rng(0)
+    buffer = SensorRingBuffer(capacity)
+    cache = SpectrumCache(RealFFTEngine())
+    
+    buffer.copy_from(make_buffer(rng.normal(size=capacity), capacity))
+    frame = buffer.channel_frame(['Fx'])
+    cache.clear(frame.cache_position)
+    cache.spectrum(frame.data[0], 1000.0)
+    
+    # A full re-copy writes the new rows into the same slots with total_rows unchanged
+    buffer.copy_from(make_buffer(rng.normal(size=capacity), capacity))
+    refilled = buffer.channel_frame(['Fx'])
+    assert refilled.data.__array_interface__ == frame.data.__array_interface__
+    assert refilled.position == frame.position
+    
+    cache.clear(refilled.cache_position)
+    _, magnitude = cache.spectrum(refilled.data[0], 1000.0)
+    _, expected = RealFFTEngine().magnitude_spectrum(np.array(refilled.data[0]), 1000.0)
+    np.testing.assert_allclose(magnitude, expected)
+
+
+def test_generation_changes_on_resize_and_clear():
+    buffer = make_buffer(np.arange(10.0), 16)
+    generations = {buffer.generation}
+    buffer.resize(32)
+    generations.add(buffer.generation)
+    buffer.clear()
+    generations.add(buffer.generation)
+    assert len(generations) == 3